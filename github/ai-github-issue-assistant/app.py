@@ -1,12 +1,18 @@
 import streamlit as st
 import json
+import queue
+import threading
+import time
+from src import metrics
 from src.github_handler import GitHubHandler
-from src.llm_analyzer import LLMAnalyzer
+from src.http_cache import HTTPCache
+from src.llm_analyzer import LLMAnalyzer, is_transient_fallback
+from src.analysis_cache import AnalysisCache
+from src.env import load_env
 import os
-from dotenv import load_dotenv
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 st.set_page_config(page_title="AI GitHub Issue Assistant", layout="wide")
 
@@ -27,6 +33,81 @@ else:
     st.info("ℹ️  **Demo Mode Active** - No API key. Get one at https://platform.openai.com/api-keys", icon="🎯")
     use_demo_mode = True
 
+ISSUE_TTL = 300  # seconds a fetched issue is reused without asking GitHub again
+ANALYSIS_TTL = 3600  # seconds an analysis is reused for an unchanged issue
+
+
+@st.cache_resource
+def get_github_handler() -> GitHubHandler:
+    """One pooled, ETag-caching handler shared by every session and rerun"""
+    return GitHubHandler(cache=HTTPCache())
+
+
+@st.cache_resource
+def get_analyzer(api_key: str, use_demo: bool) -> LLMAnalyzer:
+    """One analyzer (and OpenAI client) per key/mode instead of one per click"""
+    return LLMAnalyzer(api_key=api_key or None, use_demo=use_demo, cache=AnalysisCache())
+
+
+@st.cache_data(ttl=ISSUE_TTL, show_spinner=False)
+def get_issue_version(repo_url: str, issue_number: int) -> str:
+    """updated_at of the issue; a cheap 304 revalidation once the ETag is cached"""
+    owner, repo = get_github_handler().parse_repo_url(repo_url)
+    return get_github_handler().get_issue(owner, repo, issue_number).get("updated_at", "")
+
+
+@st.cache_data(ttl=ANALYSIS_TTL, show_spinner=False)
+def fetch_issue(repo_url: str, issue_number: int, updated_at: str) -> dict:
+    """Full issue with comments, cached per (repo, issue, updated_at)"""
+    return get_github_handler().fetch_complete_issue(repo_url, issue_number)
+
+
+class AnalysisStore:
+    """(repo, issue, updated_at, demo) -> (stored_at, analysis), shared by every session under a lock"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Stored analysis for key, or None when missing or older than the TTL"""
+        with self._lock:
+            stored = self._entries.get(key)
+        if stored is None or time.time() - stored[0] > self.ttl:
+            return None
+        return stored[1]
+
+    def put(self, key, analysis: dict):
+        """Store an analysis, dropping expired ones while the lock is held"""
+        now = time.time()
+        with self._lock:
+            for expired in [k for k, (stored_at, _) in self._entries.items() if now - stored_at > self.ttl]:
+                del self._entries[expired]
+            self._entries[key] = (now, analysis)
+
+
+@st.cache_resource
+def analysis_store() -> AnalysisStore:
+    """Finished analyses for instant repeat clicks"""
+    return AnalysisStore(ANALYSIS_TTL)
+
+
+def stream_analysis_in_background(analyzer: LLMAnalyzer, issue_data: dict) -> queue.Queue:
+    """Start the LLM call right away; the page drains events once it has drawn the issue"""
+    events: queue.Queue = queue.Queue()
+
+    def run():
+        try:
+            for event in analyzer.analyze_issue_stream(issue_data):
+                events.put(event)
+        except Exception as e:
+            events.put(("error", str(e)))
+
+    threading.Thread(target=run, daemon=True).start()
+    return events
+
+
 # Sidebar for inputs
 with st.sidebar:
     st.header("Configuration")
@@ -41,6 +122,13 @@ with st.sidebar:
         step=1,
         help="The issue number to analyze"
     )
+    # Display only: recording is process-wide and shared by every session, so it stays with
+    # ISSUE_ASSISTANT_METRICS rather than following whoever ticked the box last
+    show_diagnostics = st.checkbox(
+        "Show diagnostics",
+        value=False,
+        help="Show where time goes (GitHub, prompt, LLM); needs ISSUE_ASSISTANT_METRICS=1"
+    )
 
 # Main content area
 col1, col2 = st.columns([1, 1])
@@ -49,9 +137,31 @@ if repo_url and issue_number:
     if st.sidebar.button("🔍 Analyze Issue", use_container_width=True):
         try:
             with st.spinner("Fetching issue from GitHub..."):
-                gh = GitHubHandler()
-                issue_data = gh.fetch_complete_issue(repo_url, int(issue_number))
-            
+                updated_at = get_issue_version(repo_url, int(issue_number))
+                issue_data = fetch_issue(repo_url, int(issue_number), updated_at)
+
+            # Kick off the analysis before drawing the (possibly long) comment list
+            store = analysis_store()
+            store_key = (repo_url, int(issue_number), updated_at, use_demo_mode)
+            stored = store.get(store_key)
+            events = None
+            if stored is None:
+                analyzer = get_analyzer(openai_api_key, use_demo_mode)
+                events = stream_analysis_in_background(analyzer, issue_data)
+
+            field_labels = {
+                "summary": "Summary",
+                "type": "Type",
+                "priority_score": "Priority",
+                "suggested_labels": "Suggested Labels",
+                "potential_impact": "Potential Impact",
+            }
+            with col2:
+                st.subheader("🤖 AI Analysis")
+                placeholders = {name: st.empty() for name in field_labels}
+                status = st.empty()
+                result_area = st.container()
+
             with col1:
                 st.subheader("📋 Issue Details")
                 st.write(f"**Title:** {issue_data['title']}")
@@ -68,12 +178,36 @@ if repo_url and issue_number:
                             st.write(comment['body'])
                             st.divider()
             
-            with col2:
-                st.subheader("🤖 AI Analysis")
-                with st.spinner("Analyzing with AI..."):
-                    analyzer = LLMAnalyzer(api_key=openai_api_key or None, use_demo=use_demo_mode)
-                    analysis = analyzer.analyze_issue(issue_data)
-                
+            def show_field(name, value):
+                if isinstance(value, list):
+                    value = ", ".join(str(v) for v in value) or "None"
+                placeholders[name].markdown(f"**{field_labels[name]}:** {value}")
+
+            if events is None:
+                analysis = stored
+            else:
+                # Render each field the moment the model finishes it
+                status.caption("Analyzing with AI...")
+                analysis = {}
+                while True:
+                    name, value = events.get()
+                    if name == "error":
+                        raise Exception(value)
+                    if name == "result":
+                        analysis = value
+                        break
+                    if name in field_labels:
+                        show_field(name, value)
+                status.empty()
+                # A fallback for a failed call would otherwise be served to every session for the whole TTL
+                if not is_transient_fallback(analysis):
+                    store.put(store_key, analysis)
+
+            # The final result wins, e.g. when the stream failed and fell back to demo mode
+            for name in field_labels:
+                show_field(name, analysis.get(name, ""))
+
+            with result_area:
                 # Display analysis
                 st.json(analysis)
                 
@@ -91,6 +225,36 @@ if repo_url and issue_number:
 else:
     st.info("👈 Enter a GitHub repository URL and issue number in the sidebar to get started")
 
+if show_diagnostics:
+    with st.expander("🩺 Diagnostics", expanded=True):
+        if not metrics.enabled():
+            st.caption("Metrics are off. Start the app with ISSUE_ASSISTANT_METRICS=1 to record them.")
+        snapshot = metrics.snapshot()
+        stages = snapshot["histograms"].get("stage_duration_seconds", [])
+        if stages:
+            st.markdown("**Stage timings**")
+            st.table([
+                {"stage": s["labels"].get("stage", ""), "calls": s["count"],
+                 "mean ms": round(s["mean"] * 1000, 1), "total s": round(s["sum"], 2)}
+                for s in stages
+            ])
+        counters = [
+            {"metric": name, "labels": ", ".join(f"{k}={v}" for k, v in series["labels"].items()),
+             "value": series["value"]}
+            for name, family in snapshot["counters"].items() for series in family
+        ]
+        if counters:
+            st.markdown("**Counters**")
+            st.table(counters)
+        if not stages and not counters:
+            st.caption("Nothing recorded yet. Analyze an issue to collect metrics.")
+        st.download_button(
+            label="Download OpenMetrics",
+            data=metrics.render(),
+            file_name="metrics.txt",
+            mime="text/plain"
+        )
+
 st.divider()
 st.markdown("""
 ### How to use:
@@ -0,0 +1,61 @@
+"""Throughput of the heuristic classifier.
+
+Run from the project root:
+
+    python -m benchmarks.bench_heuristics --issues 50000 --processes 4
+"""
+import argparse
+import os
+import random
+import time
+
+from src.heuristics import classify_batch
+
+_TITLES = [
+    "App crashes when opening settings",
+    "Add support for dark mode",
+    "Docs: README install section is outdated",
+    "How do I configure the proxy?",
+    "Memory leak in background sync",
+    "Show address field on the profile page",
+    "Slow rendering with large tables",
+    "Refactor internal event loop",
+]
+_BODY_WORDS = ("the when after error expected actual steps reproduce version browser log output "
+               "should would could please thanks feature request page button click").split()
+
+
+def make_issues(count: int, body_words: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        {
+            "title": rng.choice(_TITLES),
+            "body": " ".join(rng.choice(_BODY_WORDS) for _ in range(body_words)),
+            "comments": [{"body": "", "user": ""}] * rng.randint(0, 10),
+        }
+        for _ in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--issues", type=int, default=20000)
+    parser.add_argument("--body-words", type=int, default=300)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    issues = make_issues(args.issues, args.body_words)
+    runs = [("single process", None)]
+    if args.processes > 1:
+        runs.append((f"{args.processes} processes", args.processes))
+
+    for name, processes in runs:
+        start = time.perf_counter()
+        results = classify_batch(issues, processes=processes)
+        elapsed = time.perf_counter() - start
+        assert len(results) == len(issues)
+        print(f"{name:>16}: {len(issues) / elapsed:>10,.0f} issues/sec ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Analysis latency under a degraded or failing OpenAI endpoint.
+
+Runs the same calls against a mock endpoint with a slow tail (a share of
+requests stall) and with a full outage (every request answers 500), with and
+without deadlines, hedging and the circuit breaker. Run from the project root:
+
+    python -m benchmarks.bench_resilience --calls 200 --slow-rate 0.05 --slow-latency 3
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mock_servers import MockOpenAIServer
+from src.llm_analyzer import LLMAnalyzer
+from src.resilience import CircuitBreaker
+
+# failure_rate above 1 can never be reached, so this breaker stays closed
+NEVER_OPEN = dict(failure_rate=2.0)
+
+
+def make_issue(number: int):
+    return {"number": number, "title": f"Issue {number}: app crashes when saving", "labels": ["bug"],
+            "body": "Saving a large file crashes the app with a stack trace.", "comments": []}
+
+
+def run(server: MockOpenAIServer, calls: int, concurrency: int, **analyzer_options):
+    analyzer = LLMAnalyzer(api_key="bench", base_url=server.api_url, **analyzer_options)
+    latencies = []
+    sources = {}
+
+    def one(number: int):
+        started = time.perf_counter()
+        result = analyzer.analyze_issue(make_issue(number))
+        return time.perf_counter() - started, result["source"] + (":" + result.get("fallback_reason", "")
+                                                                  if "fallback_reason" in result else "")
+
+    requests_before = server.stats.get("requests", 0)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for seconds, source in pool.map(one, range(1, calls + 1)):
+            latencies.append(seconds)
+            sources[source] = sources.get(source, 0) + 1
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "wall_s": wall,
+        "requests": server.stats.get("requests", 0) - requests_before,
+        "sources": sources,
+    }
+
+
+def report(name: str, stats):
+    sources = ", ".join(f"{source} {count}" for source, count in sorted(stats["sources"].items()))
+    print(f"  {name:<30} p50 {stats['p50_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms  "
+          f"max {stats['max_ms']:7.1f} ms  {stats['requests']:4d} requests  ({sources})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="Normal mock response time (seconds)")
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=3.0)
+    parser.add_argument("--deadline", type=float, default=1.0)
+    parser.add_argument("--hedge-percentile", type=float, default=0.9)
+    args = parser.parse_args()
+
+    print(f"Slow tail: {args.slow_rate:.0%} of requests stall {args.slow_latency:.1f}s")
+    scenarios = [
+        ("no deadline", dict(deadline=None)),
+        (f"deadline {args.deadline:.1f}s", dict(deadline=args.deadline)),
+        (f"deadline + hedge p{args.hedge_percentile * 100:.0f}",
+         dict(deadline=args.deadline, hedge_percentile=args.hedge_percentile)),
+    ]
+    for name, options in scenarios:
+        with MockOpenAIServer(latency=args.latency, tokens_per_sec=1e6, slow_rate=args.slow_rate,
+                              slow_latency=args.slow_latency) as server:
+            report(name, run(server, args.calls, args.concurrency, breaker=CircuitBreaker(**NEVER_OPEN),
+                             **options))
+
+    outage_calls = max(20, args.calls // 4)
+    print("Outage: every request answers 500")
+    scenarios = [
+        ("no breaker", dict(breaker=CircuitBreaker(**NEVER_OPEN))),
+        ("circuit breaker", dict(breaker=CircuitBreaker(cooldown=30.0))),
+    ]
+    for name, options in scenarios:
+        with MockOpenAIServer(latency=args.latency, tokens_per_sec=1e6, error_rate=1.0) as server:
+            report(name, run(server, outage_calls, args.concurrency, deadline=args.deadline * 5, **options))
+
+
+if __name__ == "__main__":
+    main()
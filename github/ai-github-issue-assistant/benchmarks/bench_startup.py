@@ -0,0 +1,108 @@
+"""Startup cost of the command-line entry points.
+
+Runs each scenario in fresh interpreters, reporting median wall time and the
+``-X importtime`` breakdown of the most expensive top-level imports. Run from
+the project root:
+
+    python -m benchmarks.bench_startup --runs 5
+    python -m benchmarks.bench_startup --budget-ms 300   # exit 1 on regression
+
+The heuristic path must not import the OpenAI SDK, requests or dotenv at all;
+the run fails if it does.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_SAMPLE_ISSUE = {"number": 1, "title": "App crashes when saving", "body": "Traceback on save", "comments": [],
+                 "labels": []}
+_DEMO_FORBIDDEN = ("openai", "requests", "dotenv")
+
+
+def parse_importtime(stderr: str):
+    """(module, cumulative microseconds, depth) for each line of -X importtime output"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), int(cumulative), depth))
+    return imports
+
+
+def run_scenario(command, runs: int):
+    walls = []
+    imports = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime"] + command, capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONPATH=os.getcwd()))
+        walls.append(time.perf_counter() - started)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} failed:\n{result.stderr[-2000:]}")
+        imports = parse_importtime(result.stderr)
+    return statistics.median(walls), imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level imports to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail if the heuristic analyze path is slower than this")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(_SAMPLE_ISSUE, f)
+        issue_path = f.name
+
+    scenarios = [
+        ("python -c pass", ["-c", "pass"]),
+        ("analyze --demo", ["-m", "src", "analyze", "--demo", "--input", issue_path]),
+        ("import llm_analyzer", ["-c", "import src.llm_analyzer"]),
+        ("import github_handler", ["-c", "import src.github_handler"]),
+        ("import openai (SDK)", ["-c", "import openai"]),
+    ]
+    report = {}
+    failed = False
+    try:
+        for name, command in scenarios:
+            try:
+                wall, imports = run_scenario(command, args.runs)
+            except RuntimeError as e:
+                print(f"{name:>22}: skipped ({str(e).splitlines()[0]})")
+                continue
+            loaded = {module for module, _, _ in imports}
+            top = sorted((i for i in imports if i[2] == 0), key=lambda i: -i[1])[:args.top]
+            report[name] = {"wall_ms": round(wall * 1000, 1),
+                            "imports_ms": round(sum(c for _, c, d in imports if d == 0) / 1000, 1),
+                            "top": [{"module": m, "ms": round(c / 1000, 1)} for m, c, _ in top]}
+            print(f"{name:>22}: {wall * 1000:7.1f} ms wall, {report[name]['imports_ms']:7.1f} ms importing")
+            for module, cumulative, _ in top:
+                print(f"{'':>24}{cumulative / 1000:7.1f} ms  {module}")
+
+            if name == "analyze --demo":
+                leaked = [m for m in _DEMO_FORBIDDEN if m in loaded]
+                if leaked:
+                    print(f"⚠️  heuristic path imported {', '.join(leaked)}")
+                    failed = True
+                if args.budget_ms is not None and wall * 1000 > args.budget_ms:
+                    print(f"⚠️  heuristic path took {wall * 1000:.0f} ms (budget {args.budget_ms:.0f} ms)")
+                    failed = True
+    finally:
+        os.unlink(issue_path)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
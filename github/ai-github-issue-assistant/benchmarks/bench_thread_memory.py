@@ -0,0 +1,73 @@
+"""Memory used fetching one issue thread, by thread length and fetch path.
+
+Compares, against a mock GitHub with no latency:
+
+- raw: every raw comment object collected, then stripped (the previous path)
+- dicts: fetch_complete_issue, comments cut down while parsing
+- records: fetch_issue_record, __slots__ IssueRecord/Comment objects
+- stream: iter_issue_comments consumed without keeping comments
+
+"peak" is the tracemalloc high-water mark during the fetch and "kept" what
+the result still holds afterwards. Run from the project root:
+
+    python -m benchmarks.bench_thread_memory --comments 100 1000 5000
+"""
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks.mock_servers import MockGitHubServer
+from src.github_governor import RateLimitGovernor
+from src.github_handler import GitHubHandler
+
+REPO_URL = "https://github.com/bench/repo"
+
+
+def measure(fetch):
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    result = fetch()
+    gc.collect()
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return (peak - base) / 1024, (kept - base) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--comments", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'comments':>9} {'path':>8} {'peak KB':>10} {'kept KB':>10}")
+    for count in args.comments:
+        with MockGitHubServer(latency=0, issues=1, comments_per_issue=count) as github:
+            handler = GitHubHandler(token="bench", max_workers=args.workers, governor=RateLimitGovernor(),
+                                    base_url=github.url)
+
+            def raw():
+                issue = handler.get_issue("bench", "repo", 1)
+                comments = handler.get_issue_comments("bench", "repo", 1)
+                return issue, [{"body": c.get("body", ""), "user": c.get("user", {}).get("login", "")}
+                               for c in comments]
+
+            def stream():
+                return sum(len(comment.body) for comment in handler.iter_issue_comments("bench", "repo", 1))
+
+            paths = [
+                ("raw", raw),
+                ("dicts", lambda: handler.fetch_complete_issue(REPO_URL, 1)),
+                ("records", lambda: handler.fetch_issue_record(REPO_URL, 1)),
+                ("stream", stream),
+            ]
+            for name, fetch in paths:
+                fetch()  # warm the connection pool so it isn't counted
+                peak, kept = measure(fetch)
+                print(f"{count:>9} {name:>8} {peak:>10,.0f} {kept:>10,.0f}")
+            handler.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Webhook intake throughput and coalescing against a mock GitHub.
+
+Fires signed ``issues``/``issue_comment`` deliveries at a local WebhookService
+over keep-alive connections, then waits for the queue to drain. Run from the
+project root:
+
+    python -m benchmarks.bench_webhooks --events 5000 --issues 200 --connections 16
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.mock_servers import MockGitHubServer
+from src.github_governor import RateLimitGovernor
+from src.github_handler import GitHubHandler
+from src.llm_analyzer import LLMAnalyzer
+from src.webhook_service import WebhookService, sign
+
+SECRET = "bench-secret"
+
+
+def make_delivery(rng: random.Random, issues: int):
+    number = rng.randint(1, issues)
+    event = rng.choice(["issues", "issue_comment"])
+    action = "edited" if event == "issues" else "created"
+    payload = {
+        "action": action,
+        "repository": {"full_name": "bench/repo"},
+        "issue": {"number": number, "title": f"Issue {number}", "body": "crash on save",
+                  "labels": [{"name": "bug"}], "state": "open", "comments": 0 if event == "issues" else 3},
+    }
+    return event, json.dumps(payload).encode()
+
+
+async def fire(port: int, deliveries, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for event, body in deliveries:
+        head = (f"POST /webhook HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+                f"X-GitHub-Event: {event}\r\nX-Hub-Signature-256: {sign(SECRET, body)}\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n")
+        started = time.perf_counter()
+        writer.write(head.encode() + body)
+        await writer.drain()
+        response_head = await reader.readuntil(b"\r\n\r\n")
+        length = int(response_head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - started)
+    writer.close()
+
+
+async def run(args):
+    github = MockGitHubServer(latency=args.github_latency, issues=args.issues, comments_per_issue=30).start()
+    handler = GitHubHandler(token="bench", max_workers=args.workers * 2, governor=RateLimitGovernor(),
+                            base_url=github.url)
+    service = WebhookService(handler, LLMAnalyzer(use_demo=True), secret=SECRET, workers=args.workers,
+                             debounce=args.debounce, on_result=lambda result: None)
+    server = await service.serve("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    rng = random.Random(0)
+    deliveries = [make_delivery(rng, args.issues) for _ in range(args.events)]
+    per_connection = [deliveries[i::args.connections] for i in range(args.connections)]
+    latencies = []
+
+    started = time.perf_counter()
+    await asyncio.gather(*(fire(port, chunk, latencies) for chunk in per_connection))
+    intake = time.perf_counter() - started
+    await service.drain()
+    total = time.perf_counter() - started
+
+    latencies.sort()
+    state = service.state()
+    print(f"intake: {args.events / intake:,.0f} events/sec "
+          f"(p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms)")
+    print(f"analyses: {state['analyzed']} for {args.events} events ({state['coalesced']} coalesced), "
+          f"queue drained {total:.2f}s after the first event")
+
+    server.close()
+    await server.wait_closed()
+    await service.stop()
+    handler.close()
+    github.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=3000)
+    parser.add_argument("--issues", type=int, default=200, help="Distinct issues the events touch")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--debounce", type=float, default=0.5)
+    parser.add_argument("--github-latency", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
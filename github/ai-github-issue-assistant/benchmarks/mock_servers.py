@@ -0,0 +1,333 @@
+"""Local stand-ins for the GitHub and OpenAI APIs used by the benchmarks.
+
+Both servers run on a background thread on 127.0.0.1 with an OS-assigned
+port and are deterministic for a given configuration, so runs on the same
+machine are comparable.
+"""
+import hashlib
+import json
+import random
+import re
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+_ISSUE_RE = re.compile(r"^/repos/([^/]+)/([^/]+)/issues/(\d+)$")
+_COMMENTS_RE = re.compile(r"^/repos/([^/]+)/([^/]+)/issues/(\d+)/comments$")
+_LIST_RE = re.compile(r"^/repos/([^/]+)/([^/]+)/issues$")
+_REPO_COMMENTS_RE = re.compile(r"^/repos/([^/]+)/([^/]+)/issues/comments$")
+_ALIAS_RE = re.compile(r"i(\d+): issue\(number: (\d+)\)")
+_PACKED_ID_RE = re.compile(r"^### Issue id \d+$", re.MULTILINE)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # A client that gave up (a deadline, a won hedge) is expected, not worth a traceback
+        if not isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            super().handle_error(request, client_address)
+
+
+class _Server:
+    handler_class = BaseHTTPRequestHandler
+
+    def start(self):
+        self.httpd = _HTTPServer(("127.0.0.1", 0), self.handler_class)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+
+class _GitHubHandler(_Handler):
+    def do_GET(self):
+        mock = self.server.mock
+        mock.count("requests")
+        time.sleep(mock.latency)
+        parsed = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        path = parsed.path
+
+        if _COMMENTS_RE.match(path):
+            number = int(_COMMENTS_RE.match(path).group(3))
+            per_page = int(query.get("per_page", 30))
+            page = int(query.get("page", 1))
+            total = mock.comments_per_issue
+            last = max(1, -(-total // per_page))
+            items = [mock.comment(number, i) for i in range((page - 1) * per_page, min(page * per_page, total))]
+            links = {"last": f"{path}?page={last}&per_page={per_page}"}
+            if page < last:
+                links["next"] = f"{path}?page={page + 1}&per_page={per_page}"
+            return self._json(items, links)
+        if _REPO_COMMENTS_RE.match(path):
+            return self._json([])
+        if _ISSUE_RE.match(path):
+            number = int(_ISSUE_RE.match(path).group(3))
+            if not 1 <= number <= mock.issues:
+                return self._send(404, b'{"message": "Not Found"}')
+            return self._json(mock.issue(number))
+        if _LIST_RE.match(path):
+            per_page = int(query.get("per_page", 30))
+            page = int(query.get("page", 1))
+            numbers = range((page - 1) * per_page + 1, min(page * per_page, mock.issues) + 1)
+            links = {}
+            if page * per_page < mock.issues:
+                links["next"] = f"{path}?page={page + 1}&per_page={per_page}"
+            return self._json([mock.issue(n) for n in numbers], links)
+        self._send(404, b'{"message": "Not Found"}')
+
+    def do_POST(self):
+        mock = self.server.mock
+        mock.count("graphql")
+        time.sleep(mock.latency)
+        payload = self._read_json()
+        query, variables = payload.get("query", ""), payload.get("variables", {})
+
+        def connection(number: int, start: int):
+            end = min(start + 100, mock.comments_per_issue)
+            return {
+                "pageInfo": {"hasNextPage": end < mock.comments_per_issue, "endCursor": str(end)},
+                "nodes": [{"body": c["body"], "author": {"login": c["user"]["login"]}}
+                          for c in (mock.comment(number, i) for i in range(start, end))],
+            }
+
+        if "after: $cursor" in query:
+            number = variables["number"]
+            data = {"repository": {"issue": {"comments": connection(number, int(variables["cursor"]))}}}
+        else:
+            repository = {}
+            for alias, number in _ALIAS_RE.findall(query):
+                number = int(number)
+                if not 1 <= number <= mock.issues:
+                    repository[f"i{alias}"] = None
+                    continue
+                issue = mock.issue(number)
+                repository[f"i{alias}"] = {
+                    "number": number, "title": issue["title"], "body": issue["body"],
+                    "state": issue["state"].upper(), "createdAt": issue["created_at"],
+                    "updatedAt": issue["updated_at"],
+                    "labels": {"nodes": issue["labels"]},
+                    "comments": connection(number, 0),
+                }
+            data = {"repository": repository}
+        self._send(200, json.dumps({"data": data}).encode(), {"Content-Type": "application/json"})
+
+    def _json(self, data, links=None):
+        mock = self.server.mock
+        body = json.dumps(data).encode()
+        headers = {"Content-Type": "application/json"}
+        if links:
+            headers["Link"] = ", ".join(f'<{self.server.mock.url}{url}>; rel="{rel}"' for rel, url in links.items())
+
+        if mock.etags:
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            headers["ETag"] = etag
+            if self.headers.get("If-None-Match") == etag:
+                # Like GitHub, conditional hits don't spend rate limit
+                mock.count("not_modified")
+                return self._send(304, b"", {**headers, **mock.rate_headers(spend=False)})
+        headers.update(mock.rate_headers(spend=True))
+        if headers["X-RateLimit-Remaining"] == "0":
+            return self._send(403, b'{"message": "API rate limit exceeded"}', headers)
+        mock.count("bytes", len(body))
+        self._send(200, body, headers)
+
+
+class MockGitHubServer(_Server):
+    """GitHub REST/GraphQL stand-in with configurable latency, depth, ETags and rate limits"""
+
+    handler_class = _GitHubHandler
+
+    def __init__(self, latency: float = 0.02, issues: int = 50, comments_per_issue: int = 250,
+                 body_chars: int = 1500, etags: bool = True, rate_limit: int = 1_000_000):
+        self.latency = latency
+        self.issues = issues
+        self.comments_per_issue = comments_per_issue
+        self.body_chars = body_chars
+        self.etags = etags
+        self.rate_limit = rate_limit
+        self.remaining = rate_limit
+        self.reset = int(time.time()) + 3600
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + amount
+
+    def rate_headers(self, spend: bool):
+        with self._lock:
+            if spend and self.remaining > 0:
+                self.remaining -= 1
+            return {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self.remaining),
+                "X-RateLimit-Reset": str(self.reset),
+                "X-RateLimit-Resource": "core",
+            }
+
+    def issue(self, number: int):
+        words = ("app crashes when saving large file error stack trace expected actual steps "
+                 "reproduce version config add support feature docs").split()
+        body = " ".join(words[(number + i) % len(words)] for i in range(self.body_chars // 6))
+        return {
+            "number": number,
+            "title": f"Issue {number}: {words[number % len(words)]} {words[(number * 7) % len(words)]}",
+            "body": body,
+            "labels": [{"name": "bug"}] if number % 2 else [{"name": "enhancement"}],
+            "state": "open",
+            "created_at": "2024-01-01T00:00:00Z",
+            "updated_at": "2024-06-01T00:00:00Z",
+            "user": {"login": "reporter", "id": 1, "avatar_url": "https://example.invalid/a.png"},
+            "reactions": {"+1": number % 7, "total_count": number % 7},
+        }
+
+    def comment(self, number: int, index: int):
+        body = "+1" if index % 4 == 0 else f"Comment {index} on issue {number}: seeing the same error on version 2.{index % 9}"
+        return {
+            "id": number * 100_000 + index,
+            "issue_url": f"{self.url}/repos/owner/repo/issues/{number}",
+            "body": body,
+            "user": {"login": f"user{index % 50}", "id": index, "avatar_url": "https://example.invalid/u.png",
+                     "url": "https://example.invalid/u", "type": "User", "site_admin": False},
+            "created_at": "2024-01-02T00:00:00Z",
+            "updated_at": "2024-01-02T00:00:00Z",
+            "reactions": {"+1": 0, "-1": 0, "total_count": 0},
+            "author_association": "NONE",
+        }
+
+
+class _OpenAIHandler(_Handler):
+    def do_POST(self):
+        mock = self.server.mock
+        mock.count("requests")
+        request = self._read_json()
+        prompt = "".join(m.get("content", "") for m in request.get("messages", []))
+        prompt_chars = len(prompt)
+        analysis = {
+            "summary": "Saving large files crashes the app",
+            "type": "bug",
+            "priority_score": "4/5 - Crash affecting many users",
+            "suggested_labels": ["bug", "crash"],
+            "potential_impact": "Users lose unsaved work when saving large files",
+        }
+        packed = len(_PACKED_ID_RE.findall(prompt))
+        if packed:
+            entries = [json.dumps({"id": i, **analysis}) for i in range(1, packed + 1)]
+            if mock.garble_packed and packed > 1:
+                # Drop the closing brace of one entry, as models occasionally do
+                entries[packed // 2] = entries[packed // 2][:-1]
+            content = "[" + ", ".join(entries) + "]"
+        else:
+            content = json.dumps(analysis)
+        completion_tokens = len(content) // 4
+        fault = mock.fault()
+        if fault == "error":
+            time.sleep(mock.latency)
+            self._send(500, b'{"error": {"message": "mock outage", "type": "server_error"}}',
+                       {"Content-Type": "application/json"})
+            return
+        if fault == "slow":
+            time.sleep(mock.slow_latency)
+        usage = {"prompt_tokens": prompt_chars // 4, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_chars // 4 + completion_tokens}
+        time.sleep(mock.latency)
+
+        if request.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            step = 8
+            for start in range(0, len(content), step):
+                time.sleep(step / 4 / mock.tokens_per_sec)
+                chunk = {"id": "mock", "object": "chat.completion.chunk", "created": 0, "model": request.get("model"),
+                         "choices": [{"index": 0, "delta": {"content": content[start:start + step]},
+                                      "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+            return
+
+        time.sleep(completion_tokens / mock.tokens_per_sec)
+        body = json.dumps({
+            "id": "mock", "object": "chat.completion", "created": 0, "model": request.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        }).encode()
+        self._send(200, body, {"Content-Type": "application/json"})
+
+
+class MockOpenAIServer(_Server):
+    """OpenAI-compatible chat completions endpoint with configurable latency and token rate"""
+
+    handler_class = _OpenAIHandler
+
+    def __init__(self, latency: float = 0.3, tokens_per_sec: float = 80.0, garble_packed: bool = False,
+                 error_rate: float = 0.0, slow_rate: float = 0.0, slow_latency: float = 5.0, seed: int = 0):
+        self.latency = latency
+        self.tokens_per_sec = tokens_per_sec
+        self.garble_packed = garble_packed
+        # Fault injection: a share of requests answer 500, or stall slow_latency first
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    def fault(self) -> str:
+        """Draw this request's fault: "error", "slow" or "" (and count it)"""
+        with self._lock:
+            draw = self._random.random()
+        if draw < self.error_rate:
+            self.count("errors")
+            return "error"
+        if draw < self.error_rate + self.slow_rate:
+            self.count("slow")
+            return "slow"
+        return ""
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + amount
+
+    @property
+    def api_url(self) -> str:
+        return self.url + "/v1"
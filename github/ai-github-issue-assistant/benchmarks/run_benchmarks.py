@@ -0,0 +1,182 @@
+"""Offline benchmarks for the fetch, prompt, analysis and triage paths.
+
+Everything runs against the local servers in benchmarks.mock_servers, so no
+tokens, network or rate limit are needed and results are repeatable. Run from
+the project root:
+
+    python -m benchmarks.run_benchmarks --issues 40 --comments 250
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<earlier>.json
+
+Each run writes a JSON report (latency p50/p99, throughput, peak traced
+memory per stage, plus the mock servers' request counters) so runs before and
+after a change can be compared with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.mock_servers import MockGitHubServer, MockOpenAIServer
+from src.github_governor import RateLimitGovernor
+from src.github_handler import GitHubHandler
+from src.http_cache import HTTPCache
+from src.llm_analyzer import LLMAnalyzer
+from src.triage import triage_repository
+
+REPO_URL = "https://github.com/bench/repo"
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def run_stage(name: str, items: List, call: Callable, memory: bool = True) -> Dict:
+    """Time call(item) for every item and summarize latency, throughput and peak memory"""
+    if memory:
+        tracemalloc.start()
+    latencies = []
+    started = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        call(item)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    result = {
+        "count": len(items),
+        "seconds": round(elapsed, 4),
+        "per_sec": round(len(items) / elapsed, 2) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "peak_mem_kb": round(peak / 1024, 1) if peak is not None else None,
+    }
+    print(f"{name:>22}: {result['per_sec'] or 0:>9,.1f}/s  p50 {result['p50_ms']:>9.2f} ms  "
+          f"p99 {result['p99_ms']:>9.2f} ms  peak {result['peak_mem_kb'] or 0:>9,.0f} KB", file=sys.stderr)
+    return result
+
+
+def run(args) -> Dict:
+    github = MockGitHubServer(latency=args.github_latency, issues=args.issues,
+                              comments_per_issue=args.comments).start()
+    openai = MockOpenAIServer(latency=args.llm_latency, tokens_per_sec=args.tokens_per_sec).start()
+    numbers = list(range(1, args.issues + 1))
+    stages: Dict[str, Dict] = {}
+    memory = not args.no_memory
+
+    def handler(cache: Optional[HTTPCache] = None) -> GitHubHandler:
+        # A private governor keeps the mock's headers out of the process-wide budget
+        return GitHubHandler(token="bench", max_workers=args.workers, cache=cache,
+                             governor=RateLimitGovernor(), base_url=github.url)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with handler() as cold:
+            stages["fetch_complete_issue"] = run_stage(
+                "fetch (no cache)", numbers, lambda n: cold.fetch_complete_issue(REPO_URL, n), memory)
+            issues = [cold.fetch_complete_issue(REPO_URL, n) for n in numbers]
+
+        cache = HTTPCache(os.path.join(tmp, "http.sqlite"))
+        with handler(cache) as cached:
+            for n in numbers:
+                cached.fetch_complete_issue(REPO_URL, n)
+            stages["fetch_complete_issue_etag"] = run_stage(
+                "fetch (ETag 304s)", numbers, lambda n: cached.fetch_complete_issue(REPO_URL, n), memory)
+        cache.close()
+
+        with handler() as batched:
+            batches = [numbers[i:i + 25] for i in range(0, len(numbers), 25)]
+            stages["fetch_issues_batch"] = run_stage(
+                "fetch (GraphQL x25)", batches, lambda b: batched.fetch_issues_batch(REPO_URL, b), memory)
+            stages["fetch_issues_batch"]["issues_per_sec"] = round(
+                len(numbers) / stages["fetch_issues_batch"]["seconds"], 2)
+
+    analyzer = LLMAnalyzer(api_key="sk-bench", base_url=openai.api_url, max_tokens=args.max_tokens)
+    stages["build_prompt"] = run_stage("build prompt", issues * 5, analyzer._build_prompt, memory)
+    stages["analyze_issue"] = run_stage("analyze_issue", issues, analyzer.analyze_issue, memory)
+
+    # Packing is for short issues, so compare it on a few-comment variant of each issue
+    short = [dict(issue, body=issue["body"][:800], comments=issue["comments"][:3]) for issue in issues]
+    stages["analyze_short"] = run_stage("analyze_issue (short)", short, analyzer.analyze_issue, memory)
+    packs = [short[i:i + args.pack_size] for i in range(0, len(short), args.pack_size)]
+    stages["analyze_packed"] = run_stage(f"analyze_packed x{args.pack_size}", packs,
+                                         lambda pack: analyzer.analyze_packed(pack, pack_size=args.pack_size), memory)
+    stages["analyze_packed"]["issues_per_sec"] = round(len(short) / stages["analyze_packed"]["seconds"], 2)
+
+    def triage(_):
+        with handler() as triage_handler:
+            for _result in triage_repository(triage_handler, analyzer, REPO_URL,
+                                             fetch_workers=args.workers, analyze_workers=args.workers):
+                pass
+
+    stages["end_to_end"] = run_stage("end-to-end triage", [None], triage, memory)
+    stages["end_to_end"]["issues_per_sec"] = round(args.issues / stages["end_to_end"]["seconds"], 2)
+
+    github.stop()
+    openai.stop()
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "stages": stages,
+        "servers": {"github": github.stats, "openai": openai.stats},
+    }
+
+
+def compare(current: Dict, baseline: Dict):
+    """Print per-stage changes against an earlier report"""
+    print(f"\nvs {baseline['created_at']}:", file=sys.stderr)
+    for stage, now in current["stages"].items():
+        before = baseline["stages"].get(stage)
+        if not before:
+            continue
+        changes = []
+        for metric in ("per_sec", "p50_ms", "p99_ms", "peak_mem_kb"):
+            if now.get(metric) and before.get(metric):
+                changes.append(f"{metric} {(now[metric] / before[metric] - 1) * 100:+.1f}%")
+        print(f"{stage:>26}: " + ", ".join(changes), file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks against mock GitHub and OpenAI servers")
+    parser.add_argument("--issues", type=int, default=40)
+    parser.add_argument("--comments", type=int, default=250, help="Comments per issue (pagination depth)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--github-latency", type=float, default=0.02, help="Seconds per GitHub request")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=80.0)
+    parser.add_argument("--max-tokens", type=int, default=500)
+    parser.add_argument("--pack-size", type=int, default=5, help="Issues per packed analysis request")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (it slows Python-heavy stages)")
+    parser.add_argument("--output", help="Report path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier report to compare against")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    output = args.output or os.path.join("benchmarks", "results", time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
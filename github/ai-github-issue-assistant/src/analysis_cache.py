@@ -0,0 +1,113 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict
+
+
+class AnalysisCache:
+    """Two-tier cache of validated LLM analyses.
+
+    Keys are content hashes of everything that determines the completion: the
+    built prompt, the model name and the sampling parameters. Lookups go to an
+    in-memory LRU first, then to an optional SQLite file whose entries expire
+    after ``ttl`` seconds and are trimmed to ``max_entries``.
+    """
+
+    def __init__(self, path: Optional[str] = ".analysis_cache.sqlite", memory_entries: int = 1024,
+                 ttl: float = 7 * 24 * 3600, max_entries: int = 100_000):
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, result TEXT, created_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS analyses_created_at ON analyses (created_at)")
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(prompt: str, model: str, params: Dict) -> str:
+        """Hash the prompt, model and sampling parameters into a cache key"""
+        material = json.dumps({"prompt": prompt, "model": model, "params": params}, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a cached analysis, or None on a miss"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return dict(self._memory[key])
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT result, created_at FROM analyses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and time.time() - row[1] <= self.ttl:
+                    result = json.loads(row[0])
+                    self._remember(key, result)
+                    self.hits += 1
+                    return dict(result)
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, result: Dict):
+        """Store a validated analysis in both tiers"""
+        with self._lock:
+            self._remember(key, dict(result))
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?)", (key, json.dumps(result), time.time())
+                )
+                self._evict()
+                self._conn.commit()
+
+    def _remember(self, key: str, result: Dict):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        """Drop expired rows, then the oldest rows beyond max_entries"""
+        self._conn.execute("DELETE FROM analyses WHERE created_at < ?", (time.time() - self.ttl,))
+        count = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM analyses WHERE key IN (SELECT key FROM analyses ORDER BY created_at LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def stats(self) -> Dict:
+        """Hit/miss counters for this process"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM analyses")
+                self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
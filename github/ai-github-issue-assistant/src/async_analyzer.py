@@ -0,0 +1,147 @@
+import asyncio
+import json
+import random
+import sys
+from typing import Dict, List, Optional
+from src import metrics
+from src.analysis_cache import AnalysisCache
+from src.llm_analyzer import LLMAnalyzer, SYSTEM_PROMPT
+from src.llm_scheduler import RateLimitScheduler
+from src.resilience import CircuitBreaker
+
+
+class AsyncLLMAnalyzer(LLMAnalyzer):
+    """asyncio variant of LLMAnalyzer for running many analyses concurrently.
+
+    ``analyze_issue`` is a coroutine here. Every request passes through a
+    RateLimitScheduler sized to the account's RPM/TPM limits; 429s honor
+    Retry-After and are retried instead of falling straight back to demo mode.
+    Each attempt gets ``deadline`` seconds, and the circuit breaker is shared
+    with the sync analyzer; hedging is left to the sync path, since a hedge
+    here would spend rate-limit budget the scheduler has promised elsewhere.
+    """
+
+    def __init__(self, api_key: str = None, use_demo: bool = False, cache: Optional[AnalysisCache] = None,
+                 model: str = "gpt-3.5-turbo", temperature: float = 0.7, max_tokens: int = 500,
+                 prompt_token_budget: int = 1000, similarity_index=None, base_url: Optional[str] = None,
+                 rpm: int = 3500, tpm: int = 90000, max_retries: int = 5, deadline: Optional[float] = 30.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        super().__init__(api_key=api_key, use_demo=use_demo, cache=cache, model=model,
+                         temperature=temperature, max_tokens=max_tokens,
+                         prompt_token_budget=prompt_token_budget, similarity_index=similarity_index,
+                         base_url=base_url, deadline=deadline, breaker=breaker)
+        self.scheduler = RateLimitScheduler(rpm=rpm, tpm=tpm)
+        self.max_retries = max_retries
+        self._retryable = ()
+        if not self.use_demo:
+            # The base class already checked the SDK is installed
+            from openai import AsyncOpenAI, InternalServerError
+
+            self._retryable = self._rate_limits + (InternalServerError,)
+            # Retries are ours to schedule, so the SDK's own backoff is disabled
+            self.async_client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+
+    def estimate_tokens(self, prompt: str) -> int:
+        """Upper bound on a request's TPM cost: prompt tokens plus max_tokens"""
+        return self.prompt_builder.count_tokens(SYSTEM_PROMPT + prompt) + self.max_tokens
+
+    @staticmethod
+    def _retry_after(error: Exception, attempt: int) -> float:
+        """Seconds to wait before retrying, from Retry-After or exponential backoff"""
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        try:
+            if headers.get("retry-after-ms"):
+                return float(headers["retry-after-ms"]) / 1000
+            if headers.get("retry-after"):
+                return float(headers["retry-after"])
+        except ValueError:
+            pass
+        return min(60.0, 2 ** attempt) * (0.5 + random.random() / 2)
+
+    async def analyze_issue(self, issue_data: Dict) -> Dict:
+        """Analyze GitHub issue using OpenAI or demo mode, within the rate limits"""
+        with metrics.span("analyze", mode="async"):
+            return self._with_duplicates(issue_data, await self._analyze_async(issue_data))
+
+    async def _analyze_async(self, issue_data: Dict) -> Dict:
+        if self.use_demo:
+            return self._fallback(issue_data, "demo_mode")
+
+        prompt = self._build_prompt(issue_data)
+        cache_key, cached = self._cache_lookup(prompt)
+        if cached is not None:
+            return self._sourced(cached, "cache")
+        if not self.breaker.allow():
+            return self._fallback(issue_data, "circuit_open")
+
+        # Any reply counts as the endpoint being up, even one that doesn't parse
+        upstream_ok = False
+        try:
+            estimated = self.estimate_tokens(prompt)
+            for attempt in range(self.max_retries + 1):
+                await self.scheduler.acquire(estimated)
+                try:
+                    with metrics.span("llm_call", model=self.model):
+                        response = await asyncio.wait_for(self._acreate(prompt), self.deadline)
+                    upstream_ok = True
+                    self._record_usage(response.usage)
+                    if response.usage is not None:
+                        self.scheduler.settle(estimated, response.usage.total_tokens)
+
+                    result = self._parse_completion(response.choices[0].message.content.strip())
+                    if cache_key is not None:
+                        self.cache.put(cache_key, result)
+                    return self._sourced(result, "llm")
+
+                except self._retryable as e:
+                    # Throttling says the endpoint is up, so running out of 429 retries never opens the circuit
+                    upstream_ok = isinstance(e, self._rate_limits)
+                    if upstream_ok:
+                        # A refused request used none of the budget; the headers say what is really left
+                        self.scheduler.rejected(estimated, getattr(getattr(e, "response", None), "headers", None) or {})
+                    if attempt == self.max_retries:
+                        print(f"⚠️  LLM still rate limited after {self.max_retries} retries. "
+                              f"Falling back to demo mode...", file=sys.stderr)
+                        return self._fallback(issue_data, "rate_limited")
+                    metrics.inc("llm_retries", error=type(e).__name__)
+                    self.scheduler.pause(self._retry_after(e, attempt))
+                except (asyncio.TimeoutError,) + self._timeouts:
+                    metrics.inc("llm_deadline_exceeded", upstream="openai")
+                    # With deadline=None only the SDK's own timeout can end up here
+                    limit = f"{self.deadline:.1f}s" if self.deadline is not None else "the SDK timeout"
+                    print(f"⚠️  openai call took longer than {limit}. Falling back to demo mode...",
+                          file=sys.stderr)
+                    return self._fallback(issue_data, "deadline")
+                except json.JSONDecodeError as e:
+                    print(f"⚠️  Failed to parse JSON response: {str(e)}. Using demo mode...", file=sys.stderr)
+                    return self._fallback(issue_data, "json_error")
+                except Exception as e:
+                    print(f"⚠️  LLM error: {str(e)}. Falling back to demo mode...", file=sys.stderr)
+                    return self._fallback(issue_data, "api_error")
+
+            return self._fallback(issue_data, "rate_limited")
+        finally:
+            self.breaker.record(upstream_ok)
+
+    async def _acreate(self, prompt: str):
+        params = self._sampling_params()
+        if self.deadline is not None:
+            params["timeout"] = self.deadline
+        return await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            **params
+        )
+
+    async def analyze_many(self, issues: List[Dict], concurrency: int = 16) -> List[Dict]:
+        """Analyze a list of issues concurrently, returning results in input order"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(issue_data: Dict) -> Dict:
+            async with semaphore:
+                return await self.analyze_issue(issue_data)
+
+        return await asyncio.gather(*(run(issue) for issue in issues))
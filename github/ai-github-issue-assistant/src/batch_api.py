@@ -0,0 +1,195 @@
+"""Offline analysis through OpenAI's Batch API file format.
+
+``write_requests`` turns issues into a JSONL file of chat-completion requests
+(one per issue, or one per pack of short issues) ready to upload as a batch,
+plus a sidecar file with the issues themselves. ``read_results`` ingests the
+batch output file and maps every line back to per-issue analyses. Issues whose
+line errored, is missing, or doesn't parse get the heuristic analysis, marked
+with ``"source": "heuristic"``, so a partial batch still yields a full result set.
+
+    python -m src.batch_api write https://github.com/owner/repo --limit 500 --output batch.jsonl
+    # upload batch.jsonl with purpose "batch", create the batch, download its output file
+    python -m src.batch_api read batch_output.jsonl --issues batch.issues.jsonl
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from src import metrics
+from src.llm_analyzer import SYSTEM_PROMPT
+
+ENDPOINT = "/v1/chat/completions"
+
+
+def sidecar_path(requests_path: str) -> str:
+    """Where write_requests stores the issues behind a request file"""
+    base = requests_path[:-6] if requests_path.endswith(".jsonl") else requests_path
+    return base + ".issues.jsonl"
+
+
+def _request_line(analyzer, custom_id: str, prompt: str, max_tokens: int) -> str:
+    return json.dumps({
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": ENDPOINT,
+        "body": {
+            "model": analyzer.model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": analyzer.temperature,
+            "max_tokens": max_tokens,
+        },
+    })
+
+
+def write_requests(analyzer, issues: Iterable[Dict], path: str, pack_size: int = 1,
+                   issue_token_budget: int = 400, tokens_per_issue: int = 200) -> int:
+    """Write Batch-API request lines for issues; returns the number of requests
+
+    With ``pack_size`` > 1, short issues share a packed request (custom_id
+    ``pack:<n1>,<n2>,...``); the rest get one request each (``issue:<n>``).
+    Issues are keyed by their ``number`` and also written to the sidecar file.
+    """
+    requests_written = 0
+    pack: List[Tuple[int, str]] = []
+    with open(path, "w", encoding="utf-8") as out, open(sidecar_path(path), "w", encoding="utf-8") as sidecar:
+
+        def flush():
+            nonlocal requests_written
+            numbers = ",".join(str(number) for number, _ in pack)
+            prompt = analyzer.prompt_builder.packed_prompt([block for _, block in pack])
+            out.write(_request_line(analyzer, f"pack:{numbers}", prompt, tokens_per_issue * len(pack)) + "\n")
+            requests_written += 1
+            pack.clear()
+
+        for issue in issues:
+            number = issue["number"]
+            sidecar.write(json.dumps(issue) + "\n")
+            if pack_size > 1:
+                block, cut = analyzer.prompt_builder.packed_block(issue, len(pack) + 1, issue_token_budget)
+                if not cut:
+                    pack.append((number, block))
+                    if len(pack) == pack_size:
+                        flush()
+                    continue
+            out.write(_request_line(analyzer, f"issue:{number}", analyzer._build_prompt(issue),
+                                    analyzer.max_tokens) + "\n")
+            requests_written += 1
+        if pack:
+            flush()
+    return requests_written
+
+
+def _completion_text(line: Dict) -> Optional[str]:
+    """Assistant message text of a batch output line, or None if the request failed"""
+    response = line.get("response") or {}
+    if line.get("error") or response.get("status_code") != 200:
+        return None
+    choices = (response.get("body") or {}).get("choices") or []
+    if not choices:
+        return None
+    return (choices[0].get("message") or {}).get("content") or ""
+
+
+def read_results(analyzer, output_path: str, issues: Dict[int, Dict]) -> Iterator[Tuple[int, Dict, str]]:
+    """Yield (number, analysis, source) for every issue, from a batch output file
+
+    ``source`` is ``"llm"`` for analyses taken from the batch and ``"heuristic"``
+    where the request failed, the entry was malformed, or no line came back.
+    """
+    remaining = dict(issues)
+    with open(output_path, encoding="utf-8") as f:
+        for raw in f:
+            if not raw.strip():
+                continue
+            line = json.loads(raw)
+            kind, _, ids = line.get("custom_id", "").partition(":")
+            numbers = [int(n) for n in ids.split(",") if n.strip().isdigit()]
+            text = _completion_text(line)
+
+            parsed: Dict[int, Dict] = {}
+            if text is not None:
+                if kind == "pack":
+                    by_id = analyzer._parse_packed(text)
+                    parsed = {number: by_id[i] for i, number in enumerate(numbers, 1) if i in by_id}
+                elif numbers:
+                    try:
+                        parsed = {numbers[0]: analyzer._parse_completion(text.strip())}
+                    except ValueError:
+                        # json.JSONDecodeError is a ValueError too
+                        parsed = {}
+
+            for number in numbers:
+                issue = remaining.pop(number, None)
+                if issue is None:
+                    continue
+                if number in parsed:
+                    yield number, parsed[number], "llm"
+                else:
+                    metrics.inc("analysis_fallbacks", reason="batch_entry")
+                    yield number, analyzer._demo_analysis(issue), "heuristic"
+
+    for number, issue in remaining.items():
+        metrics.inc("analysis_fallbacks", reason="batch_missing")
+        yield number, analyzer._demo_analysis(issue), "heuristic"
+
+
+def load_issues(path: str) -> Dict[int, Dict]:
+    with open(path, encoding="utf-8") as f:
+        issues = (json.loads(line) for line in f if line.strip())
+        return {issue["number"]: issue for issue in issues}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prepare and ingest OpenAI Batch API files for issue analysis")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    write = sub.add_parser("write", help="Fetch issues and write a batch request file")
+    write.add_argument("repo_url", help="https://github.com/owner/repo")
+    write.add_argument("--output", default="batch.jsonl")
+    write.add_argument("--state", default="open", choices=["open", "closed", "all"])
+    write.add_argument("--labels", help="Comma-separated label filter")
+    write.add_argument("--limit", type=int)
+    write.add_argument("--pack-size", type=int, default=1, help="Short issues per request (1 disables packing)")
+    write.add_argument("--model", default="gpt-3.5-turbo")
+
+    read = sub.add_parser("read", help="Turn a batch output file into analyses (JSON lines on stdout)")
+    read.add_argument("output_file")
+    read.add_argument("--issues", required=True, help="The .issues.jsonl sidecar written with the requests")
+    read.add_argument("--model", default="gpt-3.5-turbo")
+    args = parser.parse_args(argv)
+
+    from src.llm_analyzer import LLMAnalyzer
+
+    # Prompts and parsing only; no API calls are made from here
+    analyzer = LLMAnalyzer(use_demo=True, model=args.model)
+
+    if args.command == "write":
+        from src.github_handler import GitHubHandler
+
+        handler = GitHubHandler()
+        owner, repo = handler.parse_repo_url(args.repo_url)
+        labels = [label.strip() for label in args.labels.split(",")] if args.labels else None
+
+        def issues():
+            for count, issue in enumerate(handler.list_issues(owner, repo, state=args.state, labels=labels)):
+                if args.limit is not None and count >= args.limit:
+                    return
+                yield handler.fetch_complete_issue(args.repo_url, issue["number"])
+
+        count = write_requests(analyzer, issues(), args.output, pack_size=args.pack_size)
+        print(f"Wrote {count} requests to {args.output} (issues in {sidecar_path(args.output)})", file=sys.stderr)
+        return 0
+
+    sources: Dict[str, int] = {}
+    for number, analysis, source in read_results(analyzer, args.output_file, load_issues(args.issues)):
+        sources[source] = sources.get(source, 0) + 1
+        print(json.dumps({"number": number, "analysis": analysis, "source": source}), flush=True)
+    print(f"Read {sum(sources.values())} analyses: {json.dumps(sources)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Command-line entry point for scripted and scheduled runs.
+
+    python -m src analyze https://github.com/owner/repo 123
+    python -m src analyze --input issue.json --demo
+    python -m src triage https://github.com/owner/repo --limit 50
+    python -m src sync https://github.com/owner/repo --analyze
+
+Only this module and argparse load up front. Each command imports what it
+uses when it runs, so the heuristic (--demo) path never loads the OpenAI SDK
+and analyzing an issue from a file never loads requests.
+"""
+import argparse
+import importlib
+import json
+import sys
+from typing import List, Optional
+
+# Commands implemented by another module's main(argv)
+_DELEGATED = {
+    "triage": ("src.triage", "Analyze every matching issue in a repository"),
+    "sync": ("src.mirror", "Sync issues into the local mirror and re-analyze changed ones"),
+    "webhook": ("src.webhook_service", "Serve GitHub webhooks and analyze issues as they change"),
+    "batch": ("src.batch_api", "Write or read OpenAI Batch API files"),
+}
+
+
+def analyze_main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src analyze",
+                                     description="Analyze one issue and print the analysis as JSON")
+    parser.add_argument("repo_url", nargs="?", help="https://github.com/owner/repo")
+    parser.add_argument("issue_number", nargs="?", type=int)
+    parser.add_argument("--input", help="Read the issue (fetch_complete_issue JSON shape) from a file, or - for stdin")
+    parser.add_argument("--demo", action="store_true", help="Use the heuristic analyzer instead of OpenAI")
+    parser.add_argument("--model", default="gpt-3.5-turbo")
+    parser.add_argument("--cache", action="store_true", help="Reuse analyses from the local analysis cache")
+    args = parser.parse_args(argv)
+
+    if not args.input and (not args.repo_url or args.issue_number is None):
+        parser.error("give REPO_URL ISSUE_NUMBER, or --input")
+
+    try:
+        if args.input:
+            if args.input == "-":
+                issue_data = json.load(sys.stdin)
+            else:
+                with open(args.input, encoding="utf-8") as f:
+                    issue_data = json.load(f)
+        else:
+            from src.github_handler import GitHubHandler
+
+            with GitHubHandler() as handler:
+                issue_data = handler.fetch_complete_issue(args.repo_url, args.issue_number)
+
+        from src.llm_analyzer import LLMAnalyzer
+
+        cache = None
+        if args.cache and not args.demo:
+            from src.analysis_cache import AnalysisCache
+
+            cache = AnalysisCache()
+        analyzer = LLMAnalyzer(use_demo=args.demo, model=args.model, cache=cache)
+        print(json.dumps(analyzer.analyze_issue(issue_data), indent=2))
+        return 0
+    except Exception as e:
+        print(f"❌ Error: {str(e)}", file=sys.stderr)
+        return 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    commands = "\n".join(f"  {name:<8} {description}" for name, (_, description) in _DELEGATED.items())
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="AI GitHub Issue Assistant",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"commands:\n  analyze  Analyze one issue\n{commands}\n\n"
+               "Run 'python -m src <command> --help' for a command's options.",
+    )
+    parser.add_argument("command", choices=["analyze"] + list(_DELEGATED))
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.command == "analyze":
+        return analyze_main(args.args)
+    module, _ = _DELEGATED[args.command]
+    # So the command's own usage lines read "python -m src triage ..."
+    sys.argv[0] = f"python -m src {args.command}"
+    return importlib.import_module(module).main(args.args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
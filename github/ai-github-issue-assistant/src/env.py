@@ -0,0 +1,15 @@
+"""Deferred .env loading shared by the entry points"""
+_loaded = False
+
+
+def load_env():
+    """Load variables from a .env file once; a no-op without python-dotenv"""
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
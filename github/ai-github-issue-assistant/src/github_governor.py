@@ -0,0 +1,150 @@
+import random
+import threading
+import time
+from typing import Optional, Dict
+
+
+class RateLimitExceeded(Exception):
+    """Raised when GitHub keeps refusing requests after every allowed retry"""
+
+
+class _Budget:
+    __slots__ = ("limit", "remaining", "reset", "next_slot")
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset: Optional[float] = None
+        self.next_slot = 0.0
+
+
+class RateLimitGovernor:
+    """Shared pacing for GitHub API requests.
+
+    Tracks the budget GitHub reports in ``X-RateLimit-*`` headers per resource
+    (``core``, ``graphql``, ``search``). Once the remaining budget drops below
+    ``pace_below`` of the limit, requests are spread evenly over the time left
+    until reset; at ``reserve`` they wait for the reset outright. Secondary
+    limits (403/429) back off with jitter, honoring Retry-After, and pause
+    every thread sharing the governor.
+    """
+
+    _shared: Dict[str, "RateLimitGovernor"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, reserve: int = 20, pace_below: float = 0.2, max_retries: int = 5,
+                 base_backoff: float = 1.0, max_backoff: float = 120.0, max_wait: Optional[float] = None):
+        self.reserve = reserve
+        self.pace_below = pace_below
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait
+        self.blocked_until = 0.0
+        self._budgets: Dict[str, _Budget] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, token: Optional[str] = None) -> "RateLimitGovernor":
+        """Process-wide governor for a token, since GitHub budgets are per token"""
+        key = token or ""
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls()
+            return cls._shared[key]
+
+    def _budget(self, resource: str) -> _Budget:
+        if resource not in self._budgets:
+            self._budgets[resource] = _Budget()
+        return self._budgets[resource]
+
+    def _delay(self, budget: _Budget, now: float) -> float:
+        """Seconds the next request on this budget should wait"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if budget.remaining is None or budget.reset is None:
+            return 0.0
+        if now >= budget.reset:
+            # Window rolled over; the next response will confirm the new budget
+            budget.remaining = budget.limit
+            return 0.0
+        if budget.remaining <= self.reserve:
+            return budget.reset - now + 1
+        if budget.limit and budget.remaining < budget.limit * self.pace_below:
+            spacing = (budget.reset - now) / (budget.remaining - self.reserve)
+            delay = max(0.0, budget.next_slot - now)
+            budget.next_slot = max(now, budget.next_slot) + spacing
+            return delay
+        return 0.0
+
+    def before_request(self, resource: str = "core"):
+        """Block until a request against resource fits the budget"""
+        with self._lock:
+            budget = self._budget(resource)
+            delay = self._delay(budget, time.time())
+            if budget.remaining is not None:
+                # Count the request now so concurrent callers don't all spend the same unit
+                budget.remaining -= 1
+        if delay <= 0:
+            return
+        if self.max_wait is not None and delay > self.max_wait:
+            raise RateLimitExceeded(f"GitHub rate limit exhausted; resets in {int(delay)}s")
+        time.sleep(delay)
+
+    def record(self, resource: str, headers) -> None:
+        """Update the budget from a response's X-RateLimit-* headers"""
+        if headers.get("X-RateLimit-Remaining") is None:
+            return
+        resource = headers.get("X-RateLimit-Resource", resource)
+        with self._lock:
+            budget = self._budget(resource)
+            try:
+                budget.limit = int(headers.get("X-RateLimit-Limit", budget.limit or 0))
+                budget.remaining = int(headers["X-RateLimit-Remaining"])
+                budget.reset = float(headers.get("X-RateLimit-Reset", budget.reset or 0))
+            except (TypeError, ValueError):
+                pass
+
+    @staticmethod
+    def is_rate_limited(response) -> bool:
+        """Whether a response is a primary or secondary rate-limit refusal"""
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        if response.headers.get("Retry-After") or response.headers.get("X-RateLimit-Remaining") == "0":
+            return True
+        return "rate limit" in response.text.lower()
+
+    def backoff(self, response, attempt: int):
+        """Pause every caller after a rate-limit refusal, then return"""
+        now = time.time()
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+        elif response.headers.get("X-RateLimit-Remaining") == "0" and response.headers.get("X-RateLimit-Reset"):
+            delay = max(0.0, float(response.headers["X-RateLimit-Reset"]) - now) + 1
+        else:
+            # Full jitter so threads that failed together don't retry together
+            delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+        if self.max_wait is not None and delay > self.max_wait:
+            raise RateLimitExceeded(f"GitHub rate limit hit; retry in {int(delay)}s")
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, now + delay)
+        time.sleep(max(0.0, self.blocked_until - time.time()))
+
+    def state(self) -> Dict:
+        """Snapshot of the known budget per resource"""
+        now = time.time()
+        with self._lock:
+            return {
+                "blocked_for": max(0.0, self.blocked_until - now),
+                "resources": {
+                    name: {
+                        "limit": budget.limit,
+                        "remaining": budget.remaining,
+                        "resets_in": max(0.0, budget.reset - now) if budget.reset else None,
+                    }
+                    for name, budget in self._budgets.items()
+                },
+            }
@@ -1,17 +1,76 @@
-import requests
-from typing import Optional, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, Dict, List, Any, Tuple, Iterator, Callable
+from urllib.parse import urlparse, parse_qs, urlencode
+from src import metrics
+from src.env import load_env
+from src.http_cache import HTTPCache
+from src.records import Comment, IssueRecord, comment_fields, issue_fields
+from src.github_governor import RateLimitGovernor, RateLimitExceeded
+import hashlib
+import json
 import os
+import re
+import threading
+
+if TYPE_CHECKING:
+    import requests
 
 
 class GitHubHandler:
-    def __init__(self, token: Optional[str] = None):
+    def __init__(self, token: Optional[str] = None, max_workers: int = 8, cache: Optional[HTTPCache] = None,
+                 governor: Optional[RateLimitGovernor] = None, base_url: str = "https://api.github.com"):
+        if token is None:
+            load_env()
         self.token = token or os.getenv("GITHUB_TOKEN")
-        self.base_url = "https://api.github.com"
+        self.base_url = base_url.rstrip("/")
         self.headers = {"Accept": "application/vnd.github.v3+json"}
         if self.token:
             self.headers["Authorization"] = f"token {self.token}"
+        self.max_workers = max(1, max_workers)
+        self.cache = cache
+        # Comment-page workers shared by every concurrent fetch on this handler (created on first use)
+        self._page_executor: Optional[ThreadPoolExecutor] = None
+        self._page_executor_lock = threading.Lock()
+        # Handlers on the same token share one budget unless given their own governor
+        self.governor = governor or RateLimitGovernor.shared(self.token)
+
+        # requests is imported here so modules that only need parse_repo_url stay light
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        # One keep-alive pool for the handler's lifetime: the page workers plus as many
+        # calling threads; past that, requests wait for a connection instead of opening
+        # (and then discarding) extra ones
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers * 2, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        """Release pooled connections and the page workers"""
+        with self._page_executor_lock:
+            if self._page_executor is not None:
+                self._page_executor.shutdown(wait=False)
+                self._page_executor = None
+        self.session.close()
+
+    @property
+    def page_executor(self) -> ThreadPoolExecutor:
+        with self._page_executor_lock:
+            if self._page_executor is None:
+                self._page_executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                         thread_name_prefix="github-pages")
+            return self._page_executor
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
-    def parse_repo_url(self, url: str) -> tuple:
+    @staticmethod
+    def parse_repo_url(url: str) -> tuple:
         """Extract owner and repo from GitHub URL"""
         url = url.strip().rstrip("/")
         parts = url.replace("https://github.com/", "").replace("http://github.com/", "").split("/")
@@ -19,49 +78,281 @@ class GitHubHandler:
             raise ValueError("Invalid GitHub URL format. Use: https://github.com/owner/repo")
         return parts[0], parts[1]
 
-    def get_issue(self, owner: str, repo: str, issue_number: int) -> Dict:
+    def rate_limit_state(self) -> Dict:
+        """Current GitHub budget as seen by this handler's governor"""
+        return self.governor.state()
+
+    def _send(self, method: str, url: str, resource: str = "core", **kwargs) -> "requests.Response":
+        """Send a request through the governor, retrying rate-limit refusals"""
+        for attempt in range(self.governor.max_retries + 1):
+            self.governor.before_request(resource)
+            response = self.session.request(method, url, **kwargs)
+            self.governor.record(resource, response.headers)
+            if metrics.enabled():
+                metrics.inc("github_requests", method=method, resource=resource, status=response.status_code)
+                metrics.inc("github_response_bytes", len(response.content), resource=resource)
+            if not self.governor.is_rate_limited(response):
+                return response
+            metrics.inc("github_rate_limited", resource=resource)
+            if attempt < self.governor.max_retries:
+                self.governor.backoff(response, attempt)
+        raise RateLimitExceeded(f"GitHub rate limit still exceeded after {self.governor.max_retries} retries")
+
+    def _cache_key(self, url: str, params: Optional[Dict]) -> str:
+        """Cache key for a request; scoped to the token since visibility differs per token"""
+        key = url
+        if params:
+            key += "?" + urlencode(sorted(params.items()))
+        if self.token:
+            key = hashlib.sha256(self.token.encode()).hexdigest()[:12] + " " + key
+        return key
+
+    def _get(self, url: str, params: Optional[Dict] = None,
+             object_pairs_hook: Optional[Callable] = None) -> Tuple[Any, Dict]:
+        """GET JSON through the pooled session, revalidating cached copies with ETags
+
+        ``object_pairs_hook`` is handed to the JSON decoder, e.g. to keep only
+        the fields a caller needs while parsing.
+        """
+        if self.cache is None:
+            response = self._send("GET", url, params=params)
+            response.raise_for_status()
+            return response.json(object_pairs_hook=object_pairs_hook), response.headers
+
+        key = self._cache_key(url, params)
+        cached = self.cache.get(key)
+        conditional = {}
+        if cached:
+            if cached.etag:
+                conditional["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                conditional["If-Modified-Since"] = cached.last_modified
+
+        response = self._send("GET", url, params=params, headers=conditional)
+        if response.status_code == 304 and cached:
+            # Not modified: GitHub doesn't charge 304s against the rate limit
+            metrics.inc("github_cache", result="not_modified")
+            self.cache.touch(key)
+            return json.loads(cached.body, object_pairs_hook=object_pairs_hook), cached.headers
+        response.raise_for_status()
+        metrics.inc("github_cache", result="miss")
+
+        etag = response.headers.get("ETag", "")
+        last_modified = response.headers.get("Last-Modified", "")
+        if etag or last_modified:
+            self.cache.put(key, etag, last_modified, response.headers, response.content)
+        return response.json(object_pairs_hook=object_pairs_hook), response.headers
+
+    @staticmethod
+    def _link_url(link_header: str, rel: str) -> Optional[str]:
+        """Pick the URL for a given rel out of a Link header"""
+        for part in link_header.split(","):
+            match = re.search(r'<([^>]+)>;\s*rel="%s"' % rel, part)
+            if match:
+                return match.group(1)
+        return None
+
+    @classmethod
+    def _last_page(cls, link_header: str) -> int:
+        """Read the page number of rel="last" from a Link header"""
+        url = cls._link_url(link_header, "last")
+        if not url:
+            return 1
+        return int(parse_qs(urlparse(url).query).get("page", ["1"])[0])
+
+    def get_issue(self, owner: str, repo: str, issue_number: int,
+                  object_pairs_hook: Optional[Callable] = None) -> Dict:
         """Fetch issue details from GitHub"""
         url = f"{self.base_url}/repos/{owner}/{repo}/issues/{issue_number}"
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
-        return response.json()
+        issue, _ = self._get(url, object_pairs_hook=object_pairs_hook)
+        return issue
+
+    def list_issues(self, owner: str, repo: str, state: str = "open", labels: Optional[List[str]] = None,
+                    since: Optional[str] = None) -> Iterator[Dict]:
+        """Yield issues (not pull requests) from the paginated issues endpoint"""
+        url = f"{self.base_url}/repos/{owner}/{repo}/issues"
+        params = {"state": state, "per_page": 100, "sort": "updated", "direction": "asc"}
+        if labels:
+            params["labels"] = ",".join(labels)
+        if since:
+            params["since"] = since
+
+        while url:
+            issues, headers = self._get(url, params)
+            metrics.inc("github_pages", endpoint="issues")
+            for issue in issues:
+                if "pull_request" not in issue:
+                    yield issue
+            # The next link already carries every query parameter
+            url = self._link_url(headers.get("Link", ""), "next")
+            params = None
+
+    def list_repo_comments(self, owner: str, repo: str, since: Optional[str] = None) -> Iterator[Dict]:
+        """Yield comments across all issues in a repository, oldest update first"""
+        url = f"{self.base_url}/repos/{owner}/{repo}/issues/comments"
+        params = {"per_page": 100, "sort": "updated", "direction": "asc"}
+        if since:
+            params["since"] = since
+
+        while url:
+            comments, headers = self._get(url, params)
+            metrics.inc("github_pages", endpoint="repo_comments")
+            yield from comments
+            url = self._link_url(headers.get("Link", ""), "next")
+            params = None
+
+    def _comment_pages(self, owner: str, repo: str, issue_number: int, object_pairs_hook: Optional[Callable] = None,
+                       transform: Optional[Callable] = None) -> Iterator[List]:
+        """Yield an issue's comment pages in order, fetching pages after the first concurrently"""
+        url = f"{self.base_url}/repos/{owner}/{repo}/issues/{issue_number}/comments"
+        per_page = 100
+
+        def fetch_page(page: int) -> List:
+            comments, headers = self._get(url, {"page": page, "per_page": per_page}, object_pairs_hook)
+            return (list(map(transform, comments)) if transform else comments), headers
+
+        first, headers = fetch_page(1)
+        last_page = self._last_page(headers.get("Link", ""))
+        metrics.inc("github_pages", last_page, endpoint="comments")
+        yield first
+        if last_page <= 1:
+            return
+
+        # Remaining pages are known up front, so fetch them concurrently on the shared
+        # workers (bounding page requests per handler, however many fetches run); map keeps order
+        for comments, _ in self.page_executor.map(fetch_page, range(2, last_page + 1)):
+            yield comments
 
     def get_issue_comments(self, owner: str, repo: str, issue_number: int) -> List[Dict]:
         """Fetch all comments for an issue"""
-        url = f"{self.base_url}/repos/{owner}/{repo}/issues/{issue_number}/comments"
         all_comments = []
-        page = 1
-        
-        while True:
-            params = {"page": page, "per_page": 100}
-            response = requests.get(url, headers=self.headers, params=params)
-            response.raise_for_status()
-            comments = response.json()
-            
-            if not comments:
-                break
-            
+        for comments in self._comment_pages(owner, repo, issue_number):
             all_comments.extend(comments)
-            page += 1
-        
         return all_comments
 
-    def fetch_complete_issue(self, repo_url: str, issue_number: int) -> Dict:
-        """Fetch complete issue with all comments"""
+    def iter_issue_comments(self, owner: str, repo: str, issue_number: int) -> Iterator[Comment]:
+        """Yield an issue's comments one page at a time, keeping only body and author
+
+        Pages are fetched sequentially as the caller consumes them, so memory
+        stays at one page however long the thread is.
+        """
+        url = f"{self.base_url}/repos/{owner}/{repo}/issues/{issue_number}/comments"
+        params = {"per_page": 100}
+        while url:
+            comments, headers = self._get(url, params, comment_fields)
+            metrics.inc("github_pages", endpoint="comments")
+            for comment in comments:
+                yield Comment.from_api(comment)
+            url = self._link_url(headers.get("Link", ""), "next")
+            params = None
+
+    def _graphql(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """POST a GraphQL query and return its data, raising on non-NOT_FOUND errors"""
+        if not self.token:
+            raise ValueError("GitHub GraphQL API requires a token. Set GITHUB_TOKEN.")
+        response = self._send("POST", f"{self.base_url}/graphql", resource="graphql",
+                              json={"query": query, "variables": variables or {}})
+        response.raise_for_status()
+        payload = response.json()
+        errors = [e for e in payload.get("errors") or [] if e.get("type") != "NOT_FOUND"]
+        if errors:
+            raise Exception(f"GraphQL error: {errors[0].get('message', errors[0])}")
+        return payload.get("data") or {}
+
+    def _graphql_comments_after(self, owner: str, repo: str, issue_number: int, cursor: str) -> List[Dict]:
+        """Follow the comments cursor for a thread that overflowed the batched query"""
+        query = """query($owner: String!, $repo: String!, $number: Int!, $cursor: String) {
+  repository(owner: $owner, name: $repo) {
+    issue(number: $number) {
+      comments(first: 100, after: $cursor) {
+        pageInfo { hasNextPage endCursor }
+        nodes { body author { login } }
+      }
+    }
+  }
+}"""
+        comments = []
+        while cursor:
+            data = self._graphql(query, {"owner": owner, "repo": repo, "number": issue_number, "cursor": cursor})
+            metrics.inc("github_pages", endpoint="graphql_comments")
+            connection = data["repository"]["issue"]["comments"]
+            comments.extend(connection["nodes"])
+            page_info = connection["pageInfo"]
+            cursor = page_info["endCursor"] if page_info["hasNextPage"] else None
+        return comments
+
+    @staticmethod
+    def _from_graphql(node: Dict, comments: List[Dict], repo: str = "") -> Dict:
+        """Map a GraphQL issue node onto the fetch_complete_issue shape"""
+        return {
+            "number": node.get("number"),
+            "title": node.get("title", ""),
+            "body": node.get("body", ""),
+            "comments": [{"body": c.get("body", ""), "user": (c.get("author") or {}).get("login", "")} for c in comments],
+            "labels": [label.get("name", "") for label in node["labels"]["nodes"]],
+            "state": node.get("state", "").lower(),
+            "created_at": node.get("createdAt", ""),
+            "updated_at": node.get("updatedAt", ""),
+            "repo": repo,
+        }
+
+    def fetch_issues_batch(self, repo_url: str, issue_numbers: List[int], batch_size: int = 25) -> Dict[int, Dict]:
+        """Fetch many issues with their comments via aliased GraphQL queries
+
+        Returns ``{issue_number: issue}`` in the same shape as fetch_complete_issue.
+        Numbers that don't exist (or are pull requests) are left out.
+        """
+        owner, repo = self.parse_repo_url(repo_url)
+        graphql_fields = """number title body state createdAt updatedAt
+      labels(first: 100) { nodes { name } }
+      comments(first: 100) { pageInfo { hasNextPage endCursor } nodes { body author { login } } }"""
+
+        issues = {}
+        for start in range(0, len(issue_numbers), batch_size):
+            batch = issue_numbers[start:start + batch_size]
+            aliases = "\n".join(f"    i{n}: issue(number: {int(n)}) {{ {graphql_fields} }}" for n in batch)
+            query = f"query($owner: String!, $repo: String!) {{\n  repository(owner: $owner, name: $repo) {{\n{aliases}\n  }}\n}}"
+            with metrics.span("github_graphql_batch"):
+                repository = self._graphql(query, {"owner": owner, "repo": repo}).get("repository") or {}
+            metrics.inc("github_pages", endpoint="graphql_batch")
+
+            for number in batch:
+                node = repository.get(f"i{number}")
+                if not node:
+                    continue
+                comments = node["comments"]["nodes"]
+                page_info = node["comments"]["pageInfo"]
+                if page_info["hasNextPage"]:
+                    comments = comments + self._graphql_comments_after(owner, repo, number, page_info["endCursor"])
+                issues[number] = self._from_graphql(node, comments, f"{owner}/{repo}")
+
+        return issues
+
+    def fetch_issue_record(self, repo_url: str, issue_number: int) -> IssueRecord:
+        """Fetch an issue with all comments as a compact IssueRecord
+
+        Issue and comment JSON is cut down to the used fields while it is
+        parsed, so raw comment objects never pile up for long threads.
+        """
         try:
             owner, repo = self.parse_repo_url(repo_url)
-            
-            issue = self.get_issue(owner, repo, issue_number)
-            comments = self.get_issue_comments(owner, repo, issue_number)
-            
-            return {
-                "title": issue.get("title", ""),
-                "body": issue.get("body", ""),
-                "comments": [{"body": c.get("body", ""), "user": c.get("user", {}).get("login", "")} for c in comments],
-                "labels": [label.get("name", "") for label in issue.get("labels", [])],
-                "state": issue.get("state", ""),
-                "created_at": issue.get("created_at", ""),
-                "updated_at": issue.get("updated_at", ""),
-            }
+
+            with metrics.span("github_fetch_issue"):
+                issue = self.get_issue(owner, repo, issue_number, object_pairs_hook=issue_fields)
+                comments: List[Comment] = []
+                for page in self._comment_pages(owner, repo, issue_number, comment_fields, Comment.from_api):
+                    comments.extend(page)
+
+            record = IssueRecord.from_api(issue, comments, f"{owner}/{repo}")
+            if record.number is None:
+                record.number = issue_number
+            return record
+        except RateLimitExceeded:
+            # Callers can wait for the reset instead of treating this as a bad issue
+            raise
         except Exception as e:
             raise Exception(f"Error fetching issue: {str(e)}")
+
+    def fetch_complete_issue(self, repo_url: str, issue_number: int) -> Dict:
+        """Fetch complete issue with all comments"""
+        return self.fetch_issue_record(repo_url, issue_number).to_dict()
@@ -0,0 +1,142 @@
+"""Keyword heuristics used for demo mode and zero-cost pre-triage.
+
+Text is split into whole words once (``str.translate`` + ``split``, both in C)
+and the word set is intersected with a precomputed table of keyword forms, so
+"add" no longer matches "address" and "how" no longer matches "show". The
+issue title decides the type when it matches anything; otherwise the body
+category with the most distinct keywords wins.
+"""
+import re
+import string
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+_KEYWORDS = {
+    "bug": ["bug", "bugs", "error", "errors", "fix", "fixes", "fixed", "fixing", "crash", "crashes",
+            "crashed", "crashing", "broken", "fail", "fails", "failed", "failing", "failure", "failures"],
+    "feature_request": ["feature", "features", "add", "adds", "adding", "implement", "implements",
+                        "implementing", "implementation", "support", "supports", "supporting",
+                        "allow", "allows", "allowing"],
+    "documentation": ["doc", "docs", "document", "documents", "documented", "documentation", "readme",
+                      "guide", "guides", "tutorial", "tutorials"],
+    "question": ["why", "how", "what", "help", "question", "questions"],
+    "severe": ["critical", "severe", "crash", "crashes", "crashed", "crashing"],
+    "critical": ["critical", "severe"],
+    "performance": ["performance", "slow", "slowness", "slower", "slowly"],
+    "memory": ["memory", "leak", "leaks", "leaking"],
+}
+
+# Type precedence when the title matches several categories
+_TYPE_ORDER = ["bug", "feature_request", "documentation", "question"]
+
+# word -> categories it signals, built once at import
+_WORD_CATEGORIES: Dict[str, FrozenSet[str]] = {}
+for _category, _words in _KEYWORDS.items():
+    for _word in _words:
+        _WORD_CATEGORIES[_word] = _WORD_CATEGORIES.get(_word, frozenset()) | {_category}
+
+_KEYWORD_SET = frozenset(_WORD_CATEGORIES)
+
+# Every ASCII non-letter becomes a word separator
+_SEPARATORS = str.maketrans({c: " " for c in string.punctuation + string.digits})
+_DATA_LOSS_RE = re.compile(r"\bdata[\s-]+loss\b")
+
+
+def _signals(text: str) -> Dict[str, int]:
+    """Count distinct keyword hits per category in lowercase text"""
+    words = set(text.translate(_SEPARATORS).split())
+    counts: Dict[str, int] = {}
+    for word in words & _KEYWORD_SET:
+        for category in _WORD_CATEGORIES[word]:
+            counts[category] = counts.get(category, 0) + 1
+    if "data" in words and "loss" in words and _DATA_LOSS_RE.search(text):
+        counts["severe"] = counts.get("severe", 0) + 1
+    return counts
+
+
+def _issue_type(title_signals: Dict[str, int], body_signals: Dict[str, int], title_has_question: bool) -> str:
+    for issue_type in _TYPE_ORDER:
+        if title_signals.get(issue_type):
+            return issue_type
+    if title_has_question:
+        return "question"
+    best, best_hits = "other", 0
+    for issue_type in _TYPE_ORDER:
+        hits = body_signals.get(issue_type, 0)
+        if hits > best_hits:
+            best, best_hits = issue_type, hits
+    return best
+
+
+def classify_issue(issue_data: Dict) -> Dict:
+    """Classify one issue; returns the same schema as LLMAnalyzer.analyze_issue"""
+    title = issue_data.get("title", "") or ""
+    body = issue_data.get("body", "") or ""
+    comments_count = len(issue_data.get("comments", []))
+
+    title_signals = _signals(title.lower())
+    body_signals = _signals(body.lower())
+    signals: Set[str] = set(title_signals) | set(body_signals)
+    issue_type = _issue_type(title_signals, body_signals, "?" in title)
+
+    # Determine priority based on content
+    priority_score = "2/5 - Low priority"
+    if issue_type == "bug":
+        if "severe" in signals:
+            priority_score = "5/5 - Critical - Severe issue affecting users"
+        elif comments_count > 5:
+            priority_score = "4/5 - High - Multiple users affected"
+        else:
+            priority_score = "3/5 - Medium - Confirmed bug needs investigation"
+    elif issue_type == "feature_request":
+        if comments_count > 3:
+            priority_score = "3/5 - Medium - Community interest"
+        else:
+            priority_score = "2/5 - Low - Single feature request"
+
+    # Generate labels
+    labels = []
+    if issue_type == "bug":
+        labels.extend(["bug", "needs-investigation"])
+        if "performance" in signals:
+            labels.append("performance")
+        if "memory" in signals:
+            labels.append("memory-leak")
+    elif issue_type == "feature_request":
+        labels.extend(["enhancement", "feature-request"])
+    elif issue_type == "documentation":
+        labels.extend(["documentation", "good-first-issue"])
+    labels = list(dict.fromkeys(labels))[:5]
+
+    # Generate summary
+    summary = title[:100] if len(title) > 0 else "Issue analysis"
+    if issue_type == "bug":
+        summary = f"Bug: {title[:80]}"
+    elif issue_type == "feature_request":
+        summary = f"Feature request: {title[:75]}"
+
+    # Generate impact
+    if issue_type == "bug":
+        impact = "Users may experience issues. Reproduction steps needed for verification."
+        if "critical" in signals:
+            impact = "Critical bug affecting core functionality and users."
+    else:
+        impact = f"This {issue_type.replace('_', ' ')} has {comments_count} comments indicating community interest."
+
+    return {
+        "summary": summary[:200],
+        "type": issue_type,
+        "priority_score": priority_score,
+        "suggested_labels": labels,
+        "potential_impact": impact[:200]
+    }
+
+
+def classify_batch(issues: Iterable[Dict], processes: Optional[int] = None, chunksize: int = 512) -> List[Dict]:
+    """Classify many issues in one pass, optionally spread across worker processes"""
+    if not processes or processes <= 1:
+        return [classify_issue(issue) for issue in issues]
+    # Imported here so the single-process path (demo mode, the CLI) doesn't pay for multiprocessing
+    from multiprocessing import Pool
+
+    with Pool(processes) as pool:
+        return pool.map(classify_issue, issues, chunksize=chunksize)
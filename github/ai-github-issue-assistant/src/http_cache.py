@@ -0,0 +1,93 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, NamedTuple
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    last_modified: str
+    headers: Dict
+    body: bytes
+
+
+class HTTPCache:
+    """On-disk store of validated GitHub responses for conditional requests.
+
+    Entries are keyed by request URL and carry the ETag/Last-Modified validators
+    GitHub returned. The total body size is bounded; once it grows past
+    ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    # Response headers worth replaying on a 304 (pagination needs Link)
+    KEPT_HEADERS = ("Link",)
+
+    def __init__(self, path: str = ".github_cache.sqlite", max_bytes: int = 200 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                last_used REAL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Return the stored response for key, if any"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, headers, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return CachedResponse(row[0] or "", row[1] or "", json.loads(row[2] or "{}"), row[3])
+
+    def touch(self, key: str):
+        """Mark an entry as recently used after a successful revalidation"""
+        with self._lock:
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+    def put(self, key: str, etag: str, last_modified: str, headers: Dict, body: bytes):
+        """Store a response and evict old entries past the size bound"""
+        kept = {name: headers[name] for name in self.KEPT_HEADERS if headers.get(name)}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, json.dumps(kept), body, len(body), time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the store fits in max_bytes"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
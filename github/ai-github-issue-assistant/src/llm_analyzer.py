@@ -1,35 +1,82 @@
+import itertools
 import json
 import os
-from typing import Dict
-from dotenv import load_dotenv
+import sys
+import time
+from typing import Dict, List, Optional, Iterator, Tuple, Any
+from src import metrics
+from src.analysis_cache import AnalysisCache
+from src.env import load_env
+from src.heuristics import classify_issue
+from src.prompt_builder import PromptBuilder
+from src.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientCaller
+from src.streaming_json import IncrementalJSONParser
 
-load_dotenv()
 
-# Try to import OpenAI, but allow it to fail for demo mode
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+SYSTEM_PROMPT = "You are an expert GitHub issue analyzer. Return ONLY valid JSON, no markdown formatting."
+
+ANALYSIS_FIELDS = ["summary", "type", "priority_score", "suggested_labels", "potential_impact"]
+
+
+def is_transient_fallback(analysis: Dict) -> bool:
+    """Whether a heuristic analysis stands in for an LLM call that failed (deadline, outage, ...)
+
+    Such results are worth redoing once the API is back; demo-mode results are not.
+    """
+    return analysis.get("source") == "heuristic" and analysis.get("fallback_reason") != "demo_mode"
 
 
 class LLMAnalyzer:
-    def __init__(self, api_key: str = None, use_demo: bool = False):
+    def __init__(self, api_key: str = None, use_demo: bool = False, cache: Optional[AnalysisCache] = None,
+                 model: str = "gpt-3.5-turbo", temperature: float = 0.7, max_tokens: int = 500,
+                 prompt_token_budget: int = 1000, similarity_index=None, base_url: Optional[str] = None,
+                 deadline: Optional[float] = 30.0, hedge_percentile: Optional[float] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        if api_key is None and not use_demo:
+            load_env()
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        # None lets the SDK use OPENAI_BASE_URL or the public endpoint
+        self.base_url = base_url
         self.use_demo = use_demo
         self.api_key_valid = False
+        self.cache = cache
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.prompt_builder = PromptBuilder(model=model, token_budget=prompt_token_budget)
+        self.last_prompt_stats: Dict = {}
+        # Optional SimilarityIndex; when set, results list likely duplicates of earlier issues
+        self.similarity_index = similarity_index
+        # Seconds an LLM call may take before the heuristic answers instead; None waits for the SDK
+        self.deadline = deadline
+        # Analyzers talking to the same endpoint share one breaker unless given their own
+        self.breaker = breaker or CircuitBreaker.shared(base_url or os.getenv("OPENAI_BASE_URL") or "openai")
+        self.caller = ResilientCaller(deadline=deadline, hedge_percentile=hedge_percentile, breaker=self.breaker,
+                                      name="openai", retries=2)
+        # A hedged stream would leave the losing response open, so streams get the deadline and breaker only
+        self.stream_caller = ResilientCaller(deadline=deadline, breaker=self.breaker, name="openai", retries=2)
+        # Errors that mean the deadline (ours or the SDK's own timeout) ran out
+        self._timeouts: Tuple[type, ...] = (DeadlineExceeded,)
+        # Errors that mean the account is being throttled (a 429)
+        self._rate_limits: Tuple[type, ...] = ()
         
-        if not OPENAI_AVAILABLE:
-            raise ValueError("OpenAI SDK not installed. Install with: pip install openai")
-        
-        # Try to initialize with API key if provided
-        if self.api_key and self.api_key.strip():
+        # Demo mode never touches the SDK, so it is only imported (slowly) for real clients
+        if not self.use_demo and self.api_key and self.api_key.strip():
             try:
-                self.client = OpenAI(api_key=self.api_key)
+                from openai import OpenAI, APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+            except ImportError:
+                raise ValueError("OpenAI SDK not installed. Install with: pip install openai")
+            try:
+                # Retries are the caller's, so an attempt abandoned at the deadline doesn't retry on its own
+                self.client = OpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
                 self.api_key_valid = True
-                self.use_demo = False  # Override demo mode if valid key exists
+                self._timeouts = (DeadlineExceeded, APITimeoutError)
+                self._rate_limits = (RateLimitError,)
+                for caller in (self.caller, self.stream_caller):
+                    caller.retry_on = (APIConnectionError, InternalServerError, RateLimitError)
+                    caller.not_failures = self._rate_limits
             except Exception as e:
-                print(f"⚠️  Invalid API key detected: {str(e)}")
+                print(f"⚠️  Invalid API key detected: {str(e)}", file=sys.stderr)
                 self.api_key_valid = False
                 self.use_demo = True
         else:
@@ -37,160 +84,293 @@ class LLMAnalyzer:
 
     def analyze_issue(self, issue_data: Dict) -> Dict:
         """Analyze GitHub issue using OpenAI or demo mode"""
-        
+        with metrics.span("analyze"):
+            return self._with_duplicates(issue_data, self._analyze(issue_data))
+
+    def _with_duplicates(self, issue_data: Dict, result: Dict) -> Dict:
+        """Add possible_duplicates from the similarity index, then index this issue"""
+        if self.similarity_index is None:
+            return result
+        number = issue_data.get("number")
+        repo = issue_data.get("repo", "")
+        matches = self.similarity_index.query(issue_data, exclude=number, repo=repo)
+        result = dict(result)
+        result["possible_duplicates"] = [{"number": n, "score": round(score, 3)} for n, score in matches]
+        if number is not None:
+            self.similarity_index.add(number, issue_data, repo=repo)
+        return result
+
+    def _analyze(self, issue_data: Dict) -> Dict:
         if self.use_demo:
-            return self._demo_analysis(issue_data)
+            return self._fallback(issue_data, "demo_mode")
         
         prompt = self._build_prompt(issue_data)
-        
+        cache_key, cached = self._cache_lookup(prompt)
+        if cached is not None:
+            return self._sourced(cached, "cache")
+
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are an expert GitHub issue analyzer. Return ONLY valid JSON, no markdown formatting."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=500
-            )
-            
+            with metrics.span("llm_call", model=self.model):
+                response = self.caller.call(lambda timeout: self._create(prompt, timeout, **self._sampling_params()))
+            self._record_usage(response.usage)
+
             text = response.choices[0].message.content.strip()
-            
-            # Extract JSON from response
-            start = text.find('{')
-            end = text.rfind('}') + 1
-            if start != -1 and end > start:
-                json_str = text[start:end]
-                result = json.loads(json_str)
-                return self._validate_response(result)
-            else:
-                raise ValueError("No JSON found in response")
-                
+            result = self._parse_completion(text)
+            # Only real LLM results are cached; the fallbacks below never reach here
+            if cache_key is not None:
+                self.cache.put(cache_key, result)
+            return self._sourced(result, "llm")
+
+        except CircuitOpenError:
+            return self._fallback(issue_data, "circuit_open")
+        except self._timeouts as e:
+            print(f"⚠️  LLM deadline exceeded: {str(e)}. Falling back to demo mode...", file=sys.stderr)
+            return self._fallback(issue_data, "deadline")
+        except self._rate_limits as e:
+            print(f"⚠️  LLM rate limited: {str(e)}. Falling back to demo mode...", file=sys.stderr)
+            return self._fallback(issue_data, "rate_limited")
         except json.JSONDecodeError as e:
             # Fall back to demo mode if JSON parsing fails
-            print(f"⚠️  Failed to parse JSON response: {str(e)}. Using demo mode...")
-            return self._demo_analysis(issue_data)
+            print(f"⚠️  Failed to parse JSON response: {str(e)}. Using demo mode...", file=sys.stderr)
+            return self._fallback(issue_data, "json_error")
         except Exception as e:
             # Fall back to demo mode for any API errors (invalid key, network, etc.)
             error_msg = str(e).lower()
             if "401" in error_msg or "invalid" in error_msg or "api_key" in error_msg or "authentication" in error_msg:
-                print(f"⚠️  OpenAI API authentication error: Using demo mode instead...")
-                return self._demo_analysis(issue_data)
+                print(f"⚠️  OpenAI API authentication error: Using demo mode instead...", file=sys.stderr)
+                return self._fallback(issue_data, "auth_error")
             # For other errors, still try demo mode as fallback
-            print(f"⚠️  LLM error: {str(e)}. Falling back to demo mode...")
-            return self._demo_analysis(issue_data)
+            print(f"⚠️  LLM error: {str(e)}. Falling back to demo mode...", file=sys.stderr)
+            return self._fallback(issue_data, "api_error")
 
-    def _demo_analysis(self, issue_data: Dict) -> Dict:
-        """Generate demo analysis without API key"""
-        title = issue_data.get("title", "")
-        body = issue_data.get("body", "")
-        comments_count = len(issue_data.get("comments", []))
-        
-        # Analyze title keywords
-        title_lower = title.lower()
-        
-        # Determine type based on keywords
-        issue_type = "other"
-        if any(word in title_lower for word in ["bug", "error", "fix", "crash", "broken", "fail"]):
-            issue_type = "bug"
-        elif any(word in title_lower for word in ["feature", "add", "implement", "support", "allow"]):
-            issue_type = "feature_request"
-        elif any(word in title_lower for word in ["doc", "document", "readme", "guide", "tutorial"]):
-            issue_type = "documentation"
-        elif any(word in title_lower for word in ["why", "how", "what", "help", "question", "?"]):
-            issue_type = "question"
-        
-        # Determine priority based on content
-        priority_score = "2/5 - Low priority"
-        if issue_type == "bug":
-            if any(word in title_lower for word in ["critical", "severe", "crash", "data loss"]):
-                priority_score = "5/5 - Critical - Severe issue affecting users"
-            elif comments_count > 5:
-                priority_score = "4/5 - High - Multiple users affected"
-            else:
-                priority_score = "3/5 - Medium - Confirmed bug needs investigation"
-        elif issue_type == "feature_request":
-            if comments_count > 3:
-                priority_score = "3/5 - Medium - Community interest"
-            else:
-                priority_score = "2/5 - Low - Single feature request"
-        
-        # Generate labels
-        labels = []
-        if issue_type == "bug":
-            labels.extend(["bug", "needs-investigation"])
-            if "performance" in title_lower or "slow" in title_lower:
-                labels.append("performance")
-            if "memory" in title_lower or "leak" in title_lower:
-                labels.append("memory-leak")
-        elif issue_type == "feature_request":
-            labels.extend(["enhancement", "feature-request"])
-        elif issue_type == "documentation":
-            labels.extend(["documentation", "good-first-issue"])
-        
-        # Remove duplicates and limit to 5
-        labels = list(set(labels))[:5]
-        
-        # Generate summary
-        summary = title[:100] if len(title) > 0 else "Issue analysis"
-        if issue_type == "bug":
-            summary = f"Bug: {title[:80]}"
-        elif issue_type == "feature_request":
-            summary = f"Feature request: {title[:75]}"
-        
-        # Generate impact
-        if issue_type == "bug":
-            impact = "Users may experience issues. Reproduction steps needed for verification."
-            if "critical" in title_lower or "severe" in title_lower:
-                impact = "Critical bug affecting core functionality and users."
-        else:
-            impact = f"This {issue_type.replace('_', ' ')} has {comments_count} comments indicating community interest."
-        
-        return {
-            "summary": summary[:200],
-            "type": issue_type,
-            "priority_score": priority_score,
-            "suggested_labels": labels,
-            "potential_impact": impact[:200]
-        }
+    def analyze_packed(self, issues: List[Dict], pack_size: int = 5, issue_token_budget: int = 400,
+                       tokens_per_issue: int = 200) -> List[Dict]:
+        """Analyze many issues, packing short ones several to a request
 
-    def _build_prompt(self, issue_data: Dict) -> str:
-        """Build analysis prompt from issue data"""
-        title = issue_data.get("title", "")
-        body = issue_data.get("body", "")[:2000]  # Limit to 2000 chars
-        comments_text = ""
-        
-        comments = issue_data.get("comments", [])
-        if comments:
-            comments_text = "\n\nComments:\n"
-            for i, comment in enumerate(comments[:5], 1):  # Limit to first 5 comments
-                comments_text += f"{i}. {comment.get('body', '')[:500]}\n"
-        
-        prompt = f"""Analyze this GitHub issue and return ONLY valid JSON (no markdown, no extra text).
+        Returns one analysis per issue, in input order. Issues that don't fit
+        ``issue_token_budget`` untruncated, cache hits, and entries the model
+        leaves out or garbles are analyzed one at a time instead, so a bad
+        entry never costs the rest of its pack.
+        """
+        if self.use_demo:
+            # Not analyze_issue, which is a coroutine on AsyncLLMAnalyzer
+            return [self._with_duplicates(issue, self._fallback(issue, "demo_mode")) for issue in issues]
 
-Issue Title: {title}
+        results: List[Optional[Dict]] = [None] * len(issues)
+        pack: List[Tuple[int, str]] = []
 
-Issue Body: {body}
-{comments_text}
+        def flush():
+            parsed = self._complete_packed([block for _, block in pack], tokens_per_issue)
+            for issue_id, (pack_position, _) in enumerate(pack, 1):
+                if issue_id in parsed:
+                    results[pack_position] = self._sourced(parsed[issue_id], "llm")
+            pack.clear()
 
-Return a JSON object with exactly this structure:
-{{
-  "summary": "One sentence summary of the issue",
-  "type": "bug | feature_request | documentation | question | other",
-  "priority_score": "1-5 with short justification",
-  "suggested_labels": ["label1", "label2", "label3"],
-  "potential_impact": "Short impact statement if bug, otherwise brief description"
-}}
+        for position, issue in enumerate(issues):
+            if self.cache is not None:
+                _, cached = self._cache_lookup(self._build_prompt(issue))
+                if cached is not None:
+                    results[position] = self._sourced(cached, "cache")
+                    continue
+            block, cut = self.prompt_builder.packed_block(issue, len(pack) + 1, issue_token_budget)
+            if cut:
+                continue
+            pack.append((position, block))
+            if len(pack) == pack_size:
+                flush()
+        if pack:
+            flush()
 
-IMPORTANT: Return ONLY the JSON object, no markdown formatting, no extra text."""
+        for position, result in enumerate(results):
+            if result is None:
+                results[position] = self._analyze(issues[position])
+        return [self._with_duplicates(issue, result) for issue, result in zip(issues, results)]
 
+    def _complete_packed(self, blocks: List[str], tokens_per_issue: int) -> Dict[int, Dict]:
+        """Send one packed prompt; returns whichever entries came back valid, keyed by id"""
+        try:
+            prompt = self.prompt_builder.packed_prompt(blocks)
+            with metrics.span("llm_call", model=self.model, mode="packed"):
+                response = self.caller.call(lambda timeout: self._create(
+                    prompt, timeout, temperature=self.temperature, max_tokens=tokens_per_issue * len(blocks)))
+            self._record_usage(response.usage)
+            parsed = self._parse_packed(response.choices[0].message.content or "")
+        except CircuitOpenError:
+            # Each issue then takes the single-issue path, which answers with the heuristic
+            parsed = {}
+        except Exception as e:
+            print(f"⚠️  Packed LLM request failed: {str(e)}. Analyzing those issues one by one...", file=sys.stderr)
+            parsed = {}
+        missing = len([i for i in range(1, len(blocks) + 1) if i not in parsed])
+        if missing:
+            metrics.inc("packed_entries_retried", missing)
+        return parsed
+
+    def _parse_packed(self, text: str) -> Dict[int, Dict]:
+        """Validated analyses by id from a packed completion, skipping malformed entries"""
+        decoder = json.JSONDecoder()
+        results: Dict[int, Dict] = {}
+        position = max(text.find("["), 0)
+        # Decode object by object so one broken element doesn't lose its neighbours
+        while True:
+            start = text.find("{", position)
+            if start == -1:
+                break
+            try:
+                entry, position = decoder.raw_decode(text, start)
+            except json.JSONDecodeError:
+                position = start + 1
+                continue
+            if not isinstance(entry, dict):
+                continue
+            try:
+                issue_id = int(entry.get("id"))
+            except (TypeError, ValueError):
+                continue
+            if issue_id not in results and all(field in entry for field in ANALYSIS_FIELDS):
+                results[issue_id] = self._validate_response(entry)
+        return results
+
+    def analyze_issue_stream(self, issue_data: Dict) -> Iterator[Tuple[str, Any]]:
+        """Analyze an issue, yielding each field as soon as the model finishes it
+
+        Yields ``(field, value)`` pairs for the analysis fields as they complete,
+        then a final ``("result", analysis)`` with the full validated analysis.
+        If anything goes wrong the final result is the demo analysis.
+        """
+        if self.use_demo:
+            yield from self._replay(self._with_duplicates(issue_data, self._fallback(issue_data, "demo_mode")))
+            return
+
+        prompt = self._build_prompt(issue_data)
+        cache_key, cached = self._cache_lookup(prompt)
+        if cached is not None:
+            yield from self._replay(self._with_duplicates(issue_data, self._sourced(cached, "cache")))
+            return
+
+        started = time.perf_counter()
+        try:
+            chunks = self.stream_caller.call(lambda timeout: self._open_stream(prompt, timeout))
+
+            parser = IncrementalJSONParser()
+            text = ""
+            for chunk in chunks:
+                if self.deadline is not None and time.perf_counter() - started > self.deadline:
+                    raise DeadlineExceeded(f"openai stream took longer than {self.deadline:.1f}s")
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                text += delta
+                for name, value in parser.feed(delta):
+                    if name in ANALYSIS_FIELDS:
+                        yield name, self._validate_response({name: value})[name]
+
+            if metrics.enabled():
+                metrics.observe("stage_duration_seconds", time.perf_counter() - started, stage="llm_stream",
+                                model=self.model)
+                # The pinned SDK can't request usage on streams, so tokens are counted locally
+                metrics.inc("llm_tokens", self.last_prompt_stats.get("tokens", 0), kind="prompt", source="estimate")
+                metrics.inc("llm_tokens", self.prompt_builder.count_tokens(text), kind="completion",
+                            source="estimate")
+            result = self._parse_completion(text.strip())
+            if cache_key is not None:
+                self.cache.put(cache_key, result)
+            result = self._sourced(result, "llm")
+        except CircuitOpenError:
+            result = self._fallback(issue_data, "circuit_open")
+        except Exception as e:
+            print(f"⚠️  LLM streaming error: {str(e)}. Falling back to demo mode...", file=sys.stderr)
+            result = self._fallback(issue_data, "deadline" if isinstance(e, self._timeouts) else "stream_error")
+        yield "result", self._with_duplicates(issue_data, result)
+
+    def _open_stream(self, prompt: str, timeout: Optional[float]) -> Iterator:
+        """Start a streamed completion and wait for its first chunk, so both fall under the deadline
+
+        Returns an iterator over every chunk, the first included. Once it has
+        arrived the endpoint counts as up; later chunks only face the deadline.
+        """
+        stream = iter(self._create(prompt, timeout, stream=True, **self._sampling_params()))
+        first = next(stream, None)
+        return stream if first is None else itertools.chain([first], stream)
+
+    @staticmethod
+    def _replay(analysis: Dict) -> Iterator[Tuple[str, Any]]:
+        """Yield an already complete analysis in the streaming event format"""
+        for name in ANALYSIS_FIELDS + ["possible_duplicates"]:
+            if name in analysis:
+                yield name, analysis[name]
+        yield "result", analysis
+
+    def _cache_lookup(self, prompt: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """Cache key for a prompt and the cached analysis, if any"""
+        if self.cache is None:
+            return None, None
+        cache_key = AnalysisCache.make_key(prompt, self.model, self._sampling_params())
+        cached = self.cache.get(cache_key)
+        metrics.inc("analysis_cache", result="miss" if cached is None else "hit")
+        return cache_key, cached
+
+    def _record_usage(self, usage):
+        """Count the prompt and completion tokens an API response reports"""
+        if usage is not None and metrics.enabled():
+            metrics.inc("llm_tokens", usage.prompt_tokens, kind="prompt", source="usage")
+            metrics.inc("llm_tokens", usage.completion_tokens, kind="completion", source="usage")
+
+    def _fallback(self, issue_data: Dict, reason: str) -> Dict:
+        """Heuristic analysis in place of the LLM, counted by reason"""
+        metrics.inc("analysis_fallbacks", reason=reason)
+        return self._sourced(self._demo_analysis(issue_data), "heuristic", reason)
+
+    @staticmethod
+    def _sourced(result: Dict, source: str, reason: Optional[str] = None) -> Dict:
+        """Copy of an analysis saying which path produced it (and why, for the heuristic)"""
+        result = dict(result)
+        result["source"] = source
+        if reason is not None:
+            result["fallback_reason"] = reason
+        return result
+
+    def _create(self, prompt: str, timeout: Optional[float], **params):
+        """One chat completion request for prompt; timeout None keeps the client's own"""
+        if timeout is not None:
+            params["timeout"] = timeout
+        return self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            **params
+        )
+
+    def _sampling_params(self) -> Dict:
+        """Sampling parameters sent with every completion request"""
+        return {"temperature": self.temperature, "max_tokens": self.max_tokens}
+
+    def _parse_completion(self, text: str) -> Dict:
+        """Extract and validate the JSON object from a completion"""
+        with metrics.span("parse_completion"):
+            start = text.find('{')
+            end = text.rfind('}') + 1
+            if start != -1 and end > start:
+                return self._validate_response(json.loads(text[start:end]))
+            raise ValueError("No JSON found in response")
+
+    def _demo_analysis(self, issue_data: Dict) -> Dict:
+        """Generate demo analysis without API key"""
+        return classify_issue(issue_data)
+
+    def _build_prompt(self, issue_data: Dict) -> str:
+        """Build analysis prompt from issue data within the prompt token budget"""
+        with metrics.span("prompt_build"):
+            prompt, stats = self.prompt_builder.build(issue_data)
+        metrics.observe("prompt_tokens", stats["tokens"], buckets=metrics.TOKEN_BUCKETS)
+        self.last_prompt_stats = stats
         return prompt
 
     def _validate_response(self, response: Dict) -> Dict:
         """Validate and clean response"""
-        required_fields = ["summary", "type", "priority_score", "suggested_labels", "potential_impact"]
-        
-        for field in required_fields:
+        for field in ANALYSIS_FIELDS:
             if field not in response:
                 response[field] = ""
         
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Mapping
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at ``capacity`` per minute.
+
+    ``acquire`` reserves its tokens at once, letting the level go negative,
+    and then sleeps until the refill has paid the debt back. Waiters are
+    served in arrival order, and the bucket holds no asyncio state, so it can
+    be shared across event loops (one ``asyncio.run`` after another).
+    """
+
+    def __init__(self, capacity: float):
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float):
+        """Wait until amount tokens are available, then take them"""
+        # A request larger than the whole bucket would wait forever; let it drain the bucket instead
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def credit(self, amount: float):
+        """Return (or, when negative, charge) tokens after the real cost is known"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def limit(self, remaining: float):
+        """Lower the level to what the server says is left; never raises it"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, float(remaining))
+
+    def level(self) -> float:
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+
+class RateLimitScheduler:
+    """Admits LLM requests under requests-per-minute and tokens-per-minute limits.
+
+    Callers reserve an estimated token count up front, then settle against the
+    usage the API actually reports. A 429 with Retry-After pauses every caller,
+    not just the one that got rejected, so the whole pool backs off together.
+    """
+
+    def __init__(self, rpm: int = 3500, tpm: int = 90000):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.paused_until = 0.0
+        self.throttled = 0
+
+    async def acquire(self, estimated_tokens: int):
+        """Wait for a request slot and an estimated_tokens share of the TPM budget"""
+        while True:
+            delay = self.paused_until - time.monotonic()
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        await self.requests.acquire(1)
+        await self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """Correct the TPM bucket once the response reports real usage"""
+        self.tokens.credit(estimated_tokens - actual_tokens)
+
+    def rejected(self, estimated_tokens: int, headers: Mapping[str, str]):
+        """Refund a request the API refused (429), then re-sync from its x-ratelimit-* headers"""
+        self.requests.credit(1)
+        self.tokens.credit(estimated_tokens)
+        for bucket, header in ((self.requests, "x-ratelimit-remaining-requests"),
+                               (self.tokens, "x-ratelimit-remaining-tokens")):
+            try:
+                bucket.limit(float(headers[header]))
+            except (KeyError, TypeError, ValueError):
+                pass
+
+    def pause(self, seconds: float):
+        """Hold all requests for seconds, e.g. after a 429 with Retry-After"""
+        self.throttled += 1
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def state(self) -> Dict:
+        """Current bucket levels, for logging and planning"""
+        return {
+            "requests_available": int(self.requests.level()),
+            "tokens_available": int(self.tokens.level()),
+            "paused_for": max(0.0, self.paused_until - time.monotonic()),
+            "throttled": self.throttled,
+        }
@@ -0,0 +1,212 @@
+"""Process-wide counters, histograms and timing spans for the fetch and analysis paths.
+
+Off by default. Turn it on with ``ISSUE_ASSISTANT_METRICS=1`` or ``enable()``;
+while it is off every helper returns after a single flag check, and ``span``
+hands back a shared no-op context manager. ``render()`` produces the
+OpenMetrics text exposition format for scraping or dumping to a file.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+PREFIX = "issue_assistant_"
+
+# Seconds; from a cached lookup up to a slow completion
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+_enabled = os.getenv("ISSUE_ASSISTANT_METRICS", "").strip().lower() in ("1", "true", "yes", "on")
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self, recent_spans: int = 200):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelSet, float]] = {}
+        self._histograms: Dict[str, Dict[LabelSet, _Histogram]] = {}
+        self._buckets: Dict[str, Sequence[float]] = {}
+        self.recent_spans = deque(maxlen=recent_spans)
+
+    def inc(self, name: str, value: float, labels: LabelSet):
+        with self._lock:
+            family = self._counters.setdefault(name, {})
+            family[labels] = family.get(labels, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: LabelSet, buckets: Optional[Sequence[float]] = None):
+        with self._lock:
+            family = self._histograms.setdefault(name, {})
+            histogram = family.get(labels)
+            if histogram is None:
+                bounds = self._buckets.setdefault(name, buckets or DURATION_BUCKETS)
+                histogram = family[labels] = _Histogram(bounds)
+            histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.recent_spans.clear()
+
+    def snapshot(self) -> Dict:
+        """Plain-dict copy of every series, for display or JSON export"""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(labels), "value": value} for labels, value in sorted(family.items())]
+                for name, family in sorted(self._counters.items())
+            }
+            histograms = {
+                name: [{"labels": dict(labels), "count": h.count, "sum": h.sum,
+                        "mean": h.sum / h.count if h.count else 0.0} for labels, h in sorted(family.items())]
+                for name, family in sorted(self._histograms.items())
+            }
+            spans = list(self.recent_spans)
+        return {"counters": counters, "histograms": histograms, "recent_spans": spans}
+
+    def render(self) -> str:
+        """OpenMetrics text exposition of every series"""
+        lines: List[str] = []
+        with self._lock:
+            for name, family in sorted(self._counters.items()):
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                for labels, value in sorted(family.items()):
+                    lines.append(f"{PREFIX}{name}_total{_format_labels(labels)} {_format_value(value)}")
+            for name, family in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                for labels, histogram in sorted(family.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        le = labels + (("le", _format_value(bound)),)
+                        lines.append(f"{PREFIX}{name}_bucket{_format_labels(le)} {cumulative}")
+                    le = labels + (("le", "+Inf"),)
+                    lines.append(f"{PREFIX}{name}_bucket{_format_labels(le)} {histogram.count}")
+                    lines.append(f"{PREFIX}{name}_count{_format_labels(labels)} {histogram.count}")
+                    lines.append(f"{PREFIX}{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+_local = threading.local()
+
+
+class _Span:
+    """Times a block into the stage_duration_seconds histogram and the recent-span log"""
+
+    __slots__ = ("stage", "labels", "started", "depth")
+
+    def __init__(self, stage: str, labels: LabelSet):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.depth = getattr(_local, "depth", 0)
+        _local.depth = self.depth + 1
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.started
+        # Decrement rather than restore: coroutines on one thread can close spans out of order
+        _local.depth = max(0, getattr(_local, "depth", 1) - 1)
+        labels = tuple(sorted((("stage", self.stage),) + self.labels))
+        REGISTRY.observe("stage_duration_seconds", duration, labels)
+        REGISTRY.recent_spans.append({
+            "stage": self.stage, "labels": dict(self.labels), "seconds": duration, "depth": self.depth,
+            "error": exc_type.__name__ if exc_type else None, "thread": threading.current_thread().name,
+            "ended_at": time.time(),
+        })
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable():
+    """Start recording (series recorded before stay in the registry)"""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def inc(name: str, value: float = 1, **labels):
+    """Add to a counter; labels become OpenMetrics labels"""
+    if _enabled:
+        REGISTRY.inc(name, value, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+
+def observe(name: str, value: float, buckets: Optional[Sequence[float]] = None, **labels):
+    """Record a histogram observation"""
+    if _enabled:
+        REGISTRY.observe(name, value, tuple(sorted((k, str(v)) for k, v in labels.items())), buckets)
+
+
+def span(stage: str, **labels):
+    """Context manager timing a named stage"""
+    if not _enabled:
+        return _NOOP_SPAN
+    return _Span(stage, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def snapshot() -> Dict:
+    return REGISTRY.snapshot()
+
+
+def reset():
+    REGISTRY.reset()
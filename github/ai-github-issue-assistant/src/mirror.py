@@ -0,0 +1,238 @@
+"""Local SQLite mirror of a repository's issues for incremental daily runs.
+
+``sync`` asks GitHub only for issues and comments updated since the last
+watermark, so a repeat sync costs a handful of requests. Every issue carries
+a hash of the content the analyzer sees; ``analyze_changed`` re-runs the
+analysis only where that hash differs from the one last analyzed.
+
+Comments deleted on GitHub are not reported by the ``since`` endpoints and
+therefore stay in the mirror.
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Iterator, Tuple
+from src.github_handler import GitHubHandler
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    repo TEXT, number INTEGER, title TEXT, body TEXT, state TEXT, labels TEXT,
+    created_at TEXT, updated_at TEXT, content_hash TEXT,
+    PRIMARY KEY (repo, number)
+);
+CREATE TABLE IF NOT EXISTS comments (
+    repo TEXT, id INTEGER, issue_number INTEGER, body TEXT, user TEXT,
+    created_at TEXT, updated_at TEXT,
+    PRIMARY KEY (repo, id)
+);
+CREATE INDEX IF NOT EXISTS comments_by_issue ON comments (repo, issue_number, created_at, id);
+CREATE TABLE IF NOT EXISTS analyses (
+    repo TEXT, number INTEGER, content_hash TEXT, analysis TEXT, analyzed_at REAL,
+    PRIMARY KEY (repo, number)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    repo TEXT PRIMARY KEY, issues_since TEXT, comments_since TEXT, synced_at REAL
+);
+"""
+
+
+class IssueMirror:
+    def __init__(self, path: str = ".issue_mirror.sqlite"):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _repo_key(repo_url: str) -> Tuple[str, str, str]:
+        owner, repo = GitHubHandler.parse_repo_url(repo_url)
+        return owner, repo, f"{owner}/{repo}".lower()
+
+    def sync(self, handler, repo_url: str) -> Dict:
+        """Pull issues and comments changed since the last sync"""
+        owner, repo, key = self._repo_key(repo_url)
+        row = self.conn.execute(
+            "SELECT issues_since, comments_since FROM sync_state WHERE repo = ?", (key,)
+        ).fetchone()
+        issues_since, comments_since = row if row else (None, None)
+        touched = set()
+
+        issue_count = 0
+        for issue in handler.list_issues(owner, repo, state="all", since=issues_since):
+            self.conn.execute(
+                "INSERT OR REPLACE INTO issues (repo, number, title, body, state, labels, created_at, updated_at, "
+                "content_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, "
+                "(SELECT content_hash FROM issues WHERE repo = ? AND number = ?))",
+                (key, issue["number"], issue.get("title", ""), issue.get("body", "") or "", issue.get("state", ""),
+                 json.dumps([label.get("name", "") for label in issue.get("labels", [])]),
+                 issue.get("created_at", ""), issue.get("updated_at", ""), key, issue["number"]),
+            )
+            touched.add(issue["number"])
+            issues_since = max(issues_since or "", issue.get("updated_at", ""))
+            issue_count += 1
+            if issue_count % 500 == 0:
+                self.conn.commit()
+
+        comment_count = 0
+        for comment in handler.list_repo_comments(owner, repo, since=comments_since):
+            number = int(comment.get("issue_url", "").rstrip("/").rsplit("/", 1)[-1])
+            self.conn.execute(
+                "INSERT OR REPLACE INTO comments VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, comment["id"], number, comment.get("body", "") or "",
+                 (comment.get("user") or {}).get("login", ""),
+                 comment.get("created_at", ""), comment.get("updated_at", "")),
+            )
+            touched.add(number)
+            comments_since = max(comments_since or "", comment.get("updated_at", ""))
+            comment_count += 1
+            if comment_count % 500 == 0:
+                self.conn.commit()
+
+        changed = 0
+        for number in touched:
+            changed += self._rehash(key, number)
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)", (key, issues_since, comments_since, time.time())
+        )
+        self.conn.commit()
+        return {"issues": issue_count, "comments": comment_count, "content_changed": changed}
+
+    def _rehash(self, key: str, number: int) -> int:
+        """Recompute an issue's content hash; returns 1 if it changed"""
+        issue = self._load(key, number)
+        if issue is None:
+            # Comments on pull requests have no issue row
+            return 0
+        material = json.dumps(
+            [issue["title"], issue["body"], issue["labels"], issue["state"], [c["body"] for c in issue["comments"]]]
+        )
+        content_hash = hashlib.sha256(material.encode("utf-8")).hexdigest()
+        cursor = self.conn.execute(
+            "UPDATE issues SET content_hash = ? WHERE repo = ? AND number = ? "
+            "AND (content_hash IS NULL OR content_hash != ?)",
+            (content_hash, key, number, content_hash),
+        )
+        return cursor.rowcount
+
+    def _load(self, key: str, number: int) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT title, body, labels, state, created_at, updated_at FROM issues WHERE repo = ? AND number = ?",
+            (key, number),
+        ).fetchone()
+        if row is None:
+            return None
+        comments = self.conn.execute(
+            "SELECT body, user FROM comments WHERE repo = ? AND issue_number = ? ORDER BY created_at, id",
+            (key, number),
+        ).fetchall()
+        return {
+            "number": number,
+            "title": row[0],
+            "body": row[1],
+            "comments": [{"body": body, "user": user} for body, user in comments],
+            "labels": json.loads(row[2]),
+            "state": row[3],
+            "created_at": row[4],
+            "updated_at": row[5],
+            "repo": key,
+        }
+
+    def issue_data(self, repo_url: str, number: int) -> Optional[Dict]:
+        """A mirrored issue in the fetch_complete_issue shape"""
+        _, _, key = self._repo_key(repo_url)
+        return self._load(key, number)
+
+    def changed_issues(self, repo_url: str) -> List[int]:
+        """Issue numbers whose content changed since they were last analyzed"""
+        _, _, key = self._repo_key(repo_url)
+        rows = self.conn.execute(
+            "SELECT i.number FROM issues i LEFT JOIN analyses a ON a.repo = i.repo AND a.number = i.number "
+            "WHERE i.repo = ? AND (a.content_hash IS NULL OR a.content_hash != i.content_hash) ORDER BY i.number",
+            (key,),
+        ).fetchall()
+        return [number for (number,) in rows]
+
+    def analysis(self, repo_url: str, number: int) -> Optional[Dict]:
+        """The last stored analysis for an issue"""
+        _, _, key = self._repo_key(repo_url)
+        row = self.conn.execute(
+            "SELECT analysis FROM analyses WHERE repo = ? AND number = ?", (key, number)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def analyze_changed(self, analyzer, repo_url: str, workers: int = 1,
+                        limit: Optional[int] = None) -> Iterator[Tuple[int, Dict]]:
+        """Run analyze_issue on changed issues only, storing each result with its content hash
+
+        Heuristic stand-ins for failed LLM calls are stored without a hash, so
+        the next run picks those issues up again.
+        """
+        from src.llm_analyzer import is_transient_fallback
+
+        _, _, key = self._repo_key(repo_url)
+        numbers = self.changed_issues(repo_url)
+        if limit is not None:
+            numbers = numbers[:limit]
+
+        # Analysis runs on worker threads; every SQLite access stays on this one
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            chunk_size = max(1, workers) * 4
+            for start in range(0, len(numbers), chunk_size):
+                chunk = numbers[start:start + chunk_size]
+                issues = [self._load(key, number) for number in chunk]
+                hashes = [self._content_hash(key, number) for number in chunk]
+                results = executor.map(analyzer.analyze_issue, issues)
+                for number, content_hash, result in zip(chunk, hashes, results):
+                    if is_transient_fallback(result):
+                        content_hash = None
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?)",
+                        (key, number, content_hash, json.dumps(result), time.time()),
+                    )
+                    self.conn.commit()
+                    yield number, result
+
+    def _content_hash(self, key: str, number: int) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT content_hash FROM issues WHERE repo = ? AND number = ?", (key, number)
+        ).fetchone()
+        return row[0] if row else None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sync a repository's issues into a local mirror")
+    parser.add_argument("repo_url", help="https://github.com/owner/repo")
+    parser.add_argument("--db", default=".issue_mirror.sqlite", help="Mirror database path")
+    parser.add_argument("--analyze", action="store_true", help="Re-analyze issues whose content changed")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--demo", action="store_true", help="Use the heuristic analyzer instead of OpenAI")
+    args = parser.parse_args(argv)
+
+    handler = GitHubHandler()
+    mirror = IssueMirror(args.db)
+    started = time.time()
+    stats = mirror.sync(handler, args.repo_url)
+    print(f"Synced {stats['issues']} issues and {stats['comments']} comments "
+          f"({stats['content_changed']} changed) in {time.time() - started:.1f}s", file=sys.stderr)
+
+    if args.analyze:
+        from src.llm_analyzer import LLMAnalyzer
+
+        analyzer = LLMAnalyzer(use_demo=args.demo)
+        for number, analysis in mirror.analyze_changed(analyzer, args.repo_url, workers=args.workers):
+            print(json.dumps({"number": number, "analysis": analysis}), flush=True)
+    mirror.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+"""Token-budgeted prompt construction for issue analysis.
+
+Instead of cutting the body at 2,000 characters and taking the first five
+comments, the builder:
+
+- collapses long fenced blocks and stack traces to their first and last lines,
+  and drops quoted replies and HTML template comments
+- drops reaction-only comments ("+1", "same here", "any update?")
+- ranks the remaining comments by how much new information they carry
+- fills a fixed token budget, counted with the model's own tokenizer
+
+Token counts use tiktoken when it is installed and its encoding can be
+loaded; otherwise they fall back to the usual ~4 characters per token.
+"""
+import re
+from typing import Dict, List, Tuple
+
+PROMPT_TEMPLATE = """Analyze this GitHub issue and return ONLY valid JSON (no markdown, no extra text).
+
+Issue Title: {title}
+
+Issue Body: {body}
+{comments_text}
+
+Return a JSON object with exactly this structure:
+{{
+  "summary": "One sentence summary of the issue",
+  "type": "bug | feature_request | documentation | question | other",
+  "priority_score": "1-5 with short justification",
+  "suggested_labels": ["label1", "label2", "label3"],
+  "potential_impact": "Short impact statement if bug, otherwise brief description"
+}}
+
+IMPORTANT: Return ONLY the JSON object, no markdown formatting, no extra text."""
+
+PACKED_PROMPT_TEMPLATE = """Analyze each of the {count} GitHub issues below and return ONLY a valid JSON array
+(no markdown, no extra text) with one object per issue.
+
+{issues}
+
+Each array element must have exactly this structure, with "id" set to the issue's id above:
+{{
+  "id": 1,
+  "summary": "One sentence summary of the issue",
+  "type": "bug | feature_request | documentation | question | other",
+  "priority_score": "1-5 with short justification",
+  "suggested_labels": ["label1", "label2", "label3"],
+  "potential_impact": "Short impact statement if bug, otherwise brief description"
+}}
+
+IMPORTANT: Return ONLY the JSON array, no markdown formatting, no extra text."""
+
+_FENCE_RE = re.compile(r"```[^\n]*\n(.*?)```", re.DOTALL)
+_HTML_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_TRACE_LINE_RE = re.compile(r"^\s+(at |File \"|\.\.\. \d+ more)|^\s*(Traceback|Caused by:)")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_NOISE_RE = re.compile(
+    r"^(\+1|-1|me too|same( here| issue| problem)?|any (update|news|progress)s?|bump|thanks?( you)?|"
+    r"ty|subscribing|following|\W*)[\s!.?]*$",
+    re.IGNORECASE,
+)
+_WORD_RE = re.compile(r"[a-zA-Z_][a-zA-Z0-9_]{3,}")
+_SIGNAL_RE = re.compile(
+    r"\b(reproduc\w*|steps|expected|actual|workaround|root cause|regression|version|stack ?trace|"
+    r"traceback|exception|error|fixed|bisect\w*)\b",
+    re.IGNORECASE,
+)
+_STOPWORDS = frozenset(
+    "this that with have from they there their what when which would could should about been were "
+    "also just like here some more into than then them these will your does doesn only same still "
+    "thanks issue".split()
+)
+
+
+def load_encoding(model: str):
+    """The model's tiktoken encoding, or None without tiktoken or when it can't be loaded"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except Exception:
+        # Unknown model name, or the encoding file can't be fetched offline
+        try:
+            return tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            return None
+
+
+def legacy_prompt(issue_data: Dict) -> str:
+    """The original character-truncated prompt, kept to measure savings against"""
+    comments_text = ""
+    comments = issue_data.get("comments", [])
+    if comments:
+        comments_text = "\n\nComments:\n"
+        for i, comment in enumerate(comments[:5], 1):
+            comments_text += f"{i}. {comment.get('body', '')[:500]}\n"
+    return PROMPT_TEMPLATE.format(title=issue_data.get("title", ""),
+                                  body=(issue_data.get("body", "") or "")[:2000],
+                                  comments_text=comments_text)
+
+
+def _collapse_lines(lines: List[str], keep_head: int, keep_tail: int) -> List[str]:
+    if len(lines) <= keep_head + keep_tail + 1:
+        return lines
+    omitted = len(lines) - keep_head - keep_tail
+    return lines[:keep_head] + [f"[... {omitted} lines omitted ...]"] + lines[-keep_tail:]
+
+
+def clean_text(text: str, max_block_lines: int = 12) -> str:
+    """Strip low-information bulk from issue or comment markdown"""
+    text = _HTML_COMMENT_RE.sub("", text or "").replace("\r\n", "\n")
+
+    def collapse_fence(match: re.Match) -> str:
+        lines = match.group(1).rstrip("\n").split("\n")
+        if len(lines) <= max_block_lines:
+            return match.group(0)
+        head = max_block_lines // 2
+        return "```\n" + "\n".join(_collapse_lines(lines, head, max_block_lines - head)) + "\n```"
+
+    text = _FENCE_RE.sub(collapse_fence, text)
+
+    # Quoted replies repeat earlier posts; runs of stack frames keep only their ends
+    out: List[str] = []
+    trace: List[str] = []
+    for line in text.split("\n"):
+        if _TRACE_LINE_RE.match(line):
+            trace.append(line)
+            continue
+        if trace:
+            out.extend(_collapse_lines(trace, 3, 2))
+            trace = []
+        if line.lstrip().startswith(">"):
+            continue
+        out.append(line)
+    if trace:
+        out.extend(_collapse_lines(trace, 3, 2))
+
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(out)).strip()
+
+
+def is_noise(text: str) -> bool:
+    """Whether a cleaned comment carries no information (reactions, bumps, thanks)"""
+    return len(text) < 40 and bool(_NOISE_RE.match(text.strip()))
+
+
+class PromptBuilder:
+    def __init__(self, model: str = "gpt-3.5-turbo", token_budget: int = 1000,
+                 body_share: float = 0.5, max_comment_tokens: int = 300):
+        self.model = model
+        self.token_budget = token_budget
+        self.body_share = body_share
+        self.max_comment_tokens = max_comment_tokens
+        self._encoding = None
+        self._encoding_loaded = False
+
+    @property
+    def encoding(self):
+        """tiktoken encoding, loaded on first use so demo-only runs never pay for it"""
+        if not self._encoding_loaded:
+            self._encoding = load_encoding(self.model)
+            self._encoding_loaded = True
+        return self._encoding
+
+    def count_tokens(self, text: str) -> int:
+        """Tokens text costs for the target model"""
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens tokens"""
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            return self.encoding.decode(tokens[:max_tokens]) + " [...]"
+        if len(text) <= max_tokens * 4:
+            return text
+        return text[:max_tokens * 4] + " [...]"
+
+    @staticmethod
+    def _score(text: str, seen: set) -> float:
+        """Information estimate: new distinct terms plus repro/diagnosis signals"""
+        terms = {w.lower() for w in _WORD_RE.findall(text)} - _STOPWORDS
+        novel = len(terms - seen)
+        signals = len(_SIGNAL_RE.findall(text))
+        code = 5 if "```" in text else 0
+        return novel + 3 * signals + code
+
+    def _sections(self, issue_data: Dict, token_budget: int) -> Tuple[str, List[Tuple[int, str]], bool]:
+        """Cleaned body and chosen (index, comment) pairs within a budget, and whether anything was cut"""
+        title = issue_data.get("title", "") or ""
+        full_body = clean_text(issue_data.get("body", "") or "")
+        body = self.truncate(full_body, int(token_budget * self.body_share))
+        cut = body != full_body
+        remaining = token_budget - self.count_tokens(body)
+
+        seen = {w.lower() for w in _WORD_RE.findall(title + " " + body)}
+        candidates = []
+        for index, comment in enumerate(issue_data.get("comments", []), 1):
+            text = clean_text(comment.get("body", ""))
+            if not text or is_noise(text):
+                continue
+            candidates.append((self._score(text, seen), index, text))
+
+        # Greedily take the most informative comments that fit, then restore thread order
+        chosen = []
+        for score, index, text in sorted(candidates, key=lambda c: (-c[0], c[1])):
+            if remaining <= 20:
+                break
+            text = self.truncate(text, min(self.max_comment_tokens, remaining - 10))
+            cost = self.count_tokens(text) + 6
+            if cost > remaining:
+                continue
+            chosen.append((index, text))
+            remaining -= cost
+        cut = cut or len(chosen) < len(candidates) or any(text.endswith(" [...]") for _, text in chosen)
+        return body, chosen, cut
+
+    def build(self, issue_data: Dict) -> Tuple[str, Dict]:
+        """Build the prompt and return it with token accounting stats"""
+        title = issue_data.get("title", "") or ""
+        frame_tokens = self.count_tokens(PROMPT_TEMPLATE.format(title=title, body="", comments_text=""))
+        body, chosen, _ = self._sections(issue_data, self.token_budget)
+
+        comments_text = ""
+        if chosen:
+            comments_text = "\n\nComments:\n"
+            for index, text in sorted(chosen):
+                comments_text += f"{index}. {text}\n"
+
+        prompt = PROMPT_TEMPLATE.format(title=title, body=body, comments_text=comments_text)
+        tokens = self.count_tokens(prompt)
+        legacy_tokens = self.count_tokens(legacy_prompt(issue_data))
+        stats = {
+            "tokens": tokens,
+            "legacy_tokens": legacy_tokens,
+            "saved_tokens": legacy_tokens - tokens,
+            "frame_tokens": frame_tokens,
+            "comments_used": len(chosen),
+            "comments_total": len(issue_data.get("comments", [])),
+            "exact": self.encoding is not None,
+        }
+        return prompt, stats
+
+    def packed_block(self, issue_data: Dict, issue_id: int, token_budget: int) -> Tuple[str, bool]:
+        """One issue's section of a packed prompt, and whether it had to be cut to fit"""
+        body, chosen, cut = self._sections(issue_data, token_budget)
+        block = f"### Issue id {issue_id}\nTitle: {issue_data.get('title', '') or ''}\nBody: {body}\n"
+        if chosen:
+            block += "Comments:\n" + "".join(f"{index}. {text}\n" for index, text in sorted(chosen))
+        return block, cut
+
+    @staticmethod
+    def packed_prompt(blocks: List[str]) -> str:
+        """Prompt asking for a JSON array of analyses, one per block"""
+        return PACKED_PROMPT_TEMPLATE.format(count=len(blocks), issues="\n".join(blocks))
@@ -0,0 +1,135 @@
+"""Compact issue and comment records.
+
+A raw GitHub comment carries ~30 fields (user object, reactions, URLs); the
+analysis only ever reads the body and the author's login. These ``__slots__``
+classes hold exactly the fetch_complete_issue fields, at a fraction of a
+dict's footprint, and answer ``get``/``[]`` like the dicts they replace so
+the prompt builder, heuristics and analyzers accept them unchanged.
+"""
+from typing import Any, Dict, List, Optional
+
+# object_pairs_hook whitelists: JSON objects are cut down to these keys while
+# parsing, so the discarded fields are never materialized as a whole
+COMMENT_FIELDS = frozenset(("body", "user", "login"))
+ISSUE_FIELDS = frozenset(("number", "title", "body", "labels", "name", "state", "created_at", "updated_at"))
+
+
+def comment_fields(pairs) -> Dict:
+    """json object_pairs_hook keeping only what a Comment needs"""
+    return {key: value for key, value in pairs if key in COMMENT_FIELDS}
+
+
+def issue_fields(pairs) -> Dict:
+    """json object_pairs_hook keeping only what an IssueRecord needs"""
+    return {key: value for key, value in pairs if key in ISSUE_FIELDS}
+
+
+class _Record:
+    __slots__ = ()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.__slots__:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__slots__
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and all(getattr(self, k) == getattr(other, k) for k in self.__slots__)
+
+    def __getstate__(self):
+        return tuple(getattr(self, k) for k in self.__slots__)
+
+    def __setstate__(self, state):
+        for key, value in zip(self.__slots__, state):
+            setattr(self, key, value)
+
+
+class Comment(_Record):
+    __slots__ = ("body", "user")
+
+    def __init__(self, body: str = "", user: str = ""):
+        self.body = body
+        self.user = user
+
+    @classmethod
+    def from_api(cls, data: Dict) -> "Comment":
+        """From a REST comment object (raw or cut down by comment_fields)"""
+        return cls(data.get("body", "") or "", (data.get("user") or {}).get("login", ""))
+
+    def to_dict(self) -> Dict:
+        return {"body": self.body, "user": self.user}
+
+    def __repr__(self) -> str:
+        return f"Comment(user={self.user!r}, body={self.body[:40]!r})"
+
+
+class IssueRecord(_Record):
+    __slots__ = ("number", "title", "body", "comments", "labels", "state", "created_at", "updated_at", "repo")
+
+    def __init__(self, number: Optional[int], title: str = "", body: str = "",
+                 comments: Optional[List[Comment]] = None, labels: Optional[List[str]] = None,
+                 state: str = "", created_at: str = "", updated_at: str = "", repo: str = ""):
+        self.number = number
+        self.title = title
+        self.body = body
+        self.comments = comments if comments is not None else []
+        self.labels = labels if labels is not None else []
+        self.state = state
+        self.created_at = created_at
+        self.updated_at = updated_at
+        # "owner/repo", so issues with the same number in different repositories stay apart
+        self.repo = repo
+
+    @classmethod
+    def from_api(cls, issue: Dict, comments: List[Comment], repo: str = "") -> "IssueRecord":
+        """From a REST issue object (raw or cut down by issue_fields) and its comments"""
+        return cls(
+            number=issue.get("number"),
+            title=issue.get("title", ""),
+            body=issue.get("body", ""),
+            comments=comments,
+            labels=[label.get("name", "") for label in issue.get("labels", [])],
+            state=issue.get("state", ""),
+            created_at=issue.get("created_at", ""),
+            updated_at=issue.get("updated_at", ""),
+            repo=repo,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IssueRecord":
+        """From the fetch_complete_issue dict shape"""
+        return cls(
+            number=data.get("number"),
+            title=data.get("title", ""),
+            body=data.get("body", ""),
+            comments=[Comment(c.get("body", ""), c.get("user", "")) for c in data.get("comments", [])],
+            labels=list(data.get("labels", [])),
+            state=data.get("state", ""),
+            created_at=data.get("created_at", ""),
+            updated_at=data.get("updated_at", ""),
+            repo=data.get("repo", ""),
+        )
+
+    def to_dict(self) -> Dict:
+        """The fetch_complete_issue dict shape (JSON-serializable)"""
+        return {
+            "number": self.number,
+            "title": self.title,
+            "body": self.body,
+            "comments": [comment.to_dict() for comment in self.comments],
+            "labels": list(self.labels),
+            "state": self.state,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "repo": self.repo,
+        }
+
+    def __repr__(self) -> str:
+        return f"IssueRecord(number={self.number!r}, title={self.title!r}, comments={len(self.comments)})"
@@ -0,0 +1,249 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+from src import metrics
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an LLM call (and its hedge, if any) misses its deadline"""
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Stops calling a failing upstream until it has had time to recover.
+
+    Closed, it counts outcomes over the last ``window`` calls and opens once at
+    least ``min_calls`` of them are in and ``failure_rate`` of them failed
+    (errors and timeouts alike). Open, every call is refused for ``cooldown``
+    seconds; after that it is half-open and lets a single probe through. A
+    successful probe closes the breaker, a failed one opens it for another
+    cooldown.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    _shared: Dict[str, "CircuitBreaker"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, failure_rate: float = 0.5, window: int = 20, min_calls: int = 5, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.clock = clock
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, upstream: str = "") -> "CircuitBreaker":
+        """Process-wide breaker for an upstream, so every analyzer sees the same outage"""
+        with cls._shared_lock:
+            if upstream not in cls._shared:
+                cls._shared[upstream] = cls()
+            return cls._shared[upstream]
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self.clock() - self.opened_at >= self.cooldown:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now; a True in half-open state claims the probe"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self.clock() - self.opened_at < self.cooldown:
+                    return False
+                self._transition(self.HALF_OPEN)
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record(self, success: bool):
+        """Report the outcome of a call that allow() let through"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probing = False
+                if success:
+                    self._outcomes.clear()
+                    self._transition(self.CLOSED)
+                else:
+                    self._open()
+                return
+            if self._state == self.OPEN:
+                # A call that started before the breaker opened; it says nothing new
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures >= self.failure_rate * len(self._outcomes):
+                self._open()
+
+    def _open(self):
+        self.opened_at = self.clock()
+        self._transition(self.OPEN)
+
+    def _transition(self, state: str):
+        if state != self._state:
+            self._state = state
+            metrics.inc("circuit_transitions", to=state)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            outcomes = list(self._outcomes)
+        return {"state": self.state, "recent_calls": len(outcomes), "recent_failures": outcomes.count(False)}
+
+
+class LatencyTracker:
+    """Recent successful call latencies, for picking a hedge delay"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._recent.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency at fraction (0-1) of recent calls, or None until there are enough samples"""
+        with self._lock:
+            if len(self._recent) < self.min_samples:
+                return None
+            ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ResilientCaller:
+    """Runs a blocking call under a deadline, an optional hedge and a circuit breaker.
+
+    ``call(fn)`` invokes ``fn(timeout)``, where ``timeout`` is the time left
+    before the deadline, so the SDK can also abandon the request on its own.
+    With ``hedge_percentile`` set (e.g. 0.95), a call still running after that
+    percentile of recent latencies gets a second, identical request and the
+    first answer wins. An attempt failing with one of ``retry_on`` is tried
+    again, up to ``retries`` times, after a short backoff that still fits the
+    deadline. Raises CircuitOpenError without calling while the breaker is
+    open, and DeadlineExceeded when no answer arrives in time. Errors in
+    ``not_failures`` (e.g. rate limiting) still show the upstream answering
+    and don't count against the breaker.
+
+    Clients called through it should have their own retries turned off, so
+    that an attempt abandoned at the deadline or beaten by a hedge stops
+    instead of retrying in the background.
+
+    Every attempt gets a thread of its own rather than a slot in a shared pool:
+    a queued attempt would spend its deadline waiting for a worker and be
+    counted against the breaker for congestion that is purely local.
+    """
+
+    def __init__(self, deadline: Optional[float] = 30.0, hedge_percentile: Optional[float] = None,
+                 breaker: Optional[CircuitBreaker] = None, name: str = "llm", retries: int = 0,
+                 retry_on: Tuple[type, ...] = (), retry_backoff: float = 0.5,
+                 not_failures: Tuple[type, ...] = ()):
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker
+        self.name = name
+        self.retries = retries
+        self.retry_on = retry_on
+        self.retry_backoff = retry_backoff
+        self.not_failures = not_failures
+        self.latency = LatencyTracker()
+
+    def _start(self, fn: Callable[[Optional[float]], T], timeout: Optional[float]) -> Future:
+        """Run fn(timeout) on a new daemon thread; an abandoned attempt ends with the SDK timeout"""
+        future: Future = Future()
+
+        def attempt():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(timeout))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=attempt, name=f"{self.name}-call", daemon=True).start()
+        return future
+
+    def call(self, fn: Callable[[Optional[float]], T]) -> T:
+        if self.breaker is not None and not self.breaker.allow():
+            metrics.inc("circuit_rejected", upstream=self.name)
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        started = time.perf_counter()
+        try:
+            result = self._run(fn)
+        except Exception as e:
+            if self.breaker is not None:
+                self.breaker.record(isinstance(e, self.not_failures))
+            raise
+        self.latency.add(time.perf_counter() - started)
+        if self.breaker is not None:
+            self.breaker.record(True)
+        return result
+
+    def _run(self, fn: Callable[[Optional[float]], T]) -> T:
+        hedge_after = None
+        if self.hedge_percentile is not None:
+            hedge_after = self.latency.percentile(self.hedge_percentile)
+        if self.deadline is None and hedge_after is None and not self.retries:
+            return fn(None)
+
+        started = time.monotonic()
+        expires = started + self.deadline if self.deadline is not None else None
+
+        def remaining() -> Optional[float]:
+            return None if expires is None else max(0.0, expires - time.monotonic())
+
+        pending = {self._start(fn, remaining())}
+        hedged = False
+        retried = 0
+        error: Optional[BaseException] = None
+        while pending:
+            timeout = remaining()
+            if not hedged and hedge_after is not None:
+                until_hedge = max(0.0, started + hedge_after - time.monotonic())
+                timeout = until_hedge if timeout is None else min(timeout, until_hedge)
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if hedged:
+                        metrics.inc("llm_hedges", upstream=self.name, outcome="answered")
+                    return future.result()
+                error = future.exception()
+            if pending and not done and not hedged and hedge_after is not None and remaining() != 0.0:
+                hedged = True
+                metrics.inc("llm_hedges", upstream=self.name, outcome="sent")
+                pending.add(self._start(fn, remaining()))
+            elif pending and remaining() == 0.0:
+                break
+            elif not pending and error is not None:
+                if retried >= self.retries or not isinstance(error, self.retry_on):
+                    raise error
+                backoff = self.retry_backoff * 2 ** retried
+                if expires is not None and time.monotonic() + backoff >= expires:
+                    raise error
+                retried += 1
+                metrics.inc("llm_retries", upstream=self.name, error=type(error).__name__)
+                time.sleep(backoff)
+                error = None
+                pending = {self._start(fn, remaining())}
+
+        metrics.inc("llm_deadline_exceeded", upstream=self.name)
+        raise DeadlineExceeded(f"{self.name} call took longer than {self.deadline:.1f}s")
@@ -0,0 +1,337 @@
+"""Streaming, resumable output for bulk triage runs.
+
+Results are written one flat row per issue as they arrive, so a run over tens
+of thousands of issues never holds more than a part's worth in memory:
+
+- ``.jsonl``: append-only JSON lines, flushed and fsynced every
+  ``checkpoint_every`` rows or ``checkpoint_interval`` seconds, whichever
+  comes first. A crash loses at most the rows since the last checkpoint.
+- a ``.parquet`` directory: columnar part files of ``rows_per_part`` rows,
+  each written to a temporary name and renamed into place (needs pyarrow).
+
+With ``resume=True`` the rows already on disk are kept, and ``completed``
+lists the issues to skip so their LLM calls aren't spent twice. ``merge``
+compacts JSONL files and part directories into one file, keeping the last
+row written for each issue.
+
+    python -m src triage https://github.com/owner/repo --output results.jsonl --resume
+    python -m src.results_writer merge results.jsonl parts.parquet --output results.parquet
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Set
+from src import metrics
+from src.llm_analyzer import ANALYSIS_FIELDS, is_transient_fallback
+
+ISSUE_COLUMNS = ["number", "title", "labels", "state", "created_at", "updated_at"]
+RESULT_COLUMNS = ISSUE_COLUMNS + ANALYSIS_FIELDS + ["source", "fallback_reason", "possible_duplicates", "error",
+                                                    "analyzed_at"]
+TIMESTAMP_COLUMNS = ("created_at", "updated_at", "analyzed_at")
+
+_PART_PATTERN = "part-*.parquet"
+
+
+def result_row(result: Dict) -> Dict:
+    """Flat output row for one triage result (number, issue, analysis, error)"""
+    issue = result.get("issue") or {}
+    analysis = result.get("analysis") or {}
+    row = {"number": result["number"]}
+    for column in ISSUE_COLUMNS[1:]:
+        row[column] = issue.get(column, [] if column == "labels" else None)
+    for field in ANALYSIS_FIELDS:
+        row[field] = analysis.get(field, [] if field == "suggested_labels" else None)
+    row["source"] = analysis.get("source")
+    row["fallback_reason"] = analysis.get("fallback_reason")
+    row["possible_duplicates"] = analysis.get("possible_duplicates")
+    row["error"] = result.get("error")
+    row["analyzed_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return row
+
+
+def _completed(rows: Iterator[Dict]) -> Set[int]:
+    """Issues with a usable row; failed ones and LLM fallbacks (other than demo mode) are retried on resume"""
+    return {row["number"] for row in rows if row.get("error") is None and not is_transient_fallback(row)}
+
+
+class JSONLResultsWriter:
+    """Append-only JSON lines with periodic fsync checkpoints"""
+
+    def __init__(self, path: str, resume: bool = False, checkpoint_every: int = 100,
+                 checkpoint_interval: float = 5.0):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self.completed: Set[int] = set()
+        if resume and os.path.exists(path):
+            self._drop_torn_line()
+            self.completed = _completed(read_jsonl(path))
+        self.file = open(path, "a" if resume else "w", encoding="utf-8")
+        self.written = 0
+        self._unsynced = 0
+        self._last_checkpoint = time.monotonic()
+
+    def _drop_torn_line(self):
+        """Cut a final line left half-written by a crash, so appends start on a fresh line"""
+        with open(self.path, "rb+") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # Walk back in blocks to the last complete line
+            position = size
+            while position > 0:
+                step = min(65536, position)
+                f.seek(position - step)
+                newline = f.read(step).rfind(b"\n")
+                if newline != -1:
+                    position = position - step + newline + 1
+                    break
+                position -= step
+            f.truncate(position)
+        print(f"⚠️  Dropped a partially written last line from {self.path}", file=sys.stderr)
+
+    def write(self, row: Dict):
+        self.file.write(json.dumps(row) + "\n")
+        self.written += 1
+        self._unsynced += 1
+        metrics.inc("results_written", format="jsonl")
+        if (self._unsynced >= self.checkpoint_every
+                or time.monotonic() - self._last_checkpoint >= self.checkpoint_interval):
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Flush and fsync everything written so far"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self._unsynced = 0
+        self._last_checkpoint = time.monotonic()
+        metrics.inc("results_checkpoints", format="jsonl")
+
+    def close(self):
+        if not self.file.closed:
+            self.checkpoint()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("pyarrow not installed. Install with: pip install pyarrow")
+    return pyarrow
+
+
+def parquet_schema():
+    """Arrow schema of a results row"""
+    pa = _pyarrow()
+    timestamp = pa.timestamp("s", tz="UTC")
+    return pa.schema([
+        ("number", pa.int64()),
+        ("title", pa.string()),
+        ("labels", pa.list_(pa.string())),
+        ("state", pa.string()),
+        ("created_at", timestamp),
+        ("updated_at", timestamp),
+        ("summary", pa.string()),
+        ("type", pa.string()),
+        ("priority_score", pa.string()),
+        ("suggested_labels", pa.list_(pa.string())),
+        ("potential_impact", pa.string()),
+        ("source", pa.string()),
+        ("fallback_reason", pa.string()),
+        ("possible_duplicates", pa.list_(pa.struct([("number", pa.int64()), ("score", pa.float64())]))),
+        ("error", pa.string()),
+        ("analyzed_at", timestamp),
+    ])
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _format_timestamp(value) -> Optional[str]:
+    if value is None:
+        return None
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _table(rows: List[Dict]):
+    pa = _pyarrow()
+    columns = {column: [row.get(column) for row in rows] for column in RESULT_COLUMNS}
+    for column in TIMESTAMP_COLUMNS:
+        columns[column] = [_parse_timestamp(value) for value in columns[column]]
+    return pa.table(columns, schema=parquet_schema())
+
+
+class ParquetResultsWriter:
+    """Directory of Parquet part files, each renamed into place once complete"""
+
+    def __init__(self, directory: str, resume: bool = False, rows_per_part: int = 1000):
+        self.pq = _pyarrow().parquet
+        self.directory = directory
+        self.rows_per_part = rows_per_part
+        os.makedirs(directory, exist_ok=True)
+        for stale in glob.glob(os.path.join(directory, _PART_PATTERN + ".tmp")):
+            # A part the last run crashed while writing; its rows were never counted as done
+            os.remove(stale)
+        parts = sorted(glob.glob(os.path.join(directory, _PART_PATTERN)))
+        self.completed: Set[int] = set()
+        if resume:
+            self.completed = _completed(read_parquet(directory))
+        else:
+            for part in parts:
+                os.remove(part)
+            parts = []
+        self._next_part = int(os.path.basename(parts[-1])[5:-8]) + 1 if parts else 0
+        self._rows: List[Dict] = []
+        self.written = 0
+
+    def write(self, row: Dict):
+        self._rows.append(row)
+        self.written += 1
+        metrics.inc("results_written", format="parquet")
+        if len(self._rows) >= self.rows_per_part:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Write the buffered rows out as the next part file"""
+        if not self._rows:
+            return
+        path = os.path.join(self.directory, f"part-{self._next_part:05d}.parquet")
+        self.pq.write_table(_table(self._rows), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self._next_part += 1
+        self._rows = []
+        metrics.inc("results_checkpoints", format="parquet")
+
+    def close(self):
+        self.checkpoint()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_writer(path: str, resume: bool = False, checkpoint_every: Optional[int] = None):
+    """JSONL writer for a .jsonl path, otherwise a Parquet part directory
+
+    ``checkpoint_every`` is the most rows a crash can lose: rows between fsyncs
+    for JSONL (default 100), rows per part file for Parquet (default 1000).
+    """
+    if path.endswith(".jsonl"):
+        return JSONLResultsWriter(path, resume=resume, checkpoint_every=checkpoint_every or 100)
+    return ParquetResultsWriter(path, resume=resume, rows_per_part=checkpoint_every or 1000)
+
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # A torn last line from a crash; the issue will simply be redone
+                continue
+
+
+def read_parquet(path: str, batch_size: int = 5000) -> Iterator[Dict]:
+    """Rows of a Parquet file or part directory, timestamps as ISO 8601 strings"""
+    pq = _pyarrow().parquet
+    files = sorted(glob.glob(os.path.join(path, _PART_PATTERN))) if os.path.isdir(path) else [path]
+    for file in files:
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=batch_size):
+            for row in batch.to_pylist():
+                for column in TIMESTAMP_COLUMNS:
+                    if column in row:
+                        row[column] = _format_timestamp(row[column])
+                yield row
+
+
+def read_rows(path: str) -> Iterator[Dict]:
+    return read_jsonl(path) if path.endswith(".jsonl") else read_parquet(path)
+
+
+def merge(inputs: List[str], output: str, rows_per_group: int = 5000) -> int:
+    """Compact JSONL files and Parquet parts into one file; returns the rows written
+
+    Later inputs (and later rows within one) win over earlier rows for the same
+    issue. Two streaming passes: the first finds each issue's last row, the
+    second writes only those, so memory stays at one int per issue.
+    """
+    last: Dict[int, int] = {}
+    for position, row in enumerate(row for path in inputs for row in read_rows(path)):
+        last[row["number"]] = position
+
+    def chosen() -> Iterator[Dict]:
+        for position, row in enumerate(row for path in inputs for row in read_rows(path)):
+            if last[row["number"]] == position:
+                yield row
+
+    written = 0
+    temporary = output + ".tmp"
+    if output.endswith(".jsonl"):
+        with open(temporary, "w", encoding="utf-8") as f:
+            for row in chosen():
+                f.write(json.dumps(row) + "\n")
+                written += 1
+            f.flush()
+            os.fsync(f.fileno())
+    else:
+        pq = _pyarrow().parquet
+        with pq.ParquetWriter(temporary, parquet_schema()) as writer:
+            group: List[Dict] = []
+            for row in chosen():
+                group.append(row)
+                if len(group) == rows_per_group:
+                    writer.write_table(_table(group))
+                    written += len(group)
+                    group = []
+            if group:
+                writer.write_table(_table(group))
+                written += len(group)
+    os.replace(temporary, output)
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Work with triage result files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    merge_parser = sub.add_parser("merge", help="Compact result files into one, keeping each issue's last row")
+    merge_parser.add_argument("inputs", nargs="+", help=".jsonl files and/or Parquet files or part directories")
+    merge_parser.add_argument("--output", required=True, help="A .jsonl or .parquet file")
+    args = parser.parse_args(argv)
+
+    try:
+        written = merge(args.inputs, args.output)
+    except Exception as e:
+        print(f"❌ Error: {str(e)}", file=sys.stderr)
+        return 1
+    print(f"Merged {written} results into {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Local near-duplicate index over issues (MinHash + LSH).
+
+Each issue becomes a set of tokens (title and body words, plus its labels)
+summarized by a fixed-size MinHash signature. Signatures live in a
+memory-mapped NumPy file, so a 100k-issue index opens without reading it all
+into memory. Lookup uses LSH banding: only issues that share at least one
+band bucket with the query are scored, which keeps queries sub-linear in the
+size of the index.
+
+Entries are keyed by (repository, number) and a query only returns issues of
+its own repository, so one index can serve several repositories. Each add
+writes only its memory-mapped row; the small metadata file (the row count)
+is rewritten every ``meta_every`` adds and on ``flush``/``close``, so a
+crash loses at most the adds since the last metadata write.
+"""
+import json
+import os
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]{3,}")
+_STOPWORDS = frozenset(
+    "the and for that this with when from have has are was were not but you your can will would should "
+    "could there their what which into then than also just like some any all issue using use".split()
+)
+_MAX_TOKENS = 2000
+_NUMBER_MASK = 0xFFFFFFFF
+
+
+def _repo_hash(repo: str) -> int:
+    """31-bit tag for a repository; 0 is kept for entries written without one"""
+    if not repo:
+        return 0
+    return (zlib.crc32(repo.lower().encode("utf-8")) & 0x7FFFFFFF) or 1
+
+
+def _key(repo: str, number: int) -> int:
+    """int64 key: repository tag in the high bits, issue number in the low 32"""
+    return (_repo_hash(repo) << 32) | (int(number) & _NUMBER_MASK)
+
+
+def issue_tokens(issue_data: Dict) -> List[str]:
+    """Distinct tokens describing an issue; title words count twice via a prefixed copy"""
+    title = (issue_data.get("title", "") or "").lower()
+    body = (issue_data.get("body", "") or "").lower()
+    tokens = set()
+    for word in _TOKEN_RE.findall(title):
+        if word not in _STOPWORDS:
+            tokens.add(word)
+            tokens.add("t:" + word)
+    for word in _TOKEN_RE.findall(body):
+        if word not in _STOPWORDS:
+            tokens.add(word)
+            if len(tokens) >= _MAX_TOKENS:
+                break
+    for label in issue_data.get("labels", []):
+        tokens.add("l:" + str(label).lower())
+    return sorted(tokens)
+
+
+class SimilarityIndex:
+    def __init__(self, path: str = ".similarity_index", num_perm: int = 128, bands: int = 32,
+                 min_score: float = 0.3, seed: int = 1, meta_every: int = 1000):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.path = path
+        self.min_score = min_score
+        self.meta_every = meta_every
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._meta_path = path + ".json"
+
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                meta = json.load(f)
+            num_perm, bands, seed = meta["num_perm"], meta["bands"], meta["seed"]
+            self.count, self.capacity = meta["count"], meta["capacity"]
+        else:
+            self.count, self.capacity = 0, 1024
+        self.num_perm, self.bands, self.seed = num_perm, bands, seed
+        self.rows_per_band = num_perm // bands
+
+        # Multiply-shift hash family: h(x) = (a * x + b) >> 32 over uint64, a odd
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self._band_mult = rng.integers(1, 2 ** 63, size=self.rows_per_band, dtype=np.uint64) | np.uint64(1)
+
+        self._open(self.capacity)
+        self._ids: Dict[int, int] = {int(key): row for row, key in enumerate(self.keys[:self.count])}
+
+        # Rows already on disk are bucketed in sorted arrays (one per band, built
+        # vectorized); rows added since opening go into small per-band dicts.
+        band_hashes = self._band_hashes(np.asarray(self.signatures[:self.count]))
+        self._sorted_rows = np.argsort(band_hashes, axis=0, kind="stable")
+        self._sorted_hashes = np.take_along_axis(band_hashes, self._sorted_rows, axis=0)
+        self._recent: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+
+    def _open(self, capacity: int):
+        """Map (or grow and remap) the signature and key files"""
+        sig_path, key_path = self.path + ".sig", self.path + ".keys"
+        for file_path, row_bytes in ((sig_path, self.num_perm * 4), (key_path, 8)):
+            mode = "r+b" if os.path.exists(file_path) else "w+b"
+            with open(file_path, mode) as f:
+                f.truncate(capacity * row_bytes)
+        self.signatures = np.memmap(sig_path, dtype=np.uint32, mode="r+", shape=(capacity, self.num_perm))
+        self.keys = np.memmap(key_path, dtype=np.int64, mode="r+", shape=(capacity,))
+        self.capacity = capacity
+
+    def signature(self, issue_data: Dict) -> Optional[np.ndarray]:
+        """MinHash signature of an issue's token set, or None for an issue with no tokens"""
+        tokens = issue_tokens(issue_data)
+        if not tokens:
+            # All-max signatures would match every other empty issue at 1.0
+            return None
+        hashed = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in tokens), dtype=np.uint64, count=len(tokens))
+        values = (self._a[:, None] * hashed[None, :] + self._b[:, None]) >> np.uint64(32)
+        return values.min(axis=1).astype(np.uint32)
+
+    def _band_hashes(self, signatures: np.ndarray) -> np.ndarray:
+        """One uint64 bucket hash per band for each signature row"""
+        bands = signatures.reshape(len(signatures), self.bands, self.rows_per_band).astype(np.uint64)
+        return (bands * self._band_mult).sum(axis=2, dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, number: int, issue_data: Dict, repo: str = ""):
+        """Insert or replace a repository's issue in the index (issues without any words are skipped)"""
+        signature = self.signature(issue_data)
+        if signature is None:
+            return
+        key = _key(repo, number)
+        with self._lock:
+            row = self._ids.get(key)
+            if row is None:
+                if self.count == self.capacity:
+                    self.signatures.flush()
+                    self.keys.flush()
+                    self._open(self.capacity * 2)
+                row = self.count
+                self.count += 1
+                self._ids[key] = row
+                self.keys[row] = key
+            # A replaced row may linger in its old buckets; that only adds a candidate to score
+            self.signatures[row] = signature
+            for band, band_hash in enumerate(self._band_hashes(signature[None, :])[0]):
+                self._recent[band].setdefault(int(band_hash), []).append(row)
+            # The memory-mapped rows are already in the page cache; the saved count makes them visible
+            self._unsaved += 1
+            if self._unsaved >= self.meta_every:
+                self._write_meta()
+
+    def query(self, issue_data: Dict, k: int = 5, exclude: Optional[int] = None,
+              repo: str = "") -> List[Tuple[int, float]]:
+        """Top-k (issue number, estimated Jaccard similarity) above min_score, within repo"""
+        signature = self.signature(issue_data)
+        if signature is None:
+            return []
+        with self._lock:
+            candidates = set()
+            for band, band_hash in enumerate(self._band_hashes(signature[None, :])[0]):
+                keys = self._sorted_hashes[:, band]
+                lo, hi = np.searchsorted(keys, band_hash, side="left"), np.searchsorted(keys, band_hash, side="right")
+                candidates.update(self._sorted_rows[lo:hi, band].tolist())
+                candidates.update(self._recent[band].get(int(band_hash), ()))
+            if exclude is not None:
+                candidates.discard(self._ids.get(_key(repo, exclude)))
+            if not candidates:
+                return []
+            rows = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            keys = np.asarray(self.keys[rows])
+            same_repo = (keys >> 32) == _repo_hash(repo)
+            rows, keys = rows[same_repo], keys[same_repo]
+            if not len(rows):
+                return []
+            scores = (self.signatures[rows] == signature).mean(axis=1)
+
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [(int(keys[i] & _NUMBER_MASK), float(scores[i])) for i in order if scores[i] >= self.min_score]
+
+    def _write_meta(self):
+        temporary = self._meta_path + ".tmp"
+        with open(temporary, "w") as f:
+            json.dump({"count": self.count, "capacity": self.capacity, "num_perm": self.num_perm,
+                       "bands": self.bands, "seed": self.seed}, f)
+        os.replace(temporary, self._meta_path)
+        self._unsaved = 0
+
+    def flush(self):
+        """Persist the signatures and index metadata to disk"""
+        with self._lock:
+            self.signatures.flush()
+            self.keys.flush()
+            self._write_meta()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
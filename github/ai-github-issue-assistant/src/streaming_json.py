@@ -0,0 +1,68 @@
+import json
+from typing import Any, List, Tuple
+
+
+class IncrementalJSONParser:
+    """Emits the top-level members of a JSON object as soon as each one is complete.
+
+    Feed it text chunks as they stream in. Anything before the first ``{`` is
+    skipped (models like to prepend prose or a code fence), and ``done`` turns
+    true once the object's closing brace arrives. Members that fail to parse
+    are skipped rather than aborting the stream.
+    """
+
+    def __init__(self):
+        self.done = False
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member: List[str] = []
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return the (key, value) pairs it completed"""
+        completed = []
+        for char in chunk:
+            if self.done:
+                break
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._member.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+
+            # A comma or the closing brace at depth 1 ends the current member
+            if (char == "," and self._depth == 1) or self._depth == 0:
+                completed.extend(self._flush())
+                if self._depth == 0:
+                    self.done = True
+                continue
+            self._member.append(char)
+        return completed
+
+    def _flush(self) -> List[Tuple[str, Any]]:
+        member = "".join(self._member).strip()
+        self._member = []
+        if not member:
+            return []
+        try:
+            return list(json.loads("{" + member + "}").items())
+        except json.JSONDecodeError:
+            return []
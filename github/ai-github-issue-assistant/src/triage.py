@@ -0,0 +1,227 @@
+"""Bulk triage: stream a repository's issues through fetch and analysis.
+
+The pipeline has three stages connected by bounded queues:
+
+    list issues -> fetch_complete_issue (N threads) -> analyze_issue (M threads)
+
+Each queue holds at most ``queue_size`` items, so a slow stage blocks the one
+before it instead of letting work pile up in memory. Results are yielded in
+completion order as soon as each analysis finishes.
+"""
+import argparse
+import json
+import queue
+import sys
+import threading
+from typing import Optional, Dict, List, Iterator, Collection
+from src.records import IssueRecord
+
+_DONE = object()
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Blocking put that gives up once the pipeline is stopped"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _get(q: queue.Queue, stop: threading.Event):
+    """Blocking get that returns _DONE once the pipeline is stopped"""
+    while not stop.is_set():
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+    return _DONE
+
+
+def triage_repository(handler, analyzer, repo_url: str, state: str = "open",
+                      labels: Optional[List[str]] = None, since: Optional[str] = None,
+                      fetch_workers: int = 4, analyze_workers: int = 2, queue_size: int = 16,
+                      limit: Optional[int] = None, use_graphql: bool = False,
+                      batch_size: int = 25, skip: Optional[Collection[int]] = None) -> Iterator[Dict]:
+    """Analyze every matching issue in a repository, yielding results as they complete
+
+    Each result is a dict with ``number``, ``issue`` (a compact IssueRecord, which
+    reads like the fetch_complete_issue dict; ``to_dict()`` gives that dict),
+    ``analysis`` and ``error``; a failed issue carries the error message instead of
+    stopping the run. With ``use_graphql`` the fetch stage pulls ``batch_size``
+    issues per GraphQL round trip instead of 1 + N REST calls each. Issue numbers
+    in ``skip`` (e.g. already written by an earlier run) are neither fetched
+    nor analyzed, but still count towards ``limit``.
+    """
+    owner, repo = handler.parse_repo_url(repo_url)
+    numbers: queue.Queue = queue.Queue(maxsize=queue_size)
+    fetched: queue.Queue = queue.Queue(maxsize=queue_size)
+    results: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    lister_error: List[Exception] = []
+    fetchers_left = [fetch_workers]
+    fetchers_lock = threading.Lock()
+
+    def list_stage():
+        try:
+            batch = []
+            for count, issue in enumerate(handler.list_issues(owner, repo, state=state, labels=labels, since=since)):
+                if limit is not None and count >= limit:
+                    break
+                if skip and issue["number"] in skip:
+                    continue
+                if not use_graphql:
+                    if not _put(numbers, issue["number"], stop):
+                        return
+                    continue
+                batch.append(issue["number"])
+                if len(batch) == batch_size:
+                    if not _put(numbers, batch, stop):
+                        return
+                    batch = []
+            if batch:
+                _put(numbers, batch, stop)
+        except Exception as e:
+            lister_error.append(e)
+        finally:
+            for _ in range(fetch_workers):
+                _put(numbers, _DONE, stop)
+
+    def _fetch(work) -> List:
+        """Fetch one issue number, or a batch of them over GraphQL"""
+        if not use_graphql:
+            try:
+                # Records keep only the fields analysis reads, so queued issues stay small
+                return [(work, handler.fetch_issue_record(repo_url, work), None)]
+            except Exception as e:
+                return [(work, None, str(e))]
+        try:
+            issues = handler.fetch_issues_batch(repo_url, work, batch_size=batch_size)
+        except Exception as e:
+            return [(number, None, str(e)) for number in work]
+        return [(number, IssueRecord.from_dict(issues[number]), None) if number in issues
+                else (number, None, "Issue not found") for number in work]
+
+    def fetch_stage():
+        try:
+            while not stop.is_set():
+                work = _get(numbers, stop)
+                if work is _DONE:
+                    break
+                for item in _fetch(work):
+                    if not _put(fetched, item, stop):
+                        return
+        finally:
+            # The last fetcher out tells the analyzers no more work is coming
+            with fetchers_lock:
+                fetchers_left[0] -= 1
+                last = fetchers_left[0] == 0
+            if last:
+                for _ in range(analyze_workers):
+                    _put(fetched, _DONE, stop)
+
+    def analyze_stage():
+        try:
+            while not stop.is_set():
+                item = _get(fetched, stop)
+                if item is _DONE:
+                    break
+                number, issue, error = item
+                analysis = None
+                if error is None:
+                    try:
+                        analysis = analyzer.analyze_issue(issue)
+                    except Exception as e:
+                        error = str(e)
+                if not _put(results, {"number": number, "issue": issue, "analysis": analysis, "error": error}, stop):
+                    return
+        finally:
+            _put(results, _DONE, stop)
+
+    threads = [threading.Thread(target=list_stage, daemon=True)]
+    threads += [threading.Thread(target=fetch_stage, daemon=True) for _ in range(fetch_workers)]
+    threads += [threading.Thread(target=analyze_stage, daemon=True) for _ in range(analyze_workers)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        remaining = analyze_workers
+        while remaining:
+            result = results.get()
+            if result is _DONE:
+                remaining -= 1
+                continue
+            yield result
+        if lister_error:
+            raise Exception(f"Error listing issues: {str(lister_error[0])}")
+    finally:
+        # Consumer finished or walked away early; unblock every stage
+        stop.set()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Triage every matching issue in a GitHub repository")
+    parser.add_argument("repo_url", help="https://github.com/owner/repo")
+    parser.add_argument("--state", default="open", choices=["open", "closed", "all"])
+    parser.add_argument("--labels", default="", help="Comma-separated label filter")
+    parser.add_argument("--since", default=None, help="Only issues updated at or after this ISO 8601 timestamp")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many issues")
+    parser.add_argument("--fetch-workers", type=int, default=4)
+    parser.add_argument("--analyze-workers", type=int, default=2)
+    parser.add_argument("--graphql", action="store_true", help="Fetch issues in batched GraphQL queries (needs GITHUB_TOKEN)")
+    parser.add_argument("--demo", action="store_true", help="Use the heuristic analyzer instead of OpenAI")
+    parser.add_argument("--output", help="Write results to a .jsonl file or a Parquet part directory instead of stdout")
+    parser.add_argument("--resume", action="store_true", help="Keep --output's existing results and skip those issues")
+    parser.add_argument("--checkpoint-every", type=int, default=None,
+                        help="Rows between fsyncs (JSONL) or per part file (Parquet)")
+    parser.add_argument("--similarity-index", metavar="PATH",
+                        help="Report possible duplicates from (and add every issue to) this index")
+    args = parser.parse_args(argv)
+    if args.resume and not args.output:
+        parser.error("--resume needs --output")
+
+    from src.github_handler import GitHubHandler
+    from src.llm_analyzer import LLMAnalyzer
+
+    labels = [label.strip() for label in args.labels.split(",") if label.strip()]
+    handler = GitHubHandler()
+    similarity_index = None
+    if args.similarity_index:
+        from src.similarity import SimilarityIndex
+
+        similarity_index = SimilarityIndex(args.similarity_index)
+    analyzer = LLMAnalyzer(use_demo=args.demo, similarity_index=similarity_index)
+
+    writer = None
+    if args.output:
+        from src.results_writer import open_writer, result_row
+
+        writer = open_writer(args.output, resume=args.resume, checkpoint_every=args.checkpoint_every)
+        if writer.completed:
+            print(f"Resuming: skipping {len(writer.completed)} issues already in {args.output}", file=sys.stderr)
+
+    try:
+        for result in triage_repository(handler, analyzer, args.repo_url, state=args.state, labels=labels,
+                                        since=args.since, fetch_workers=args.fetch_workers,
+                                        analyze_workers=args.analyze_workers, limit=args.limit,
+                                        use_graphql=args.graphql, skip=writer.completed if writer else None):
+            if writer is not None:
+                writer.write(result_row(result))
+                continue
+            issue = result["issue"] or {}
+            line = {"number": result["number"], "title": issue.get("title", ""),
+                    "analysis": result["analysis"], "error": result["error"]}
+            print(json.dumps(line), flush=True)
+    finally:
+        if similarity_index is not None:
+            similarity_index.close()
+        if writer is not None:
+            writer.close()
+            print(f"Wrote {writer.written} results to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
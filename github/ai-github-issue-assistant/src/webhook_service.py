@@ -0,0 +1,378 @@
+"""Webhook service: analyze issues as GitHub reports them opened, edited or commented on.
+
+GitHub POSTs ``issues`` and ``issue_comment`` events to this asyncio HTTP
+server. Each delivery is checked against ``X-Hub-Signature-256`` and turned
+into a (repo, issue number) work item on a coalescing queue: while an item
+waits out its debounce window, further events for the same issue only push
+the window back, and events arriving mid-analysis schedule exactly one rerun.
+A fixed pool of workers drains the queue using the same GitHubHandler and
+LLMAnalyzer as the rest of the app.
+
+Run it, or replay recorded deliveries without a network:
+
+    python -m src.webhook_service --port 8080 --secret $GITHUB_WEBHOOK_SECRET
+    python -m src.webhook_service --replay deliveries.jsonl --demo
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, List, Set, Tuple
+from src import metrics
+
+Key = Tuple[str, int]
+
+ISSUE_ACTIONS = {"opened", "edited", "reopened", "labeled", "unlabeled", "transferred"}
+COMMENT_ACTIONS = {"created", "edited", "deleted"}
+MAX_BODY_BYTES = 25 * 1024 * 1024  # GitHub caps webhook payloads at 25 MB
+
+
+def verify_signature(secret: str, body: bytes, signature: str) -> bool:
+    """Check an X-Hub-Signature-256 header against the raw request body"""
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def sign(secret: str, body: bytes) -> str:
+    """The X-Hub-Signature-256 value GitHub would send for a body"""
+    return "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+class CoalescingQueue:
+    """Work queue holding at most one pending entry per key.
+
+    ``put`` on a key that is already waiting moves its due time back by the
+    debounce window; ``put`` on a key that is being processed marks it to run
+    once more after ``done``. Keys come out of ``get`` once due, oldest first.
+    """
+
+    def __init__(self, debounce: float = 2.0, max_pending: int = 10000):
+        self.debounce = debounce
+        self.max_pending = max_pending
+        self._due: Dict[Key, float] = {}
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._running: Set[Key] = set()
+        self._rerun: Set[Key] = set()
+        self.stats = {"accepted": 0, "coalesced": 0, "rejected": 0}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def put(self, key: Key) -> bool:
+        """Schedule a key; False if the queue is full"""
+        if key in self._running:
+            self._rerun.add(key)
+            self.stats["coalesced"] += 1
+            return True
+        now = asyncio.get_running_loop().time()
+        if key in self._due:
+            self._due[key] = now + self.debounce
+            self.stats["coalesced"] += 1
+            return True
+        if len(self._due) >= self.max_pending:
+            self.stats["rejected"] += 1
+            return False
+        self._due[key] = now + self.debounce
+        self._ready.put_nowait(key)
+        self.stats["accepted"] += 1
+        return True
+
+    async def get(self) -> Key:
+        loop = asyncio.get_running_loop()
+        while True:
+            key = await self._ready.get()
+            delay = self._due[key] - loop.time()
+            if delay > 0:
+                # Not due yet (or pushed back by a newer event): requeue it when it is
+                loop.call_later(delay, self._ready.put_nowait, key)
+                continue
+            del self._due[key]
+            self._running.add(key)
+            return key
+
+    def done(self, key: Key):
+        self._running.discard(key)
+        if key in self._rerun:
+            self._rerun.discard(key)
+            self.put(key)
+
+    def idle(self) -> bool:
+        return not self._due and not self._running
+
+
+class WebhookService:
+    def __init__(self, handler, analyzer, secret: Optional[str] = None, workers: int = 4,
+                 debounce: float = 2.0, max_pending: int = 10000,
+                 on_result: Optional[Callable[[Dict], None]] = None, max_results: int = 1000):
+        self.handler = handler
+        self.analyzer = analyzer
+        self.secret = secret
+        self.workers = max(1, workers)
+        self.queue = CoalescingQueue(debounce=debounce, max_pending=max_pending)
+        self.on_result = on_result or (lambda result: print(json.dumps(result), flush=True))
+        # Latest result per issue, least recently updated dropped first; on_result is the durable output
+        self.max_results = max_results
+        self.results: "OrderedDict[Key, Dict]" = OrderedDict()
+        # Issue content carried by the latest event, used when it has no comments to fetch
+        self._payload_issues: Dict[Key, Dict] = {}
+        self.stats = {"events": 0, "ignored": 0, "bad_signature": 0, "analyzed": 0, "failed": 0}
+        self._tasks: List[asyncio.Task] = []
+
+    # -- events ---------------------------------------------------------------
+
+    def handle_event(self, event: str, payload: Dict) -> str:
+        """Queue the work a webhook event implies; returns what was done with it
+
+        This is the entry point for replayed deliveries too: signatures are the
+        HTTP layer's concern, so tests can call it with recorded payloads directly.
+        """
+        self.stats["events"] += 1
+        metrics.inc("webhook_events", event=event, action=payload.get("action", ""))
+        if event == "ping":
+            return "pong"
+        if event == "issues":
+            if payload.get("action") not in ISSUE_ACTIONS:
+                return self._ignore("action")
+        elif event == "issue_comment":
+            if payload.get("action") not in COMMENT_ACTIONS:
+                return self._ignore("action")
+        else:
+            return self._ignore("event")
+
+        issue = payload.get("issue") or {}
+        repository = payload.get("repository") or {}
+        repo = repository.get("full_name", "") if isinstance(repository, dict) else ""
+        if (not isinstance(issue, dict) or "pull_request" in issue or not isinstance(repo, str) or not repo
+                or not isinstance(issue.get("number"), int)):
+            return self._ignore("not_an_issue")
+
+        key = (repo.lower(), issue["number"])
+        if not self.queue.put(key):
+            return "queue_full"
+        self._payload_issues[key] = issue
+        return "queued"
+
+    def _ignore(self, reason: str) -> str:
+        self.stats["ignored"] += 1
+        return "ignored:" + reason
+
+    # -- workers --------------------------------------------------------------
+
+    def _issue_from_payload(self, issue: Dict, repo: str = "") -> Dict:
+        """The fetch_complete_issue shape built from a webhook's issue object"""
+        return {
+            "number": issue.get("number"),
+            "title": issue.get("title", ""),
+            "body": issue.get("body", "") or "",
+            "comments": [],
+            "labels": [label.get("name", "") for label in issue.get("labels", [])],
+            "state": issue.get("state", ""),
+            "created_at": issue.get("created_at", ""),
+            "updated_at": issue.get("updated_at", ""),
+            "repo": repo,
+        }
+
+    def _process(self, key: Key) -> Dict:
+        """Fetch and analyze one issue (runs on a worker thread)"""
+        repo, number = key
+        payload_issue = self._payload_issues.pop(key, None)
+        if payload_issue is not None and payload_issue.get("comments") == 0:
+            # Nothing beyond the payload to fetch
+            issue_data = self._issue_from_payload(payload_issue, repo)
+        else:
+            issue_data = self.handler.fetch_complete_issue(f"https://github.com/{repo}", number)
+        return {"repo": repo, "number": number, "analysis": self.analyzer.analyze_issue(issue_data)}
+
+    async def _worker(self):
+        while True:
+            key = await self.queue.get()
+            try:
+                result = await asyncio.to_thread(self._process, key)
+                result["error"] = None
+                self.stats["analyzed"] += 1
+            except Exception as e:
+                result = {"repo": key[0], "number": key[1], "analysis": None, "error": str(e)}
+                self.stats["failed"] += 1
+            finally:
+                self.queue.done(key)
+            self.results[key] = result
+            self.results.move_to_end(key)
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+            try:
+                self.on_result(result)
+            except Exception as e:
+                print(f"⚠️  Result handler failed for {key[0]}#{key[1]}: {str(e)}", file=sys.stderr)
+
+    def start_workers(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def drain(self, poll: float = 0.05):
+        """Wait until nothing is pending or running"""
+        while not self.queue.idle():
+            await asyncio.sleep(poll)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def state(self) -> Dict:
+        return {**self.stats, **self.queue.stats, "pending": len(self.queue)}
+
+    # -- HTTP -----------------------------------------------------------------
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, body,
+                       content_type: str = "application/json", keep_alive: bool = True):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        reason = {200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+                  405: "Method Not Allowed", 413: "Payload Too Large", 503: "Service Unavailable"}[status]
+        head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path, _ = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "bad request line"}, keep_alive=False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get("connection", "").lower() != "close"
+
+                length_header = headers.get("content-length", "") or "0"
+                if not length_header.isdigit():
+                    await self._respond(writer, 400, {"error": "bad Content-Length"}, keep_alive=False)
+                    break
+                length = int(length_header)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": "payload too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, response, content_type = self._route(method, path, headers, body)
+                await self._respond(writer, status, response, content_type, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _route(self, method: str, path: str, headers: Dict, body: bytes):
+        path = path.split("?", 1)[0]
+        if method == "GET" and path == "/healthz":
+            return 200, self.state(), "application/json"
+        if method == "GET" and path == "/metrics":
+            return 200, metrics.render().encode("utf-8"), "application/openmetrics-text; version=1.0.0"
+        if path != "/webhook":
+            return 404, {"error": "not found"}, "application/json"
+        if method != "POST":
+            return 405, {"error": "POST only"}, "application/json"
+
+        if self.secret and not verify_signature(self.secret, body, headers.get("x-hub-signature-256", "")):
+            self.stats["bad_signature"] += 1
+            return 401, {"error": "bad signature"}, "application/json"
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            return 400, {"error": "invalid JSON"}, "application/json"
+        if not isinstance(payload, dict):
+            return 400, {"error": "payload must be a JSON object"}, "application/json"
+
+        outcome = self.handle_event(headers.get("x-github-event", ""), payload)
+        if outcome == "queue_full":
+            return 503, {"result": outcome}, "application/json"
+        return 202 if outcome == "queued" else 200, {"result": outcome}, "application/json"
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        """Start the workers and the HTTP listener"""
+        self.start_workers()
+        return await asyncio.start_server(self._handle_connection, host, port)
+
+
+async def replay(service: WebhookService, path: str) -> Dict:
+    """Feed recorded deliveries (JSON lines of {"event", "payload"}) through the service"""
+    service.start_workers()
+    outcomes: Dict[str, int] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            delivery = json.loads(line)
+            outcome = service.handle_event(delivery.get("event", ""), delivery.get("payload") or {})
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    await service.drain()
+    await service.stop()
+    return outcomes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from src.env import load_env
+
+    load_env()
+    parser = argparse.ArgumentParser(description="Analyze issues from GitHub webhooks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--secret", default=os.getenv("GITHUB_WEBHOOK_SECRET"),
+                        help="Webhook secret (default: GITHUB_WEBHOOK_SECRET)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--debounce", type=float, default=2.0, help="Seconds to wait for an issue's edits to settle")
+    parser.add_argument("--demo", action="store_true", help="Use the heuristic analyzer instead of OpenAI")
+    parser.add_argument("--replay", help="JSON lines of recorded deliveries to process instead of serving")
+    args = parser.parse_args(argv)
+
+    from src.github_handler import GitHubHandler
+    from src.http_cache import HTTPCache
+    from src.llm_analyzer import LLMAnalyzer
+
+    handler = GitHubHandler(max_workers=max(8, args.workers * 2), cache=HTTPCache())
+    analyzer = LLMAnalyzer(use_demo=args.demo)
+
+    if args.replay:
+        service = WebhookService(handler, analyzer, workers=args.workers, debounce=0)
+        started = time.time()
+        outcomes = asyncio.run(replay(service, args.replay))
+        print(f"Replayed {sum(outcomes.values())} deliveries in {time.time() - started:.1f}s: "
+              f"{json.dumps(outcomes)} {json.dumps(service.state())}", file=sys.stderr)
+        return 0
+
+    if not args.secret:
+        print("⚠️  No webhook secret set; deliveries will not be verified", file=sys.stderr)
+    service = WebhookService(handler, analyzer, secret=args.secret, workers=args.workers, debounce=args.debounce)
+
+    async def run():
+        server = await service.serve(args.host, args.port)
+        print(f"Listening on http://{args.host}:{args.port}/webhook", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import json
+
+from src.batch_api import read_results, sidecar_path, write_requests
+from src.llm_analyzer import LLMAnalyzer
+
+ANALYSIS = {"summary": "Saving crashes", "type": "bug", "priority_score": "4", "suggested_labels": ["bug"],
+            "potential_impact": "Data loss"}
+
+
+def issue(number, body="Saving crashes the app."):
+    return {"number": number, "title": f"Issue {number}", "body": body, "labels": [], "comments": []}
+
+
+def output_line(custom_id, content=None, status=200, error=None):
+    body = {"choices": [{"message": {"role": "assistant", "content": content}}]} if content is not None else {}
+    return json.dumps({"custom_id": custom_id, "error": error,
+                       "response": {"status_code": status, "body": body}}) + "\n"
+
+
+def test_write_packs_short_issues_and_keeps_long_ones_alone(tmp_path):
+    path = str(tmp_path / "batch.jsonl")
+    issues = [issue(1), issue(2), issue(3, body="long " * 3000), issue(4)]
+    assert write_requests(LLMAnalyzer(use_demo=True), issues, path, pack_size=2) == 3
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line)["custom_id"] for line in f] == ["pack:1,2", "issue:3", "pack:4"]
+    with open(sidecar_path(path), encoding="utf-8") as f:
+        assert [json.loads(line)["number"] for line in f] == [1, 2, 3, 4]
+
+
+def test_read_maps_every_issue_and_falls_back_per_entry(tmp_path):
+    path = tmp_path / "output.jsonl"
+    packed = json.dumps([{"id": 1, **ANALYSIS}]) + ', {"id": 2, "summary": "cut'
+    path.write_text(
+        output_line("pack:1,2", packed)
+        + output_line("issue:3", json.dumps(ANALYSIS))
+        + output_line("issue:4", status=500, error={"message": "server error"})
+        + output_line("issue:5", "not json at all"),
+        encoding="utf-8",
+    )
+    issues = {number: issue(number) for number in range(1, 7)}
+    results = {number: (analysis, source)
+               for number, analysis, source in read_results(LLMAnalyzer(use_demo=True), str(path), issues)}
+
+    assert sorted(results) == [1, 2, 3, 4, 5, 6]
+    assert {number for number, (_, source) in results.items() if source == "llm"} == {1, 3}
+    assert results[1][0]["summary"] == "Saving crashes"
+    # Heuristic stand-ins for the garbled, failed, unparseable and missing entries
+    assert all(set(ANALYSIS) <= set(results[number][0]) for number in (2, 4, 5, 6))
@@ -0,0 +1,36 @@
+import json
+from types import SimpleNamespace
+
+import src.llm_analyzer
+from src import cli
+from src.resilience import CircuitBreaker
+
+ISSUE = {"number": 7, "title": "Crash when saving", "body": "Saving a large file crashes the app.",
+         "labels": ["bug"], "state": "open", "comments": []}
+
+
+class FailingAnalyzer(src.llm_analyzer.LLMAnalyzer):
+    """A real-mode analyzer whose every completion request fails"""
+
+    def __init__(self, **options):
+        super().__init__(use_demo=True, breaker=CircuitBreaker(), deadline=1.0)
+        self.use_demo = False
+
+        def create(**params):
+            raise RuntimeError("502 Bad Gateway")
+
+        self.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_analyze_stdout_stays_json_when_the_llm_fails(tmp_path, monkeypatch, capsys):
+    path = tmp_path / "issue.json"
+    path.write_text(json.dumps(ISSUE), encoding="utf-8")
+    monkeypatch.setattr(src.llm_analyzer, "LLMAnalyzer", FailingAnalyzer)
+
+    assert cli.main(["analyze", "--input", str(path)]) == 0
+
+    captured = capsys.readouterr()
+    analysis = json.loads(captured.out)
+    assert analysis["source"] == "heuristic"
+    assert analysis["fallback_reason"] == "api_error"
+    assert "502 Bad Gateway" in captured.err
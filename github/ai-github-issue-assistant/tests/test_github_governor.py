@@ -0,0 +1,82 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.github_governor import RateLimitExceeded, RateLimitGovernor
+
+
+def headers(remaining, limit=5000, resets_in=3600.0, resource="core"):
+    return {"X-RateLimit-Limit": str(limit), "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(time.time() + resets_in), "X-RateLimit-Resource": resource}
+
+
+def response(status, text="", **response_headers):
+    return SimpleNamespace(status_code=status, text=text, headers=response_headers)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def test_no_wait_with_plenty_of_budget_or_no_headers():
+    governor = RateLimitGovernor()
+    assert timed(governor.before_request) < 0.05
+    governor.record("core", headers(4000))
+    assert timed(governor.before_request) < 0.05
+    assert governor.state()["resources"]["core"]["remaining"] == 3999
+
+
+def test_reserve_waits_for_reset():
+    governor = RateLimitGovernor(reserve=20, max_wait=1.0)
+    governor.record("core", headers(20, resets_in=600))
+    with pytest.raises(RateLimitExceeded):
+        governor.before_request("core")
+    # Other resources have budgets of their own
+    assert timed(lambda: governor.before_request("graphql")) < 0.05
+
+
+def test_low_budget_is_spread_over_the_window():
+    governor = RateLimitGovernor(reserve=20, pace_below=0.2)
+    governor.record("core", headers(110, limit=1000, resets_in=9.0))  # 90 spare requests over 9s
+    assert timed(governor.before_request) < 0.05
+    assert 0.05 < timed(governor.before_request) < 0.3
+
+
+def test_rolled_over_window_does_not_wait():
+    governor = RateLimitGovernor(reserve=20, max_wait=1.0)
+    governor.record("core", headers(0, resets_in=-1.0))
+    assert timed(governor.before_request) < 0.05
+
+
+def test_resource_header_wins_over_caller_guess():
+    governor = RateLimitGovernor()
+    governor.record("core", headers(100, resource="graphql"))
+    assert set(governor.state()["resources"]) == {"graphql"}
+
+
+def test_rate_limit_refusals_are_recognised():
+    assert RateLimitGovernor.is_rate_limited(response(429))
+    assert RateLimitGovernor.is_rate_limited(response(403, **{"Retry-After": "30"}))
+    assert RateLimitGovernor.is_rate_limited(response(403, text="You have exceeded a secondary rate limit"))
+    assert not RateLimitGovernor.is_rate_limited(response(403, text="Resource not accessible"))
+    assert not RateLimitGovernor.is_rate_limited(response(200))
+
+
+def test_backoff_honours_retry_after_and_max_wait():
+    governor = RateLimitGovernor(max_wait=5.0)
+    assert 0.9 < timed(lambda: governor.backoff(response(403, **{"Retry-After": "1"}), attempt=0)) < 1.5
+    with pytest.raises(RateLimitExceeded):
+        governor.backoff(response(429, **{"Retry-After": "60"}), attempt=0)
+
+
+def test_backoff_pauses_other_callers():
+    governor = RateLimitGovernor(base_backoff=0.3, max_backoff=0.3)
+    threading.Thread(target=governor.backoff, args=(response(429), 0)).start()
+    time.sleep(0.01)
+    # Jittered backoff is somewhere in [0, 0.3); a request made meanwhile waits for what is left
+    blocked_for = governor.state()["blocked_for"]
+    assert timed(governor.before_request) >= blocked_for - 0.02
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+from src.heuristics import classify_batch, classify_issue
+
+ISSUES = [
+    {"title": "App crashes when saving", "body": "Critical: the editor crashed twice.", "labels": [], "comments": []},
+    {"title": "Add dark mode support", "body": "Please allow a dark theme.", "labels": ["ui"], "comments": [1, 2]},
+    {"title": "Docs: README install guide is outdated", "body": "", "labels": [], "comments": []},
+    {"title": "How do I configure the proxy?", "body": "Any help appreciated", "labels": [], "comments": []},
+    {"title": "Memory leak after long sessions", "body": "Performance gets slow.", "labels": [], "comments": []},
+    {"title": "Please address this", "body": "Show more rows", "labels": [], "comments": []},
+]
+
+
+def test_batch_matches_one_at_a_time():
+    expected = [classify_issue(issue) for issue in ISSUES]
+    assert classify_batch(ISSUES) == expected
+    assert classify_batch(ISSUES, processes=2, chunksize=2) == expected
+
+
+def test_whole_words_only():
+    # "address" must not count as "add", nor "show" as "how"
+    assert classify_issue(ISSUES[5])["type"] == "other"
+    assert classify_issue(ISSUES[0])["type"] == "bug"
+    assert classify_issue(ISSUES[3])["type"] == "question"
+
+
+def test_import_does_not_load_multiprocessing():
+    # Checked in a fresh interpreter, since pytest itself may already have loaded it
+    code = "import sys, src.heuristics; print('multiprocessing' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    assert output.strip() == "False"
@@ -0,0 +1,35 @@
+from benchmarks.mock_servers import MockGitHubServer
+from src.github_handler import GitHubHandler
+from src.http_cache import HTTPCache
+
+
+def test_round_trip_keeps_only_replayable_headers(tmp_path):
+    cache = HTTPCache(str(tmp_path / "cache.sqlite"))
+    cache.put("key", '"abc"', "", {"Link": '<next>; rel="next"', "X-RateLimit-Remaining": "10"}, b"{}")
+    assert cache.get("key") == ('"abc"', "", {"Link": '<next>; rel="next"'}, b"{}")
+    assert cache.get("missing") is None
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted_past_max_bytes(tmp_path):
+    cache = HTTPCache(str(tmp_path / "cache.sqlite"), max_bytes=150)
+    cache.put("a", '"a"', "", {}, b"a" * 60)
+    cache.put("b", '"b"', "", {}, b"b" * 60)
+    cache.touch("a")
+    cache.put("c", '"c"', "", {}, b"c" * 60)
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    cache.close()
+
+
+def test_unchanged_issue_is_revalidated_with_a_304(tmp_path):
+    with MockGitHubServer(latency=0, issues=3, comments_per_issue=0) as server:
+        cache = HTTPCache(str(tmp_path / "cache.sqlite"))
+        with GitHubHandler(token="test", cache=cache, base_url=server.url) as handler:
+            first = handler.get_issue("owner", "repo", 2)
+            second = handler.get_issue("owner", "repo", 2)
+        cache.close()
+    assert first == second
+    assert server.stats["requests"] == 2
+    assert server.stats["not_modified"] == 1
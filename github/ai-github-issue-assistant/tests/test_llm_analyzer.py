@@ -0,0 +1,60 @@
+import time
+from types import SimpleNamespace
+
+from src.llm_analyzer import LLMAnalyzer
+from src.resilience import CircuitBreaker
+
+ISSUE = {"number": 3, "title": "Crash when saving", "body": "Saving a large file crashes the app.",
+         "labels": ["bug"], "comments": []}
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def analyzer_with(create, deadline=None, breaker=None):
+    """A real-mode analyzer whose completion requests go to create(**params)"""
+    analyzer = LLMAnalyzer(use_demo=True, deadline=deadline, breaker=breaker or CircuitBreaker(min_calls=100))
+    analyzer.use_demo = False
+    analyzer.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return analyzer
+
+
+def test_stream_yields_fields_then_result():
+    reply = '{"summary": "Saving crashes", "type": "bug", "priority_score": "4", ' \
+            '"suggested_labels": ["bug"], "potential_impact": "Data loss"}'
+
+    def create(**params):
+        assert params["stream"] is True
+        return iter([chunk(reply[i:i + 7]) for i in range(0, len(reply), 7)])
+
+    events = list(analyzer_with(create, deadline=5.0).analyze_issue_stream(ISSUE))
+    assert [name for name, _ in events] == ["summary", "type", "priority_score", "suggested_labels",
+                                            "potential_impact", "result"]
+    assert events[-1][1]["source"] == "llm"
+
+
+def test_stream_deadline_covers_the_wait_for_the_first_chunk():
+    def create(**params):
+        def chunks():
+            time.sleep(1.0)
+            yield chunk("{}")
+        return chunks()
+
+    breaker = CircuitBreaker(min_calls=100)
+    started = time.perf_counter()
+    events = list(analyzer_with(create, deadline=0.1, breaker=breaker).analyze_issue_stream(ISSUE))
+    assert time.perf_counter() - started < 0.6
+    assert events[-1][1]["fallback_reason"] == "deadline"
+    assert breaker.snapshot()["recent_failures"] == 1
+
+
+def test_stream_respects_open_circuit():
+    def create(**params):
+        raise AssertionError("no request while the circuit is open")
+
+    breaker = CircuitBreaker(min_calls=1)
+    breaker.allow()
+    breaker.record(False)
+    events = list(analyzer_with(create, deadline=1.0, breaker=breaker).analyze_issue_stream(ISSUE))
+    assert events[-1][1]["fallback_reason"] == "circuit_open"
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from src.async_analyzer import AsyncLLMAnalyzer
+from src.llm_scheduler import RateLimitScheduler, TokenBucket
+from src.resilience import CircuitBreaker
+
+
+def test_acquire_within_capacity_does_not_wait():
+    async def run():
+        bucket = TokenBucket(60)
+        started = time.monotonic()
+        await bucket.acquire(60)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 0.05
+
+
+def test_acquire_waits_for_refill():
+    async def run():
+        bucket = TokenBucket(6000)  # 100 tokens a second
+        await bucket.acquire(6000)
+        started = time.monotonic()
+        await bucket.acquire(10)
+        return time.monotonic() - started
+
+    assert 0.08 <= asyncio.run(run()) < 0.5
+
+
+def test_request_larger_than_bucket_drains_it_instead_of_waiting_forever():
+    async def run():
+        bucket = TokenBucket(60)
+        await asyncio.wait_for(bucket.acquire(1000), timeout=1.0)
+        return bucket.tokens
+
+    assert asyncio.run(run()) < 1.0
+
+
+def test_credit_refunds_and_charges_but_never_exceeds_capacity():
+    async def run():
+        bucket = TokenBucket(100)
+        await bucket.acquire(80)
+        bucket.credit(200)
+        after_refund = bucket.tokens
+        bucket.credit(-130)
+        return after_refund, bucket.tokens
+
+    after_refund, after_charge = asyncio.run(run())
+    assert after_refund == 100
+    assert -30 <= after_charge < -29
+
+
+def test_bucket_can_be_shared_across_event_loops():
+    bucket = TokenBucket(6000)  # 100 tokens a second
+
+    async def contended():
+        bucket.credit(-bucket.level())
+        await asyncio.gather(*(bucket.acquire(5) for _ in range(3)))
+
+    # The CLI and batch scripts reuse one scheduler across asyncio.run calls
+    asyncio.run(contended())
+    asyncio.run(contended())
+
+
+def test_rejected_request_is_refunded_and_synced_from_headers():
+    async def run():
+        scheduler = RateLimitScheduler(rpm=60, tpm=10000)
+        await scheduler.acquire(4000)
+        scheduler.rejected(4000, {"x-ratelimit-remaining-tokens": "2500"})
+        return scheduler.state()
+
+    state = asyncio.run(run())
+    assert state["requests_available"] == 60
+    assert 2500 <= state["tokens_available"] < 2510
+
+
+class Throttled(Exception):
+    def __init__(self):
+        super().__init__("429 Too Many Requests")
+        self.response = SimpleNamespace(headers={"retry-after": "0"})
+
+
+def test_exhausted_rate_limit_retries_do_not_open_the_circuit():
+    breaker = CircuitBreaker(min_calls=1)
+    analyzer = AsyncLLMAnalyzer(use_demo=True, breaker=breaker, max_retries=2)
+    analyzer.use_demo = False
+    analyzer._rate_limits = analyzer._retryable = (Throttled,)
+    attempts = []
+
+    async def create(**params):
+        attempts.append(params)
+        raise Throttled()
+
+    analyzer.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    issue = {"number": 1, "title": "Crash", "body": "It crashes", "labels": [], "comments": []}
+
+    result = asyncio.run(analyzer.analyze_issue(issue))
+    assert result["fallback_reason"] == "rate_limited"
+    assert len(attempts) == 3
+    assert breaker.state == CircuitBreaker.CLOSED
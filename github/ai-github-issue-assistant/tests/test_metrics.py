@@ -0,0 +1,55 @@
+import pytest
+
+from src import metrics
+
+
+@pytest.fixture
+def recording():
+    was_enabled = metrics.enabled()
+    metrics.reset()
+    metrics.enable()
+    yield
+    metrics.reset()
+    if not was_enabled:
+        metrics.disable()
+
+
+def test_render_counters_and_histograms(recording):
+    metrics.inc("github_requests", status="200")
+    metrics.inc("github_requests", 2, status="200")
+    metrics.inc("github_requests", status='4"04')
+    metrics.observe("prompt_tokens", 300, buckets=(100, 500))
+    metrics.observe("prompt_tokens", 50.5, buckets=(100, 500))
+
+    lines = metrics.REGISTRY.render().splitlines()
+    assert lines[-1] == "# EOF"
+    assert "# TYPE issue_assistant_github_requests counter" in lines
+    assert 'issue_assistant_github_requests_total{status="200"} 3' in lines
+    assert 'issue_assistant_github_requests_total{status="4\\"04"} 1' in lines
+    assert "# TYPE issue_assistant_prompt_tokens histogram" in lines
+    assert 'issue_assistant_prompt_tokens_bucket{le="100"} 1' in lines
+    assert 'issue_assistant_prompt_tokens_bucket{le="500"} 2' in lines
+    assert 'issue_assistant_prompt_tokens_bucket{le="+Inf"} 2' in lines
+    assert "issue_assistant_prompt_tokens_count 2" in lines
+    assert "issue_assistant_prompt_tokens_sum 350.5" in lines
+
+
+def test_span_records_duration_and_error(recording):
+    with pytest.raises(ValueError):
+        with metrics.span("fetch", source="github"):
+            raise ValueError("boom")
+
+    span = metrics.REGISTRY.recent_spans[-1]
+    assert span["stage"] == "fetch" and span["labels"] == {"source": "github"} and span["error"] == "ValueError"
+    [series] = metrics.REGISTRY.snapshot()["histograms"]["stage_duration_seconds"]
+    assert series["labels"] == {"source": "github", "stage": "fetch"} and series["count"] == 1
+
+
+def test_nothing_recorded_while_disabled(recording):
+    metrics.disable()
+    metrics.inc("github_requests")
+    metrics.observe("prompt_tokens", 10)
+    with metrics.span("fetch"):
+        pass
+    assert metrics.REGISTRY.render() == "# EOF\n"
+    assert not metrics.REGISTRY.recent_spans
@@ -0,0 +1,83 @@
+from src.llm_analyzer import LLMAnalyzer
+from src.mirror import IssueMirror
+
+REPO = "https://github.com/Owner/Repo"
+
+
+class FakeHandler:
+    """Serves issues and comments updated after `since`, and records what was asked"""
+
+    def __init__(self):
+        self.issues = {}
+        self.comments = []
+        self.calls = []
+
+    def issue(self, number, updated_at, **fields):
+        self.issues[number] = {"number": number, "title": f"Issue {number}", "body": "It crashes", "labels": [],
+                               "state": "open", "created_at": "2024-01-01T00:00:00Z", "updated_at": updated_at,
+                               **fields}
+
+    def comment(self, comment_id, number, updated_at, body):
+        self.comments.append({"id": comment_id, "issue_url": f"https://api.github.com/repos/owner/repo/issues/{number}",
+                              "body": body, "user": {"login": "someone"}, "created_at": updated_at,
+                              "updated_at": updated_at})
+
+    def list_issues(self, owner, repo, state="open", since=None):
+        self.calls.append(("issues", since))
+        return [issue for issue in self.issues.values() if since is None or issue["updated_at"] > since]
+
+    def list_repo_comments(self, owner, repo, since=None):
+        self.calls.append(("comments", since))
+        return [comment for comment in self.comments if since is None or comment["updated_at"] > since]
+
+
+def synced(tmp_path):
+    handler = FakeHandler()
+    handler.issue(1, "2024-01-01T00:00:00Z")
+    handler.issue(2, "2024-01-02T00:00:00Z")
+    handler.comment(10, 2, "2024-01-03T00:00:00Z", "same here on 2.1")
+    mirror = IssueMirror(str(tmp_path / "mirror.sqlite"))
+    assert mirror.sync(handler, REPO) == {"issues": 2, "comments": 1, "content_changed": 2}
+    list(mirror.analyze_changed(LLMAnalyzer(use_demo=True), REPO))
+    return mirror, handler
+
+
+def test_second_sync_asks_only_since_the_watermarks(tmp_path):
+    mirror, handler = synced(tmp_path)
+    handler.calls.clear()
+    assert mirror.sync(handler, REPO) == {"issues": 0, "comments": 0, "content_changed": 0}
+    assert handler.calls == [("issues", "2024-01-02T00:00:00Z"), ("comments", "2024-01-03T00:00:00Z")]
+    assert mirror.changed_issues(REPO) == []
+    mirror.close()
+
+
+def test_edits_and_new_comments_mark_issues_changed(tmp_path):
+    mirror, handler = synced(tmp_path)
+    handler.issue(2, "2024-02-01T00:00:00Z", title="Issue 2: crashes on save")
+    handler.comment(11, 1, "2024-02-02T00:00:00Z", "still broken on 2.2")
+    assert mirror.sync(handler, REPO)["content_changed"] == 2
+    assert mirror.changed_issues(REPO) == [1, 2]
+    mirror.close()
+
+
+def test_touched_but_unchanged_issue_is_not_reanalyzed(tmp_path):
+    mirror, handler = synced(tmp_path)
+    handler.issue(1, "2024-02-01T00:00:00Z")
+    assert mirror.sync(handler, REPO) == {"issues": 1, "comments": 0, "content_changed": 0}
+    assert mirror.changed_issues(REPO) == []
+    mirror.close()
+
+
+def test_transient_fallbacks_are_picked_up_again(tmp_path):
+    mirror, handler = synced(tmp_path)
+    handler.issue(1, "2024-02-01T00:00:00Z", body="It crashes on save")
+    mirror.sync(handler, REPO)
+
+    class Failing:
+        def analyze_issue(self, issue_data):
+            return {"summary": "", "source": "heuristic", "fallback_reason": "deadline"}
+
+    assert [number for number, _ in mirror.analyze_changed(Failing(), REPO)] == [1]
+    assert mirror.changed_issues(REPO) == [1]
+    assert mirror.analysis(REPO, 1)["fallback_reason"] == "deadline"
+    mirror.close()
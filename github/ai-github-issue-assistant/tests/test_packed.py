@@ -0,0 +1,58 @@
+import json
+
+from src.llm_analyzer import LLMAnalyzer
+
+
+def entry(issue_id, **overrides):
+    analysis = {"id": issue_id, "summary": f"Issue {issue_id}", "type": "bug", "priority_score": "3/5 - Medium",
+                "suggested_labels": ["bug"], "potential_impact": "Users lose work"}
+    analysis.update(overrides)
+    return analysis
+
+
+def parse(text):
+    return LLMAnalyzer(use_demo=True)._parse_packed(text)
+
+
+def test_well_formed_array():
+    results = parse(json.dumps([entry(1), entry(2)]))
+    assert sorted(results) == [1, 2]
+    assert results[2]["summary"] == "Issue 2"
+    assert "id" not in results[1]
+
+
+def test_garbled_entry_does_not_lose_its_neighbours():
+    text = "[" + json.dumps(entry(1)) + ', {"id": 2, "summary": "cut off" "type"}, ' + json.dumps(entry(3)) + "]"
+    assert sorted(parse(text)) == [1, 3]
+
+
+def test_prose_fences_and_string_ids():
+    text = "Here you go:\n```json\n" + json.dumps([entry("4")]) + "\n```"
+    assert sorted(parse(text)) == [4]
+
+
+def test_entries_missing_fields_or_ids_are_skipped():
+    incomplete = entry(1)
+    del incomplete["potential_impact"]
+    text = json.dumps([incomplete, entry(None), entry("x"), entry(2)])
+    assert sorted(parse(text)) == [2]
+
+
+def test_first_answer_for_a_repeated_id_wins():
+    results = parse(json.dumps([entry(1, summary="first"), entry(1, summary="second")]))
+    assert results[1]["summary"] == "first"
+
+
+def test_truncated_array_keeps_complete_entries():
+    text = json.dumps([entry(1), entry(2)])[:-40]
+    assert sorted(parse(text)) == [1]
+
+
+def test_demo_mode_returns_analyses_on_the_async_analyzer_too():
+    from src.async_analyzer import AsyncLLMAnalyzer
+
+    issues = [{"number": n, "title": f"Crash {n}", "body": "It crashes", "labels": [], "comments": []}
+              for n in (1, 2)]
+    for analyzer in (LLMAnalyzer(use_demo=True), AsyncLLMAnalyzer(use_demo=True)):
+        results = analyzer.analyze_packed(issues)
+        assert [result["fallback_reason"] for result in results] == ["demo_mode", "demo_mode"]
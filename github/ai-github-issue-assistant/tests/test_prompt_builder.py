@@ -0,0 +1,53 @@
+from src.prompt_builder import PromptBuilder, clean_text, is_noise
+
+LONG_BODY = " ".join(f"word{i} happens when saving the project file" for i in range(2000))
+
+
+def comment(body):
+    return {"body": body, "user": "someone"}
+
+
+def test_prompt_stays_within_budget_however_long_the_issue():
+    builder = PromptBuilder(token_budget=400)
+    issue = {"title": "Crash on save", "body": LONG_BODY,
+             "comments": [comment(f"Version 2.{i}: error {i} " + "detail " * 300) for i in range(50)]}
+    prompt, stats = builder.build(issue)
+    assert stats["tokens"] <= stats["frame_tokens"] + builder.token_budget + 10
+    assert stats["tokens"] < stats["legacy_tokens"]
+    assert 0 < stats["comments_used"] < stats["comments_total"]
+    assert "[...]" in prompt
+
+
+def test_short_issue_is_sent_whole():
+    builder = PromptBuilder(token_budget=1000)
+    issue = {"title": "Typo in README", "body": "The install section says pip instal.",
+             "comments": [comment("Fixed in the docs branch, version 1.2")]}
+    prompt, stats = builder.build(issue)
+    assert "The install section says pip instal." in prompt
+    assert stats["comments_used"] == 1
+    assert builder.packed_block(issue, 1, 400) == (
+        "### Issue id 1\nTitle: Typo in README\nBody: The install section says pip instal.\n"
+        "Comments:\n1. Fixed in the docs branch, version 1.2\n", False)
+
+
+def test_noise_dropped_and_informative_comments_kept_in_thread_order():
+    builder = PromptBuilder(token_budget=1000)
+    issue = {"title": "Crash on save", "body": "Saving crashes.",
+             "comments": [comment("+1"), comment("Steps to reproduce: open a 2GB project, press save. "
+                                                 "Expected a saved file, actual error is OutOfMemory."),
+                          comment("any update?"), comment("Workaround: split the project into two files.")]}
+    prompt, stats = builder.build(issue)
+    assert stats["comments_used"] == 2
+    assert prompt.index("2. Steps to reproduce") < prompt.index("4. Workaround")
+    assert "+1" not in prompt and "any update" not in prompt
+
+
+def test_clean_text_collapses_bulk():
+    trace = "Traceback (most recent call last):\n" + "".join(f'  File "m{i}.py", line {i}\n' for i in range(30))
+    fence = "```\n" + "\n".join(f"log line {i}" for i in range(40)) + "\n```"
+    text = clean_text("<!-- template -->Intro\n> quoted reply\n" + trace + "ValueError: bad\n" + fence)
+    assert "template" not in text and "quoted reply" not in text
+    assert "lines omitted" in text
+    assert "ValueError: bad" in text and "log line 0" in text and "log line 39" in text
+    assert "log line 20" not in text
+    assert is_noise("Same here!") and not is_noise("Same here on Windows 11 with version 2.3")
@@ -0,0 +1,181 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientCaller
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def failing_breaker(clock, **options):
+    breaker = CircuitBreaker(min_calls=4, cooldown=10.0, clock=clock, **options)
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record(False)
+    return breaker
+
+
+def test_breaker_opens_once_failure_rate_reached():
+    breaker = CircuitBreaker(failure_rate=0.5, min_calls=4, clock=FakeClock())
+    for success in (True, True, False):
+        breaker.allow()
+        breaker.record(success)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_lets_one_probe_through():
+    clock = FakeClock()
+    breaker = failing_breaker(clock)
+    clock.now = 10.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_breaker_closes_after_successful_probe():
+    clock = FakeClock()
+    breaker = failing_breaker(clock)
+    clock.now = 10.0
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()["recent_failures"] == 0
+
+
+def test_breaker_reopens_after_failed_probe():
+    clock = FakeClock()
+    breaker = failing_breaker(clock)
+    clock.now = 10.0
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 15.0
+    assert not breaker.allow()
+    clock.now = 20.0
+    assert breaker.allow()
+
+
+def test_caller_refuses_while_open():
+    calls = []
+    caller = ResilientCaller(breaker=failing_breaker(FakeClock()))
+    with pytest.raises(CircuitOpenError):
+        caller.call(lambda timeout: calls.append(timeout))
+    assert calls == []
+
+
+def test_caller_passes_remaining_time_to_fn():
+    caller = ResilientCaller(deadline=5.0)
+    timeout = caller.call(lambda timeout: timeout)
+    assert 4.5 < timeout <= 5.0
+
+
+def test_caller_deadline_counts_as_breaker_failure():
+    breaker = CircuitBreaker(min_calls=100)
+    caller = ResilientCaller(deadline=0.05, breaker=breaker)
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        caller.call(lambda timeout: time.sleep(0.5))
+    assert time.perf_counter() - started < 0.4
+    assert breaker.snapshot()["recent_failures"] == 1
+
+
+def test_caller_reraises_fn_errors():
+    breaker = CircuitBreaker(min_calls=100)
+    caller = ResilientCaller(deadline=1.0, breaker=breaker)
+    with pytest.raises(KeyError):
+        caller.call(lambda timeout: {}["missing"])
+    assert breaker.snapshot()["recent_failures"] == 1
+
+
+def test_hedge_answers_when_first_attempt_stalls():
+    caller = ResilientCaller(deadline=2.0, hedge_percentile=0.9)
+    for _ in range(caller.latency.min_samples):
+        caller.latency.add(0.01)
+    attempts = itertools.count()
+
+    def fn(timeout):
+        if next(attempts) == 0:
+            time.sleep(1.0)
+            return "slow"
+        return "hedge"
+
+    started = time.perf_counter()
+    assert caller.call(fn) == "hedge"
+    assert time.perf_counter() - started < 0.5
+
+
+def test_many_concurrent_calls_are_not_charged_for_queueing():
+    # More concurrent callers than any worker pool the caller might size: each
+    # call takes 0.3s of a 0.6s deadline, so none of them may time out
+    breaker = CircuitBreaker()
+    caller = ResilientCaller(deadline=0.6, breaker=breaker)
+    in_flight = []
+    lock = threading.Lock()
+
+    def fn(timeout):
+        with lock:
+            in_flight.append(timeout)
+        time.sleep(0.3)
+        return "ok"
+
+    with ThreadPoolExecutor(max_workers=48) as pool:
+        results = list(pool.map(lambda _: caller.call(fn), range(48)))
+    assert results == ["ok"] * 48
+    assert min(in_flight) > 0.5
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()["recent_failures"] == 0
+
+
+def test_caller_retries_listed_errors_within_deadline():
+    attempts = itertools.count()
+
+    def fn(timeout):
+        if next(attempts) < 2:
+            raise ConnectionError("reset")
+        return "ok"
+
+    caller = ResilientCaller(deadline=2.0, retries=2, retry_on=(ConnectionError,), retry_backoff=0.01)
+    assert caller.call(fn) == "ok"
+
+
+def test_caller_does_not_retry_other_errors_or_past_the_deadline():
+    calls = []
+
+    def fn(timeout):
+        calls.append(timeout)
+        raise ConnectionError("reset")
+
+    caller = ResilientCaller(deadline=2.0, retries=2, retry_on=(KeyError,), retry_backoff=0.01)
+    with pytest.raises(ConnectionError):
+        caller.call(fn)
+    assert len(calls) == 1
+
+    # A backoff that would outlast the deadline gives up straight away
+    caller = ResilientCaller(deadline=0.2, retries=2, retry_on=(ConnectionError,), retry_backoff=0.5)
+    with pytest.raises(ConnectionError):
+        caller.call(fn)
+    assert len(calls) == 2
+
+
+def test_caller_not_failures_do_not_count_against_breaker():
+    breaker = CircuitBreaker(min_calls=1)
+    caller = ResilientCaller(deadline=1.0, breaker=breaker, not_failures=(PermissionError,))
+
+    def throttled(timeout):
+        raise PermissionError("429")
+
+    with pytest.raises(PermissionError):
+        caller.call(throttled)
+    assert breaker.state == CircuitBreaker.CLOSED
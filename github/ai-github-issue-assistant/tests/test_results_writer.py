@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from src.results_writer import JSONLResultsWriter, merge, open_writer, read_jsonl, read_rows, result_row
+
+
+def row(number, source="llm", fallback_reason=None, error=None, summary=None):
+    analysis = {"summary": summary or f"Issue {number}", "type": "bug", "priority_score": "3",
+                "suggested_labels": ["bug"], "potential_impact": "x", "source": source}
+    if fallback_reason:
+        analysis["fallback_reason"] = fallback_reason
+    issue = {"title": f"Issue {number}", "labels": [], "state": "open",
+             "created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-02-01T00:00:00Z"}
+    return result_row({"number": number, "issue": issue, "analysis": None if error else analysis, "error": error})
+
+
+def write(path, rows, resume=False):
+    with JSONLResultsWriter(str(path), resume=resume) as writer:
+        for item in rows:
+            writer.write(item)
+        return writer
+
+
+def test_resume_drops_torn_last_line_and_redoes_that_issue(tmp_path):
+    path = tmp_path / "results.jsonl"
+    write(path, [row(1), row(2)])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(row(3))[:25])
+
+    with JSONLResultsWriter(str(path), resume=True) as writer:
+        assert writer.completed == {1, 2}
+        writer.write(row(3))
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["number"] for line in lines] == [1, 2, 3]
+
+
+def test_resume_retries_errors_and_transient_fallbacks_but_not_demo_mode(tmp_path):
+    path = tmp_path / "results.jsonl"
+    write(path, [
+        row(1),
+        row(2, error="404 Not Found"),
+        row(3, source="heuristic", fallback_reason="deadline"),
+        row(4, source="heuristic", fallback_reason="circuit_open"),
+        row(5, source="heuristic", fallback_reason="demo_mode"),
+        row(6, source="cache"),
+    ])
+    with JSONLResultsWriter(str(path), resume=True) as writer:
+        assert writer.completed == {1, 5, 6}
+
+
+def test_without_resume_the_file_starts_over(tmp_path):
+    path = tmp_path / "results.jsonl"
+    write(path, [row(1)])
+    assert write(path, [row(2)]).completed == set()
+    assert [item["number"] for item in read_jsonl(str(path))] == [2]
+
+
+def test_merge_keeps_last_row_per_issue(tmp_path):
+    first, second, output = tmp_path / "a.jsonl", tmp_path / "b.jsonl", tmp_path / "merged.jsonl"
+    write(first, [row(1, summary="old"), row(2)])
+    write(second, [row(3), row(1, summary="new")])
+
+    assert merge([str(first), str(second)], str(output)) == 3
+    merged = {item["number"]: item for item in read_jsonl(str(output))}
+    assert sorted(merged) == [1, 2, 3]
+    assert merged[1]["summary"] == "new"
+
+
+def test_parquet_parts_resume_and_merge(tmp_path):
+    pytest.importorskip("pyarrow")
+    directory = tmp_path / "parts.parquet"
+    with open_writer(str(directory), checkpoint_every=2) as writer:
+        writer.write(row(1))
+        writer.write(row(2))
+        writer.write(row(3, source="heuristic", fallback_reason="api_error"))
+    assert len(list(directory.glob("part-*.parquet"))) == 2
+
+    with open_writer(str(directory), resume=True) as writer:
+        assert writer.completed == {1, 2}
+        writer.write(row(3))
+
+    output = tmp_path / "merged.parquet"
+    assert merge([str(directory)], str(output)) == 3
+    merged = {item["number"]: item for item in read_rows(str(output))}
+    assert merged[3]["source"] == "llm"
+    assert merged[1]["created_at"] == "2024-01-01T00:00:00Z"
@@ -0,0 +1,50 @@
+import pytest
+
+from src.similarity import SimilarityIndex
+
+CRASH = {"title": "App crashes when saving large files", "body": "Saving a 2GB project crashes the editor with "
+         "an out of memory stack trace in the serializer", "labels": ["bug"]}
+CRASH_AGAIN = {"title": "Editor crashes when saving large files", "body": "Saving a big project crashes the "
+               "editor with an out of memory stack trace in the serializer", "labels": ["bug"]}
+UNRELATED = {"title": "Add dark theme", "body": "Please provide a dark colour scheme for night work",
+             "labels": ["enhancement"]}
+
+
+@pytest.fixture
+def index(tmp_path):
+    with SimilarityIndex(str(tmp_path / "index")) as index:
+        yield index
+
+
+def test_near_duplicate_is_a_candidate_and_unrelated_is_not(index):
+    index.add(1, CRASH, repo="owner/repo")
+    index.add(2, UNRELATED, repo="owner/repo")
+    matches = index.query(CRASH_AGAIN, repo="owner/repo")
+    assert [number for number, _ in matches] == [1]
+    assert matches[0][1] >= 0.3
+
+
+def test_query_stays_within_its_repository(index):
+    index.add(1, CRASH, repo="owner/repo")
+    assert index.query(CRASH_AGAIN, repo="other/repo") == []
+    assert index.query(CRASH_AGAIN, repo="OWNER/REPO") != []
+
+
+def test_exclude_and_issues_without_words(index):
+    index.add(1, CRASH, repo="owner/repo")
+    assert index.query(CRASH, exclude=1, repo="owner/repo") == []
+    index.add(2, {"title": "", "body": ""}, repo="owner/repo")
+    assert len(index) == 1
+    assert index.query({"title": "?!", "body": ""}, repo="owner/repo") == []
+
+
+def test_entries_survive_reopening(tmp_path):
+    path = str(tmp_path / "index")
+    with SimilarityIndex(path, meta_every=1000) as index:
+        for number in range(1, 1500):
+            index.add(number, UNRELATED if number % 2 else {"title": f"unrelated {number}", "body": ""},
+                      repo="owner/repo")
+        index.add(5000, CRASH, repo="owner/repo")
+    with SimilarityIndex(path) as reopened:
+        assert len(reopened) == 1500
+        assert reopened.query(CRASH_AGAIN, repo="owner/repo")[0][0] == 5000
@@ -0,0 +1,44 @@
+from src.streaming_json import IncrementalJSONParser
+
+
+def feed_all(parser, chunks):
+    members = []
+    for chunk in chunks:
+        members.extend(parser.feed(chunk))
+    return members
+
+
+def test_members_emitted_as_soon_as_complete():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"summary": "App cra') == []
+    assert parser.feed('shes", "type"') == [("summary", "App crashes")]
+    assert parser.feed(': "bug"}') == [("type", "bug")]
+    assert parser.done
+
+
+def test_prose_before_object_and_text_after_are_ignored():
+    parser = IncrementalJSONParser()
+    members = feed_all(parser, ['Sure! ```json\n', '{"a": 1}', '\n``` trailing {"b": 2}'])
+    assert members == [("a", 1)]
+    assert parser.done
+
+
+def test_nested_values_and_delimiters_inside_strings():
+    parser = IncrementalJSONParser()
+    text = '{"labels": ["bug", "ui"], "meta": {"x": [1, {"y": 2}]}, "note": "a, b } c \\" d"}'
+    # One character at a time is the worst case for a chunked stream
+    members = feed_all(parser, list(text))
+    assert members == [("labels", ["bug", "ui"]), ("meta", {"x": [1, {"y": 2}]}), ("note", 'a, b } c " d')]
+
+
+def test_malformed_member_is_skipped():
+    parser = IncrementalJSONParser()
+    members = feed_all(parser, ['{"summary": "ok", "type": bug, "priority_score": "3"}'])
+    assert members == [("summary", "ok"), ("priority_score", "3")]
+    assert parser.done
+
+
+def test_not_done_until_closing_brace():
+    parser = IncrementalJSONParser()
+    parser.feed('{"summary": "cut off mid-stre')
+    assert not parser.done
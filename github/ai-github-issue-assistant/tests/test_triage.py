@@ -0,0 +1,91 @@
+import threading
+import time
+
+import pytest
+
+from src.records import IssueRecord
+from src.triage import triage_repository
+
+REPO = "https://github.com/owner/repo"
+
+
+class FakeHandler:
+    def __init__(self, numbers, missing=(), list_error=None):
+        self.numbers = numbers
+        self.missing = set(missing)
+        self.list_error = list_error
+        self.fetched = []
+
+    parse_repo_url = staticmethod(lambda url: ("owner", "repo"))
+
+    def list_issues(self, owner, repo, state="open", labels=None, since=None):
+        for number in self.numbers:
+            yield {"number": number}
+        if self.list_error:
+            raise self.list_error
+
+    def fetch_issue_record(self, repo_url, number):
+        self.fetched.append(number)
+        if number in self.missing:
+            raise Exception("404 Not Found")
+        return IssueRecord.from_dict({"number": number, "title": f"Issue {number}", "body": "", "labels": [],
+                                      "state": "open", "comments": []})
+
+
+class FakeAnalyzer:
+    def __init__(self, slow=(), failing=()):
+        self.slow = set(slow)
+        self.failing = set(failing)
+
+    def analyze_issue(self, issue):
+        if issue["number"] in self.slow:
+            time.sleep(0.3)
+        if issue["number"] in self.failing:
+            raise ValueError("analysis blew up")
+        return {"summary": issue["title"]}
+
+
+def run(handler, analyzer, **options):
+    return list(triage_repository(handler, analyzer, REPO, **options))
+
+
+def test_every_issue_gets_one_result_with_errors_as_rows():
+    handler = FakeHandler(range(1, 11), missing={3})
+    results = run(handler, FakeAnalyzer(failing={7}))
+    by_number = {result["number"]: result for result in results}
+    assert sorted(by_number) == list(range(1, 11))
+    assert by_number[3]["error"] == "404 Not Found" and by_number[3]["analysis"] is None
+    assert by_number[7]["error"] == "analysis blew up"
+    assert by_number[5]["analysis"] == {"summary": "Issue 5"} and by_number[5]["error"] is None
+
+
+def test_results_come_in_completion_order():
+    results = run(FakeHandler([1, 2, 3]), FakeAnalyzer(slow={1}), fetch_workers=1, analyze_workers=3)
+    assert [result["number"] for result in results][-1] == 1
+
+
+def test_limit_and_skip():
+    handler = FakeHandler(range(1, 11))
+    results = run(handler, FakeAnalyzer(), limit=5, skip={2, 4})
+    assert sorted(result["number"] for result in results) == [1, 3, 5]
+    assert sorted(handler.fetched) == [1, 3, 5]
+
+
+def test_listing_error_is_raised_after_the_listed_issues():
+    handler = FakeHandler([1, 2], list_error=RuntimeError("502 from GitHub"))
+    seen = []
+    with pytest.raises(Exception, match="Error listing issues: 502 from GitHub"):
+        for result in triage_repository(handler, FakeAnalyzer(), REPO):
+            seen.append(result["number"])
+    assert sorted(seen) == [1, 2]
+
+
+def test_walking_away_early_stops_every_stage():
+    before = threading.active_count()
+    results = triage_repository(FakeHandler(range(1, 500)), FakeAnalyzer(), REPO, queue_size=2)
+    next(results)
+    results.close()
+    deadline = time.time() + 2
+    while threading.active_count() > before and time.time() < deadline:
+        time.sleep(0.05)
+    assert threading.active_count() <= before
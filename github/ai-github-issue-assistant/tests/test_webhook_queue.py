@@ -0,0 +1,77 @@
+import asyncio
+
+from src.webhook_service import CoalescingQueue
+
+KEY = ("owner/repo", 1)
+
+
+def run(coroutine):
+    return asyncio.run(asyncio.wait_for(coroutine, timeout=2.0))
+
+
+def test_repeated_puts_coalesce_into_one_entry():
+    async def scenario():
+        queue = CoalescingQueue(debounce=0.01)
+        for _ in range(5):
+            assert queue.put(KEY)
+        assert len(queue) == 1
+        assert await queue.get() == KEY
+        queue.done(KEY)
+        return queue
+
+    queue = run(scenario())
+    assert queue.stats == {"accepted": 1, "coalesced": 4, "rejected": 0}
+    assert queue.idle()
+
+
+def test_key_not_handed_out_before_debounce():
+    async def scenario():
+        queue = CoalescingQueue(debounce=0.1)
+        loop = asyncio.get_running_loop()
+        queue.put(KEY)
+        started = loop.time()
+        await queue.get()
+        return loop.time() - started
+
+    assert run(scenario()) >= 0.09
+
+
+def test_put_while_running_reruns_once_after_done():
+    async def scenario():
+        queue = CoalescingQueue(debounce=0.01)
+        queue.put(KEY)
+        await queue.get()
+        queue.put(KEY)
+        queue.put(KEY)
+        assert len(queue) == 0
+        queue.done(KEY)
+        assert len(queue) == 1
+        assert await queue.get() == KEY
+        queue.done(KEY)
+        return queue
+
+    assert run(scenario()).idle()
+
+
+def test_full_queue_rejects_new_keys_but_coalesces_known_ones():
+    async def scenario():
+        queue = CoalescingQueue(debounce=0.01, max_pending=2)
+        assert queue.put(("owner/repo", 1))
+        assert queue.put(("owner/repo", 2))
+        assert not queue.put(("owner/repo", 3))
+        assert queue.put(("owner/repo", 1))
+        return queue
+
+    assert run(scenario()).stats == {"accepted": 2, "coalesced": 1, "rejected": 1}
+
+
+def test_keys_come_out_oldest_first():
+    async def scenario():
+        queue = CoalescingQueue(debounce=0.01)
+        keys = [("owner/repo", number) for number in (3, 1, 2)]
+        for key in keys:
+            queue.put(key)
+        return keys, [await queue.get() for _ in keys]
+
+    keys, handed_out = run(scenario())
+    assert handed_out == keys
@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+from src.llm_analyzer import LLMAnalyzer
+from src.webhook_service import WebhookService
+
+
+def opened(number):
+    return {"action": "opened", "repository": {"full_name": "owner/repo"},
+            "issue": {"number": number, "title": f"Crash {number}", "body": "It crashes", "labels": [],
+                      "comments": 0, "state": "open"}}
+
+
+def service(**options):
+    return WebhookService(handler=None, analyzer=LLMAnalyzer(use_demo=True), debounce=0,
+                          on_result=lambda result: None, **options)
+
+
+def test_results_keep_only_the_most_recent_issues():
+    async def run():
+        webhooks = service(workers=1, max_results=2)
+        webhooks.start_workers()
+        for number in (1, 2, 3):
+            assert webhooks.handle_event("issues", opened(number)) == "queued"
+            await webhooks.drain()
+        await webhooks.stop()
+        return webhooks
+
+    webhooks = asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert list(webhooks.results) == [("owner/repo", 2), ("owner/repo", 3)]
+    assert webhooks.stats["analyzed"] == 3
+
+
+def test_non_object_payloads_are_rejected():
+    webhooks = service()
+    for body in (b"[1, 2]", b"5", b'"opened"'):
+        status, _, _ = webhooks._route("POST", "/webhook", {"x-github-event": "issues"}, body)
+        assert status == 400
+    status, response, _ = webhooks._route("POST", "/webhook", {"x-github-event": "issues"},
+                                          json.dumps({"action": "opened", "issue": "7"}).encode())
+    assert (status, response) == (200, {"result": "ignored:not_an_issue"})
+
+
+def test_bad_content_length_gets_400():
+    async def run():
+        webhooks = service()
+        server = await webhooks.serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        statuses = []
+        for length in (b"abc", b"-5"):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /webhook HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n")
+            await writer.drain()
+            statuses.append((await reader.readline()).split(b" ")[1])
+            writer.close()
+        server.close()
+        await webhooks.stop()
+        return statuses
+
+    assert asyncio.run(asyncio.wait_for(run(), timeout=5)) == [b"400", b"400"]